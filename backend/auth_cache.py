@@ -0,0 +1,135 @@
+"""
+Cache of authenticated users for ``get_current_user``.
+
+Without it every authenticated request decodes the JWT and selects the user
+by email. ``AuthCache`` keeps two bounded TTL/LRU maps:
+
+* token -> (user id, token expiry): the claims of a token that already
+  decoded and verified, so a repeat request skips the JWT work;
+* user id -> the user's columns: enough to rebuild the ``sql_models.User``
+  row and attach it to the request's session without a SELECT.
+
+Handlers that change a user (score submission, profile update) call
+``invalidate_user``; other tokens of that user then reload the row by primary
+key on their next request. Entries also expire after ``ttl`` seconds, which
+bounds staleness when several processes share one database.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+import sql_models
+
+# Not needed to authenticate or to serve a request, so not kept in memory
+_UNCACHED_COLUMNS = {"hashed_password"}
+_USER_COLUMNS = [c.key for c in sql_models.User.__table__.columns if c.key not in _UNCACHED_COLUMNS]
+
+
+class TTLCache:
+    """Thread-safe LRU map whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class AuthCache:
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self._tokens = TTLCache(maxsize, ttl, clock)
+        self._users = TTLCache(maxsize, ttl, clock)
+
+    def user_id_for(self, token: str) -> Optional[str]:
+        claims = self._tokens.get(token)
+        if claims is None:
+            return None
+        user_id, expires_at = claims
+        # Never outlive the token itself, even if the TTL has not run out
+        if expires_at <= time.time():
+            self._tokens.pop(token)
+            return None
+        return user_id
+
+    def remember_token(self, token: str, user_id: str, expires_at: float):
+        self._tokens.put(token, (user_id, expires_at), ttl=expires_at - time.time())
+
+    def remember_user(self, user: sql_models.User):
+        self._users.put(user.id, {key: getattr(user, key) for key in _USER_COLUMNS})
+
+    def attach_user(self, user_id: str, db: Session) -> Optional[sql_models.User]:
+        """
+        The cached row as a persistent instance in ``db`` (no query), or None.
+
+        Its columns may be up to ``ttl`` seconds old: change counters with SQL
+        expressions, not by writing back values computed from it.
+        """
+        columns = self._users.get(user_id)
+        if columns is None:
+            return None
+        user = sql_models.User(**columns)
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+
+    def invalidate_user(self, user_id: str):
+        self._users.pop(user_id)
+
+    def clear(self):
+        self._tokens.clear()
+        self._users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"tokens": self._tokens.stats(), "users": self._users.stats()}
+
@@ -0,0 +1,71 @@
+"""
+Benchmark the server-side bots on one core: decisions per second and how well they play.
+
+For each fleet size, bots play for --warmup ticks (so snakes reach a typical
+length), then --ticks ticks are timed. A decision is one bot's move for one
+tick, chosen by choose_directions() in bots.py. For comparison, the greedy
+policy steers like getNextAIMove() in the frontend: the legal move that
+gets closest to the food, ignoring the rest of the board.
+
+Usage:
+    uv run python benchmarks/bench_bots.py --bots 100 1000 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bots import BotFleet, choose_directions
+from game_engine import NEIGHBOURS, GameEngine
+from live_state import CELLS, GRID_SIZE
+
+
+def greedy_directions(engine: GameEngine, slots: np.ndarray) -> np.ndarray:
+    head = engine.body[slots, engine.head_ptr[slots]]
+    neighbours = NEIGHBOURS[engine.walls[slots].astype(np.intp), head]
+    safe_cells = np.maximum(neighbours, 0)
+    legal = (neighbours >= 0) & ~engine.occupied[slots[:, None], safe_cells]
+    food = engine.food[slots][:, None]
+    distance = np.abs(safe_cells % GRID_SIZE - food % GRID_SIZE) + np.abs(safe_cells // GRID_SIZE - food // GRID_SIZE)
+    return np.where(legal, distance, CELLS).argmin(axis=1).astype(np.int8)
+
+
+def run(bots: int, policy: str, warmup: int, ticks: int, tick_ms: float):
+    engine = GameEngine({}, capacity=bots, seed=1)
+    choose = greedy_directions if policy == "greedy" else choose_directions
+    fleet = BotFleet(engine, size=bots, seed=1, choose=choose)
+    fleet.start()
+    for _ in range(warmup):
+        engine.tick()
+    spawned, steer_s = fleet.spawned, 0.0
+    for _ in range(ticks):
+        engine.tick()
+        steer_s += fleet.last_steer_ms / 1000
+
+    steer_ms = steer_s / ticks * 1000
+    lengths = engine.length[np.flatnonzero(engine.playing)]
+    crashes = fleet.spawned - spawned
+    print(
+        f"{policy:>6} {bots:>6,} bots  steer {steer_ms:7.2f} ms/tick ({steer_ms / tick_ms:4.0%} of a {tick_ms:.0f} ms tick)"
+        f"  {bots * ticks / steer_s:>10,.0f} decisions/s  "
+        f"mean length {lengths.mean():5.1f}  crashes/1000 bot-ticks {crashes * 1000 / (bots * ticks):6.2f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the server-side bots.")
+    parser.add_argument("--bots", type=int, nargs="+", default=[100, 1_000, 5_000])
+    parser.add_argument("--policy", choices=["search", "greedy", "both"], default="both")
+    parser.add_argument("--warmup", type=int, default=300, help="Untimed ticks first (default: 300)")
+    parser.add_argument("--ticks", type=int, default=200, help="Timed ticks (default: 200)")
+    parser.add_argument("--tick-ms", type=float, default=120, help="Tick budget in ms (default: 120)")
+
+    args = parser.parse_args()
+    for n in args.bots:
+        for policy in (["search", "greedy"] if args.policy == "both" else [args.policy]):
+            run(n, policy, args.warmup, args.ticks, args.tick_ms)
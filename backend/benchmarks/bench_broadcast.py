@@ -0,0 +1,182 @@
+"""
+Spectator fan-out: one stream per viewer vs one encoded frame per game.
+
+Runs --subscribers simulated spectator tasks spread over --games games for
+--ticks engine ticks, on one event loop, with no sockets. For each tick every
+game moves one step and the time until every fast viewer has its frame is
+measured. Two setups are compared:
+
+* per-viewer: each viewer has its own LiveGameStream, is woken by a per-game
+  event and computes and JSON-encodes its own frame (the previous WebSocket
+  handler).
+* broadcast: LiveGameBroadcaster computes and encodes each frame once per game
+  and queues the same str for every viewer.
+
+In the broadcast run, --slow of the viewers only read a frame every
+--slow-every ticks, so their queues overflow and they resync from snapshots.
+
+Usage:
+    uv run python benchmarks/bench_broadcast.py --subscribers 10000 --games 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from broadcast import LiveGameBroadcaster
+from live_state import GRID_SIZE, CompactSnake, LiveGameState
+from live_stream import LiveGameStream
+from models import GameMode
+from bench_db_concurrency import percentile
+
+
+def make_games(count: int):
+    warnings.simplefilter("ignore")
+    return [
+        LiveGameState(
+            id=f"game_{i}", playerId="u", playerName="P", mode=GameMode.PASS_THROUGH,
+            snake=CompactSnake(range(GRID_SIZE * 2 + 20, GRID_SIZE * 2, -1)), food=0,
+        )
+        for i in range(count)
+    ]
+
+
+def step(game: LiveGameState):
+    game.snake.pop_tail()
+    game.snake.push_head((game.snake.head + 1) % (GRID_SIZE * GRID_SIZE))
+
+
+class Counter:
+    def __init__(self):
+        self.received = 0
+        self.target = 0
+        self.done = asyncio.Event()
+
+    def add(self):
+        self.received += 1
+        if self.received == self.target:
+            self.done.set()
+
+    async def until(self, target: int):
+        self.target = target
+        if self.received < target:
+            self.done.clear()
+            await self.done.wait()
+
+
+async def per_viewer(args) -> list:
+    games = make_games(args.games)
+    # A game's event is replaced on every change, waking everyone waiting on it
+    events = {game.id: asyncio.Event() for game in games}
+    counter = Counter()
+
+    async def viewer(game):
+        stream = LiveGameStream(game)
+        json.dumps(stream.snapshot(game))
+        while True:
+            await events[game.id].wait()
+            frame = stream.next_frame(game)
+            if frame is not None:
+                json.dumps(frame)
+                counter.add()
+
+    tasks = [asyncio.create_task(viewer(games[i % args.games])) for i in range(args.subscribers)]
+    await asyncio.sleep(0)
+    timings = []
+    for tick in range(1, args.ticks + 1):
+        start = time.perf_counter()
+        for game in games:
+            step(game)
+            event, events[game.id] = events[game.id], asyncio.Event()
+            event.set()
+        await counter.until(tick * args.subscribers)
+        timings.append(time.perf_counter() - start)
+    for task in tasks:
+        task.cancel()
+    return timings
+
+
+async def broadcast(args):
+    games = make_games(args.games)
+    broadcaster = LiveGameBroadcaster(queue_size=args.queue)
+    counter = Counter()
+    slow_count = int(args.subscribers * args.slow)
+    ticks = [0]
+    ticked = asyncio.Event()
+    received_slow = [0]
+
+    async def viewer(subscriber, slow: bool):
+        while (frame := await subscriber.get()) is not None:
+            if slow:
+                received_slow[0] += 1
+                # Read again only once a few more ticks have gone by
+                seen = ticks[0]
+                while ticks[0] < seen + args.slow_every:
+                    await ticked.wait()
+            else:
+                counter.add()
+
+    tasks = []
+    for i in range(args.subscribers):
+        subscriber = broadcaster.subscribe(games[i % args.games])
+        tasks.append(asyncio.create_task(viewer(subscriber, i < slow_count)))
+    fast = args.subscribers - slow_count
+    await asyncio.sleep(0)
+    await counter.until(fast)  # initial snapshots
+
+    timings = []
+    for tick in range(1, args.ticks + 1):
+        ticks[0] = tick
+        ticked.set()
+        ticked = asyncio.Event()
+        start = time.perf_counter()
+        for game in games:
+            step(game)
+            broadcaster.publish(game.id, game)
+        await counter.until((tick + 1) * fast)
+        timings.append(time.perf_counter() - start)
+    stats = broadcaster.stats()
+    for game in games:
+        broadcaster.publish(game.id, None)
+    ticks[0] = float("inf")
+    ticked.set()
+    await asyncio.gather(*tasks)
+    return timings, stats, received_slow[0]
+
+
+def summary(name: str, timings: list, frames: int):
+    ms = sorted(t * 1000 for t in timings)
+    total = sum(timings)
+    print(f"{name:<12} {frames / total:>14,.0f} {percentile(ms, 0.5):>9.2f} {percentile(ms, 0.99):>9.2f}")
+
+
+async def main(args):
+    print(f"{args.subscribers:,} subscribers over {args.games} games, {args.ticks} ticks")
+    print(f"{'':<12} {'frames/s':>14} {'p50 ms':>9} {'p99 ms':>9}   (per tick, until every fast viewer has its frame)")
+    timings = await per_viewer(args)
+    summary("per-viewer", timings, args.subscribers * args.ticks)
+    timings, stats, slow_frames = await broadcast(args)
+    fast = args.subscribers - int(args.subscribers * args.slow)
+    summary("broadcast", timings, fast * args.ticks)
+    print(
+        f"frames encoded {stats['frames']:,} for {stats['deliveries']:,} deliveries; "
+        f"slow viewers read {slow_frames:,} frames, dropped {stats['dropped']:,}, resynced {stats['resyncs']:,} times"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark spectator frame fan-out.")
+    parser.add_argument("--subscribers", type=int, default=10_000, help="Simulated spectators (default: 10000)")
+    parser.add_argument("--games", type=int, default=10, help="Games they watch (default: 10)")
+    parser.add_argument("--ticks", type=int, default=100, help="Engine ticks (default: 100)")
+    parser.add_argument("--queue", type=int, default=32, help="Per-subscriber queue size (default: 32)")
+    parser.add_argument("--slow", type=float, default=0.1, help="Fraction of slow subscribers (default: 0.1)")
+    parser.add_argument("--slow-every", type=int, default=4, help="Ticks between a slow subscriber's reads (default: 4)")
+
+    asyncio.run(main(parser.parse_args()))
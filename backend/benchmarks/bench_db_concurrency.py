@@ -0,0 +1,150 @@
+"""
+Concurrency benchmark: mixed leaderboard and login traffic against uvicorn.
+
+Starts the app in a uvicorn subprocess on a fresh SQLite database, seeds
+users and scores, then runs closed-loop clients for a fixed duration and
+reports requests per second and latency percentiles per endpoint. The
+in-memory leaderboard index is turned off so every read hits the database.
+
+Usage:
+    uv run python benchmarks/bench_db_concurrency.py --concurrency 50 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import httpx
+from passlib.context import CryptContext
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PASSWORD = "password123"
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def start_server(port: int, database_url: str, extra_env=None) -> subprocess.Popen:
+    # Benchmarks submit bare scores; replay checks have their own benchmark
+    env = dict(
+        os.environ, DATABASE_URL=database_url, LIVE_ENGINE="0", LEADERBOARD_INDEX="0", REPLAY_REQUIRED="0",
+        **(extra_env or {}),
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/leaderboard")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def seed(db_path: str, users: int, scores_per_user: int):
+    """Insert users and scores directly; the tables are created by the server on startup."""
+    password_hash = CryptContext(schemes=["sha256_crypt"]).hash(PASSWORD)
+    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")
+    emails = [f"bench_{i}@bench.com" for i in range(users)]
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, hashed_password, highScore, gamesPlayed, createdAt) "
+            "VALUES (?, ?, ?, ?, 0, 0, ?)",
+            [(f"bench_user_{i}", f"bench_{i}", email, password_hash, now) for i, email in enumerate(emails)],
+        )
+        conn.executemany(
+            "INSERT INTO leaderboard (id, rank, userId, username, score, mode, date) VALUES (?, 0, ?, ?, ?, ?, ?)",
+            [
+                (f"bench_score_{i}_{j}", f"bench_user_{i}", f"bench_{i}", random.randrange(200) * 10,
+                 random.choice(["walls", "pass-through"]), now)
+                for i in range(users) for j in range(scores_per_user)
+            ],
+        )
+    return emails
+
+
+async def run_load(client: httpx.AsyncClient, emails, concurrency: int, duration: float, login_ratio: float):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        while time.monotonic() < deadline:
+            if random.random() < login_ratio:
+                name = "POST /auth/login"
+                request = client.post("/auth/login", json={"email": random.choice(emails), "password": PASSWORD})
+            else:
+                name = "GET /leaderboard"
+                request = client.get("/leaderboard", params={"mode": random.choice(["walls", "pass-through"])})
+            start = time.perf_counter()
+            try:
+                res = await request
+                if res.status_code >= 400:
+                    errors[name] += 1
+            except httpx.HTTPError:
+                errors[name] += 1
+            latencies[name].append(time.perf_counter() - start)
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.monotonic() - start
+
+
+def report(latencies, errors, elapsed: float):
+    print(f"{'endpoint':<26} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    everything = []
+    for name, samples in sorted(latencies.items()):
+        everything.extend(samples)
+        print(
+            f"{name:<26} {len(samples):>9} {len(samples) / elapsed:>8.1f} "
+            f"{percentile(samples, 0.5) * 1000:>8.1f} {percentile(samples, 0.99) * 1000:>8.1f} {errors[name]:>7}"
+        )
+    print(
+        f"{'total':<26} {len(everything):>9} {len(everything) / elapsed:>8.1f} "
+        f"{percentile(everything, 0.5) * 1000:>8.1f} {percentile(everything, 0.99) * 1000:>8.1f} {sum(errors.values()):>7}"
+    )
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_server(args.port, f"sqlite:///{tmp}/bench.db")
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60, limits=limits) as client:
+                await wait_until_ready(client)
+                emails = seed(f"{tmp}/bench.db", args.users, args.scores_per_user)
+                print(f"Mixed load: concurrency={args.concurrency} duration={args.duration}s login_ratio={args.login_ratio}")
+                report(*await run_load(client, emails, args.concurrency, args.duration, args.login_ratio))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent leaderboard and login traffic.")
+    parser.add_argument("--port", type=int, default=8099, help="Port for the uvicorn subprocess (default: 8099)")
+    parser.add_argument("--users", type=int, default=10, help="Users to sign up (default: 10)")
+    parser.add_argument("--scores-per-user", type=int, default=50, help="Scores submitted per user (default: 50)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients (default: 50)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load (default: 10)")
+    parser.add_argument("--login-ratio", type=float, default=0.05, help="Fraction of requests that log in (default: 0.05)")
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,67 @@
+"""
+Benchmark the batched live game engine on one core.
+
+Every game turns at random each tick; crashed games are respawned so the
+number of active games stays constant.
+
+Usage:
+    uv run python benchmarks/bench_game_engine.py --games 1000 10000 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from game_engine import GameEngine
+from models import GameMode
+
+
+def run(games: int, ticks: int, tick_ms: float, seed: int):
+    store = {}
+    engine = GameEngine(store, capacity=games, seed=seed)
+    for i in range(games):
+        engine.spawn(f"game_{i}", f"user_{i}", f"player{i}", GameMode.WALLS if i % 2 else GameMode.PASS_THROUGH)
+
+    rng = np.random.default_rng(seed)
+    step_s = apply_s = 0.0
+    for _ in range(ticks):
+        slots = np.flatnonzero(engine.playing)
+        engine.set_directions(slots, rng.integers(0, 4, len(slots)).astype(np.int8))
+
+        start = time.perf_counter()
+        result = engine.step()
+        middle = time.perf_counter()
+        engine.apply(result)
+        end = time.perf_counter()
+        step_s += middle - start
+        apply_s += end - middle
+
+        for slot in result.crashed.tolist():
+            game_id = f"game_{slot}_{engine.ticks}"
+            engine.spawn(game_id, "user", "player", GameMode.PASS_THROUGH)
+        engine.ticks += 1
+
+    step_ms = step_s / ticks * 1000
+    total_ms = (step_s + apply_s) / ticks * 1000
+    print(
+        f"{games:>8,} games  step {step_ms:8.3f} ms  step+apply {total_ms:8.3f} ms  "
+        f"{games / (total_ms / 1000):>12,.0f} game-moves/s  "
+        f"fits {tick_ms:.0f} ms tick: {'yes' if total_ms < tick_ms else 'no'}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the batched live game engine.")
+    parser.add_argument("--games", type=int, nargs="+", default=[100, 1_000, 10_000, 50_000])
+    parser.add_argument("--ticks", type=int, default=200, help="Ticks per run (default: 200)")
+    parser.add_argument("--tick-ms", type=float, default=120, help="Tick budget in ms (default: 120)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+
+    args = parser.parse_args()
+    for n in args.games:
+        run(n, args.ticks, args.tick_ms, args.seed)
@@ -0,0 +1,100 @@
+"""
+Leaderboard reads with and without the response cache.
+
+Starts the app in a uvicorn subprocess on a fresh SQLite file, seeds scores
+and runs closed-loop readers of GET /leaderboard for a fixed duration, once
+with LEADERBOARD_CACHE_SIZE=0 and once with the cache on. Each run is
+repeated for three kinds of client: a plain one, one that accepts gzip, and
+one that revalidates with If-None-Match. Reports requests per second and the
+bytes on the wire per response.
+
+Usage:
+    uv run python benchmarks/bench_leaderboard_cache.py --concurrency 20 --duration 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_db_concurrency import percentile, seed, start_server, wait_until_ready
+from bench_score_submissions import token_for
+
+CLIENTS = {
+    "plain": {"Accept-Encoding": "identity"},
+    "gzip": {"Accept-Encoding": "gzip"},
+    "If-None-Match": {"Accept-Encoding": "gzip"},
+}
+
+
+async def read_load(client: httpx.AsyncClient, kind: str, args):
+    latencies, wire_bytes = [], 0
+    deadline = time.monotonic() + args.duration
+
+    async def worker():
+        nonlocal wire_bytes
+        etags = {}
+        while time.monotonic() < deadline:
+            mode = random.choice(["walls", "pass-through"])
+            headers = dict(CLIENTS[kind])
+            if kind == "If-None-Match" and mode in etags:
+                headers["If-None-Match"] = etags[mode]
+            start = time.perf_counter()
+            res = await client.get("/leaderboard", params={"mode": mode, "limit": args.limit}, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert res.status_code in (200, 304), res.status_code
+            etags[mode] = res.headers.get("ETag", "")
+            wire_bytes += int(res.headers.get("Content-Length", 0))
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return latencies, wire_bytes, time.monotonic() - start
+
+
+async def run(cache_size: int, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_server(args.port, f"sqlite:///{tmp}/bench.db", {"LEADERBOARD_CACHE_SIZE": str(cache_size)})
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60, limits=limits) as client:
+                await wait_until_ready(client)
+                emails = seed(f"{tmp}/bench.db", args.users, args.scores_per_user)
+                # The readiness probe cached an empty page; a write invalidates it
+                headers = {"Authorization": f"Bearer {token_for(emails[0])}"}
+                (await client.post("/leaderboard/submit", json={"score": 0, "mode": "walls"}, headers=headers)).raise_for_status()
+                for kind in CLIENTS:
+                    latencies, wire_bytes, elapsed = await read_load(client, kind, args)
+                    label = f"{'cache' if cache_size else 'no cache'} / {kind}"
+                    print(
+                        f"{label:<26} {len(latencies) / elapsed:>8.1f} {percentile(latencies, 0.5) * 1000:>8.1f} "
+                        f"{percentile(latencies, 0.99) * 1000:>8.1f} {wire_bytes / len(latencies):>10.0f}"
+                    )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def main(args):
+    print(f"{'run':<26} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'bytes/req':>10}")
+    await run(0, args)
+    await run(args.cache_size, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark leaderboard reads with and without the response cache.")
+    parser.add_argument("--port", type=int, default=8099, help="Port for the uvicorn subprocess (default: 8099)")
+    parser.add_argument("--users", type=int, default=100, help="Seeded users (default: 100)")
+    parser.add_argument("--scores-per-user", type=int, default=100, help="Seeded scores per user (default: 100)")
+    parser.add_argument("--limit", type=int, default=50, help="Page size (default: 50)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent readers (default: 20)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per client kind (default: 5)")
+    parser.add_argument("--cache-size", type=int, default=256, help="LEADERBOARD_CACHE_SIZE for the cached run (default: 256)")
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,60 @@
+"""
+Benchmark the in-memory leaderboard index.
+
+Usage:
+    uv run python benchmarks/bench_leaderboard_index.py --entries 1000000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from leaderboard_index import IndexedEntry, LeaderboardIndex, sort_key
+
+
+def timed(label: str, ops: int, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.3f}s  {ops / elapsed:12,.0f} ops/s")
+
+
+def main(entries: int, operations: int, seed: int):
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    modes = ["walls", "pass-through"]
+
+    def entry(i):
+        return IndexedEntry(
+            f"score_{i}", f"user_{i % 10_000}", f"player{i % 10_000}", None,
+            rng.randrange(5_000) * 10, modes[i % 2], base + timedelta(seconds=i)
+        )
+
+    rows = sorted((entry(i) for i in range(entries)), key=sort_key)
+    index = LeaderboardIndex()
+
+    print(f"Leaderboard index benchmark: {entries:,} entries, {operations:,} operations")
+    timed("bulk load", entries, lambda: index.load_entries(rows))
+    gc.freeze()  # as load_leaderboard_index() does at startup
+    timed("insert", operations, lambda: [index.add(entry(entries + i)) for i in range(operations)])
+    timed("rank of score", operations,
+          lambda: [index.rank_of_score(rng.randrange(50_000)) for _ in range(operations)])
+    timed("top 50", operations // 10, lambda: [index.top(50) for _ in range(operations // 10)])
+    timed("page at random offset", operations // 10,
+          lambda: [index.page(rng.randrange(entries), 50, "walls") for _ in range(operations // 10)])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory leaderboard index.")
+    parser.add_argument("--entries", type=int, default=1_000_000, help="Entries to bulk-load (default: 1000000)")
+    parser.add_argument("--operations", type=int, default=100_000, help="Operations per phase (default: 100000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+
+    args = parser.parse_args()
+    main(args.entries, args.operations, args.seed)
@@ -0,0 +1,103 @@
+"""
+Live game registry: memory over a long run, and the cost of listing games.
+
+Runs --ticks engine ticks on a fake clock, starting --games-per-tick new
+walls games per tick (each ends by hitting a wall) plus a few that are
+abandoned mid-game. Reports how many games and how much traced memory are
+held as the run goes on, first with a plain dict (nothing is ever removed)
+and then with LiveGameRegistry. Finally times GET /live-games style listings
+over the registry: every game as before, and a filtered page.
+
+Usage:
+    uv run python benchmarks/bench_live_registry.py --ticks 5000 --games-per-tick 20
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from game_engine import GameEngine
+from live_registry import LiveGameRegistry
+from live_state import CompactSnake, LiveGameState
+from models import GameMode, GameStatus
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def soak(games, clock, args):
+    engine = GameEngine(games, capacity=256, seed=1)
+    if isinstance(games, LiveGameRegistry):
+        games.on_evict = engine.release
+    spawned = 0
+    gc.collect()
+    tracemalloc.start()
+    for tick in range(1, args.ticks + 1):
+        for _ in range(args.games_per_tick):
+            engine.spawn(f"game_{spawned}", "u", "P", GameMode.WALLS)
+            spawned += 1
+        for _ in range(args.abandoned_per_tick):
+            games[f"game_{spawned}"] = LiveGameState(
+                id=f"game_{spawned}", playerId="u", playerName="P", mode=GameMode.PASS_THROUGH,
+                snake=CompactSnake([0]), food=5, status=GameStatus.PAUSED,
+            )
+            spawned += 1
+        for game_id in engine.tick():
+            if isinstance(games, LiveGameRegistry):
+                games.touch(game_id)
+        clock.now += 0.12
+        if isinstance(games, LiveGameRegistry):
+            games.sweep()
+        if tick % (args.ticks // 5) == 0:
+            gc.collect()
+            mib = tracemalloc.get_traced_memory()[0] / 2**20
+            print(f"  tick {tick:>7} spawned {spawned:>9,} held {len(games):>8,} traced {mib:>8.1f} MiB")
+    tracemalloc.stop()
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(args):
+    warnings.simplefilter("ignore")
+
+    print("plain dict:")
+    soak({}, FakeClock(), args)
+
+    clock = FakeClock()
+    registry = LiveGameRegistry(maxsize=args.max_games, game_over_ttl=60, idle_ttl=600, clock=clock)
+    print(f"LiveGameRegistry (max {args.max_games:,}, game over TTL 60s, idle TTL 600s):")
+    soak(registry, clock, args)
+
+    everything = timed(lambda: [g.to_model() for g in registry.values()], 3)
+    page = timed(lambda: [g.to_model() for g in registry.select(GameMode.WALLS, GameStatus.PLAYING, 100)], 50)
+    count = timed(lambda: registry.count(status=GameStatus.PLAYING), 10000)
+    print(f"{'listing (' + format(len(registry), ',') + ' games held)':<32} {'ms':>10}")
+    print(f"{'all games, serialized':<32} {everything:>10.3f}")
+    print(f"{'mode+status filter, limit 100':<32} {page:>10.3f}")
+    print(f"{'count(status=playing)':<32} {count:>10.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Soak the live game registry and time listings.")
+    parser.add_argument("--ticks", type=int, default=5000, help="Engine ticks to run (default: 5000)")
+    parser.add_argument("--games-per-tick", type=int, default=20, help="Games started per tick (default: 20)")
+    parser.add_argument("--abandoned-per-tick", type=int, default=1, help="Abandoned games per tick (default: 1)")
+    parser.add_argument("--max-games", type=int, default=10000, help="Registry capacity (default: 10000)")
+
+    main(parser.parse_args())
@@ -0,0 +1,106 @@
+"""
+Compare the public LiveGame model with the compact LiveGameState.
+
+Reports memory per game (tracemalloc) and moves per second for snakes of
+several lengths. The LiveGame mover does what moveSnake does with a list of
+Position objects: a linear self-collision scan and a list shift per move.
+
+Usage:
+    uv run python benchmarks/bench_live_state.py --lengths 3 50 200
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models import Direction, GameMode, GameStatus, LiveGame, Position
+from live_state import GRID_SIZE, VECTORS, CompactSnake, LiveGameState, to_cell
+
+# A Hamiltonian cycle (serpentine over columns 1.., back up column 0) that a
+# snake of any length up to 400 can follow forever without colliding
+LOOP = [(0, 0)]
+for _y in range(GRID_SIZE):
+    _xs = range(1, GRID_SIZE) if _y % 2 == 0 else range(GRID_SIZE - 1, 0, -1)
+    LOOP.extend((_x, _y) for _x in _xs)
+LOOP.extend((0, _y) for _y in range(GRID_SIZE - 1, 0, -1))
+
+
+def loop_directions():
+    steps = []
+    for (x0, y0), (x1, y1) in zip(LOOP, LOOP[1:] + LOOP[:1]):
+        delta = (x1 - x0, y1 - y0)
+        steps.append(next(d for d, v in VECTORS.items() if v == delta))
+    return steps
+
+
+def body(length: int):
+    return [LOOP[i] for i in range(length - 1, -1, -1)]
+
+
+def make_model(length: int) -> LiveGame:
+    return LiveGame(
+        id="game", playerId="user", playerName="player", score=0, mode=GameMode.PASS_THROUGH,
+        snake=[Position(x=x, y=y) for x, y in body(length)], food=Position(x=10, y=10),
+        status=GameStatus.PLAYING,
+    )
+
+
+def make_state(length: int) -> LiveGameState:
+    return LiveGameState(
+        id="game", playerId="user", playerName="player", mode=GameMode.PASS_THROUGH,
+        snake=CompactSnake(to_cell(x, y) for x, y in body(length)), food=to_cell(10, 10),
+    )
+
+
+def move_model(game: LiveGame, direction: Direction):
+    dx, dy = VECTORS[direction]
+    head = game.snake[0]
+    new_head = Position(x=(head.x + dx) % GRID_SIZE, y=(head.y + dy) % GRID_SIZE)
+    if any(p.x == new_head.x and p.y == new_head.y for p in game.snake[:-1]):
+        raise RuntimeError("collision")
+    game.snake.insert(0, new_head)
+    game.snake.pop()
+
+
+def memory_per_game(factory, count: int = 2_000) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    games = [factory() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del games
+    return size / count
+
+
+def moves_per_second(game, move, moves: int) -> float:
+    directions = loop_directions()
+    offset = len(game.snake) - 1  # the head sits at LOOP[length - 1]
+    start = time.perf_counter()
+    for i in range(moves):
+        move(game, directions[(offset + i) % len(directions)])
+    return moves / (time.perf_counter() - start)
+
+
+def main(lengths, moves: int):
+    food = -1  # never eaten, so lengths stay fixed
+    print(f"{'length':>6}  {'LiveGame B/game':>16}  {'compact B/game':>15}  {'LiveGame moves/s':>17}  {'compact moves/s':>16}")
+    for length in lengths:
+        model_bytes = memory_per_game(lambda: make_model(length))
+        compact_bytes = memory_per_game(lambda: make_state(length))
+        model_rate = moves_per_second(make_model(length), move_model, moves)
+        compact_rate = moves_per_second(make_state(length), lambda g, d: g.snake.move(d, g.mode, food), moves)
+        print(f"{length:>6}  {model_bytes:>16,.0f}  {compact_bytes:>15,.0f}  {model_rate:>17,.0f}  {compact_rate:>16,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare LiveGame with the compact live game state.")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[3, 50, 200, 399])
+    parser.add_argument("--moves", type=int, default=100_000, help="Moves per measurement (default: 100000)")
+
+    args = parser.parse_args()
+    main(args.lengths, args.moves)
@@ -0,0 +1,103 @@
+"""
+Cost of going through the shared live game store.
+
+Starts a hub SocketLiveGameStore in a separate process with --games games,
+then times get_game, list_games and heartbeat calls from this process: once
+straight against a LocalLiveGameStore (one worker, LIVE_STORE=memory), and
+once through a client over the Unix socket, with --concurrency calls in
+flight.
+
+Usage:
+    uv run python benchmarks/bench_live_store.py --games 1000 --calls 20000
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from live_registry import LiveGameRegistry
+from live_state import CompactSnake, LiveGameState
+from live_store import LocalLiveGameStore, SocketLiveGameStore
+from live_stream import LiveGameEvents
+from presence import ViewerPresence
+from models import GameMode
+
+
+def local_store(games: int) -> LocalLiveGameStore:
+    warnings.simplefilter("ignore")
+    store = LocalLiveGameStore(LiveGameRegistry(), ViewerPresence(), LiveGameEvents())
+    for i in range(games):
+        store.games[f"game_{i}"] = LiveGameState(
+            id=f"game_{i}", playerId="u", playerName="P", mode=GameMode.WALLS,
+            snake=CompactSnake(range(20, 0, -1)), food=300,
+        )
+    return store
+
+
+def run_hub(path: str, games: int, ready):
+    async def serve():
+        hub = SocketLiveGameStore(path, local=local_store(games))
+        await hub.start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+async def timed(store, op: str, args) -> float:
+    calls = iter(range(args.calls))
+
+    async def worker():
+        for i in calls:
+            game_id = f"game_{i % args.games}"
+            if op == "get_game":
+                await store.get_game(game_id)
+            elif op == "list_games(limit=100)":
+                await store.list_games(limit=100)
+            else:
+                await store.heartbeat(game_id, f"viewer_{i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return args.calls / (time.perf_counter() - start)
+
+
+async def main(args):
+    ops = ["get_game", "heartbeat", "list_games(limit=100)"]
+    local = local_store(args.games)
+    in_process = {op: await timed(local, op, args) for op in ops}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/live.sock"
+        ready = multiprocessing.get_context("spawn").Event()
+        hub = multiprocessing.get_context("spawn").Process(target=run_hub, args=(path, args.games, ready), daemon=True)
+        hub.start()
+        ready.wait(30)
+        client = SocketLiveGameStore(path)
+        try:
+            over_socket = {op: await timed(client, op, args) for op in ops}
+        finally:
+            await client.stop()
+            hub.terminate()
+            hub.join()
+
+    print(f"{'calls/s':<26} {'memory':>10} {'socket':>10} {'overhead us':>12}")
+    for op in ops:
+        overhead_us = (1 / over_socket[op] - 1 / in_process[op]) * 1e6
+        print(f"{op:<26} {in_process[op]:>10.0f} {over_socket[op]:>10.0f} {overhead_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the local and socket live game stores.")
+    parser.add_argument("--games", type=int, default=1000, help="Live games held by the hub (default: 1000)")
+    parser.add_argument("--calls", type=int, default=20000, help="Calls per operation (default: 20000)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Calls in flight (default: 32)")
+
+    asyncio.run(main(parser.parse_args()))
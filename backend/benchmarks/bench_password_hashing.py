@@ -0,0 +1,93 @@
+"""
+Logins per second for different password hashing pool sizes.
+
+For each worker count, starts the app in a uvicorn subprocess with
+PASSWORD_HASH_WORKERS set (0 hashes on a thread inside the server process)
+and runs two groups of closed-loop clients: one logging in, one reading the
+leaderboard. The second group shows how much hashing slows down everything
+else in the server.
+
+Usage:
+    uv run python benchmarks/bench_password_hashing.py --workers 0 1 2 4
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+from bench_db_concurrency import PASSWORD, report, seed, start_server, wait_until_ready
+
+
+async def run_split_load(client: httpx.AsyncClient, emails, login_clients: int, read_clients: int, duration: float):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    deadline = time.monotonic() + duration
+
+    async def worker(name, make_request):
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                res = await make_request()
+                if res.status_code >= 400:
+                    errors[name] += 1
+            except httpx.HTTPError:
+                errors[name] += 1
+            latencies[name].append(time.perf_counter() - start)
+
+    def login():
+        return client.post("/auth/login", json={"email": random.choice(emails), "password": PASSWORD})
+
+    def read():
+        return client.get("/leaderboard", params={"mode": random.choice(["walls", "pass-through"])})
+
+    start = time.monotonic()
+    await asyncio.gather(
+        *(worker("POST /auth/login", login) for _ in range(login_clients)),
+        *(worker("GET /leaderboard", read) for _ in range(read_clients)),
+    )
+    return latencies, errors, time.monotonic() - start
+
+
+async def bench_workers(workers: int, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {"PASSWORD_HASH_WORKERS": str(workers), "PASSWORD_HASH_MAX_PENDING": str(args.max_pending)}
+        server = start_server(args.port, f"sqlite:///{tmp}/bench.db", env)
+        try:
+            limits = httpx.Limits(max_connections=args.login_clients + args.read_clients)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60, limits=limits) as client:
+                await wait_until_ready(client)
+                emails = seed(f"{tmp}/bench.db", args.users, 1)
+                print(
+                    f"\nPASSWORD_HASH_WORKERS={workers}: login_clients={args.login_clients} "
+                    f"read_clients={args.read_clients} duration={args.duration}s"
+                )
+                report(*await run_split_load(client, emails, args.login_clients, args.read_clients, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def main(args):
+    print(f"CPU cores: {os.cpu_count()}")
+    for workers in args.workers:
+        await bench_workers(workers, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark logins per second across hashing pool sizes.")
+    parser.add_argument("--port", type=int, default=8099, help="Port for the uvicorn subprocess (default: 8099)")
+    parser.add_argument("--users", type=int, default=50, help="Users logging in (default: 50)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, os.cpu_count() or 1],
+                        help="PASSWORD_HASH_WORKERS values to compare (default: 0 1 <cores>)")
+    parser.add_argument("--max-pending", type=int, default=64, help="PASSWORD_HASH_MAX_PENDING (default: 64)")
+    parser.add_argument("--login-clients", type=int, default=10, help="Clients logging in (default: 10)")
+    parser.add_argument("--read-clients", type=int, default=10, help="Clients reading the leaderboard (default: 10)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per run (default: 10)")
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,115 @@
+"""
+Best-per-player leaderboard page: player_best projection vs GROUP BY.
+
+Fills a SQLite database with --games rows spread over --players players,
+builds the projection, then times the first page of the distinct leaderboard
+both ways: a range scan of player_best, and the GROUP BY over every game that
+the projection replaces.
+
+Usage:
+    uv run python benchmarks/bench_player_best.py --games 1000000 --players 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import player_best
+import sql_models
+from db_setup import Base, apply_sqlite_profile
+
+
+def fill(db: Session, games: int, players: int):
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    chunk = 50_000
+    for offset in range(0, games, chunk):
+        rows = []
+        for i in range(offset, min(games, offset + chunk)):
+            user = rng.randrange(players)
+            rows.append({
+                "id": f"score_{i:019d}", "rank": 0, "userId": f"user_{user}", "username": f"player{user}",
+                "avatar": None, "score": rng.randrange(2000) * 10, "mode": rng.choice(["walls", "pass-through"]),
+                "date": start + timedelta(seconds=i),
+            })
+        db.execute(insert(sql_models.LeaderboardEntry), rows)
+    db.commit()
+
+
+def timed(fn, repeat: int) -> float:
+    fn()  # warm the page cache
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        apply_sqlite_profile(engine, "performance")
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            print(f"Filling {args.games:,} games for {args.players:,} players...")
+            fill(db, args.games, args.players)
+
+            start = time.perf_counter()
+            player_best.rebuild(db)
+            db.commit()
+            print(f"Projection rebuilt in {time.perf_counter() - start:.2f}s")
+
+            entry, best = sql_models.LeaderboardEntry, sql_models.PlayerBest
+
+            def projection_page():
+                return (
+                    db.query(best).filter(best.scope == "walls")
+                    .order_by(best.score.desc(), best.date, best.id).limit(args.limit).all()
+                )
+
+            def group_by_page():
+                return (
+                    db.query(entry.userId, func.max(entry.score).label("best"))
+                    .filter(entry.mode == "walls").group_by(entry.userId)
+                    .order_by(func.max(entry.score).desc()).limit(args.limit).all()
+                )
+
+            assert [r.score for r in projection_page()] == [r.best for r in group_by_page()]
+            projection_ms = timed(projection_page, args.repeat)
+            group_by_ms = timed(group_by_page, max(1, args.repeat // 10))
+
+            upsert_start = time.perf_counter()
+            rng = random.Random(7)
+            for i in range(args.upserts):
+                user = rng.randrange(args.players)
+                e = sql_models.LeaderboardEntry(
+                    id=f"score_x{i:018d}", userId=f"user_{user}", username=f"player{user}", avatar=None,
+                    score=rng.randrange(2000) * 10, mode="walls", date=datetime(2030, 1, 1),
+                )
+                player_best.upsert(db, [e])
+            db.commit()
+            upsert_us = (time.perf_counter() - upsert_start) / args.upserts * 1e6
+
+        print(f"{'distinct page (limit ' + str(args.limit) + ')':<32} {'ms':>10}")
+        print(f"{'player_best range scan':<32} {projection_ms:>10.3f}")
+        print(f"{'GROUP BY over leaderboard':<32} {group_by_ms:>10.3f}")
+        print(f"Upsert cost per submitted score: {upsert_us:.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the player_best projection against GROUP BY.")
+    parser.add_argument("--games", type=int, default=1_000_000, help="Leaderboard rows (default: 1000000)")
+    parser.add_argument("--players", type=int, default=1000, help="Distinct players (default: 1000)")
+    parser.add_argument("--limit", type=int, default=50, help="Page size (default: 50)")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed page reads (default: 200)")
+    parser.add_argument("--upserts", type=int, default=5000, help="Timed single-score upserts (default: 5000)")
+
+    main(parser.parse_args())
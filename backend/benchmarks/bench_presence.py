@@ -0,0 +1,92 @@
+"""
+Viewer presence: heartbeat throughput, expiry cost and memory.
+
+Registers --viewers viewers spread over --games games on a fake clock, then
+sends heartbeats at the rate a real client would (one per viewer every
+--interval seconds) for --seconds simulated seconds. A tenth of the viewers
+stop sending halfway through and expire. Reports heartbeats per second,
+time spent expiring, the cost of reading a viewer count, and traced memory.
+
+Usage:
+    uv run python benchmarks/bench_presence.py --viewers 500000 --games 5000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from presence import ViewerPresence
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def main(args):
+    clock = FakeClock()
+    viewers = [(f"game_{i % args.games}", f"viewer_{i}") for i in range(args.viewers)]
+    gc.collect()
+    tracemalloc.start()
+    presence = ViewerPresence(ttl=args.ttl, max_viewers=args.viewers, clock=clock)
+
+    start = time.perf_counter()
+    for game_id, viewer_id in viewers:
+        presence.heartbeat(game_id, viewer_id)
+    join_s = time.perf_counter() - start
+    memory_mib = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+
+    # Each second, the viewers whose turn it is send a heartbeat
+    rng = random.Random(1)
+    rng.shuffle(viewers)
+    quitters = set(viewers[: len(viewers) // 10])
+    per_second = len(viewers) // args.interval
+    sent, heartbeat_s, advance_s = 0, 0.0, 0.0
+    for second in range(args.seconds):
+        clock.now += 1
+        start = time.perf_counter()
+        presence.advance()
+        advance_s += time.perf_counter() - start
+
+        offset = (second % args.interval) * per_second
+        batch = viewers[offset : offset + per_second]
+        if second >= args.seconds // 2:
+            batch = [v for v in batch if v not in quitters]
+        start = time.perf_counter()
+        for game_id, viewer_id in batch:
+            presence.heartbeat(game_id, viewer_id)
+        heartbeat_s += time.perf_counter() - start
+        sent += len(batch)
+
+    start = time.perf_counter()
+    for i in range(100_000):
+        presence.count(f"game_{i % args.games}")
+    count_ns = (time.perf_counter() - start) / 100_000 * 1e9
+
+    print(f"{args.viewers:,} viewers over {args.games:,} games, ttl {args.ttl}s, heartbeat every {args.interval}s")
+    print(f"first heartbeat (join)     {args.viewers / join_s:>12,.0f} /s   memory {memory_mib:.1f} MiB")
+    print(f"repeat heartbeats          {sent / heartbeat_s:>12,.0f} /s   ({sent:,} sent)")
+    print(f"expiry (advance)           {advance_s / args.seconds * 1000:>12.3f} ms per second of wall time")
+    print(f"count(game)                {count_ns:>12.0f} ns")
+    print(f"still present              {len(presence):>12,}   expired {presence.stats()['expired']:,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark heartbeat-based viewer presence.")
+    parser.add_argument("--viewers", type=int, default=500_000, help="Viewers (default: 500000)")
+    parser.add_argument("--games", type=int, default=5000, help="Games they watch (default: 5000)")
+    parser.add_argument("--ttl", type=float, default=30.0, help="Presence ttl in seconds (default: 30)")
+    parser.add_argument("--interval", type=int, default=10, help="Seconds between a viewer's heartbeats (default: 10)")
+    parser.add_argument("--seconds", type=int, default=120, help="Simulated seconds (default: 120)")
+
+    main(parser.parse_args())
@@ -0,0 +1,60 @@
+"""
+Replay encoding: stored size and encode/decode throughput.
+
+Builds --games move logs of --ticks ticks each (a snake turning every few
+ticks, like a human player), then times Replay.from_moves + encode (the
+submission path) and decode + moves() (the streaming endpoint). Sizes are
+compared with the letters as sent by the client.
+
+Usage:
+    uv run python benchmarks/bench_replay.py --games 20000 --ticks 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from replay import Replay
+
+
+def make_moves(rng: random.Random, ticks: int) -> str:
+    moves, direction = [], "R"
+    while len(moves) < ticks:
+        moves.extend(direction * rng.randint(1, 8))
+        direction = rng.choice("UD" if direction in "LR" else "LR")
+    return "".join(moves[:ticks])
+
+
+def main(args):
+    rng = random.Random(1)
+    games = [(rng.getrandbits(32), make_moves(rng, args.ticks), 90_000) for _ in range(args.games)]
+
+    start = time.perf_counter()
+    encoded = [Replay.from_moves(seed, moves, duration).encode() for seed, moves, duration in games]
+    encode_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ticks = 0
+    for data in encoded:
+        for chunk in Replay.decode(data).moves():
+            ticks += len(chunk)
+    decode_s = time.perf_counter() - start
+    assert ticks == args.games * args.ticks
+
+    stored = sum(map(len, encoded)) / args.games
+    print(f"{args.games:,} games of {args.ticks:,} ticks")
+    print(f"stored size      {stored:>10.0f} bytes per game ({args.ticks:,} bytes as letters)")
+    print(f"encode           {args.games / encode_s:>10,.0f} games/s   {ticks / encode_s / 1e6:.1f}M ticks/s")
+    print(f"decode + stream  {args.games / decode_s:>10,.0f} games/s   {ticks / decode_s / 1e6:.1f}M ticks/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark replay encoding and decoding.")
+    parser.add_argument("--games", type=int, default=20_000, help="Replays (default: 20000)")
+    parser.add_argument("--ticks", type=int, default=1000, help="Ticks per game (default: 1000)")
+
+    main(parser.parse_args())
@@ -0,0 +1,98 @@
+"""
+Replay verification: per-submission latency and batch throughput.
+
+Builds --games walls-mode games of about --ticks ticks each (a snake that
+wanders the board and finally runs into a wall), then times check_replay()
+on single replays, as the submission path does, and ReplayVerifier.check_many()
+on the whole batch for each pool size in --workers (0 runs on a thread in
+this process).
+
+Usage:
+    uv run python benchmarks/bench_replay_verifier.py --games 5000 --ticks 1000 --workers 0 1 2 4
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_db_concurrency import percentile
+from live_state import GRID_SIZE
+from models import GameMode
+from replay import Replay
+from replay_verifier import ReplayVerifier, check_replay, simulate
+
+_STEPS = {"U": (0, -1), "D": (0, 1), "L": (-1, 0), "R": (1, 0)}
+_TURNS = {"U": "LR", "D": "LR", "L": "UD", "R": "UD"}
+
+
+def make_game(rng: random.Random, ticks: int):
+    """A wandering walls-mode game: (seed, moves, score), ending in a crash."""
+    seed = rng.getrandbits(32)
+    moves, direction, x, y = [], "R", 10, 10
+    while len(moves) < ticks:
+        dx, dy = _STEPS[direction]
+        if not (1 <= x + dx < GRID_SIZE - 1 and 1 <= y + dy < GRID_SIZE - 1) or rng.random() < 0.15:
+            # Turn towards the side with more room
+            a, b = _TURNS[direction]
+            room = {"U": y, "D": GRID_SIZE - 1 - y, "L": x, "R": GRID_SIZE - 1 - x}
+            direction = a if room[a] > room[b] else b
+            dx, dy = _STEPS[direction]
+        x, y = x + dx, y + dy
+        moves.append(direction)
+    # Then straight on into the wall
+    moves.extend(direction * GRID_SIZE)
+    replay = Replay.from_moves(seed, "".join(moves), 0)
+    result = simulate(GameMode.WALLS, replay)
+    # A long snake may run into itself first
+    return seed, "".join(moves[: result.ticks]), result.score, result.min_duration_ms
+
+
+def main(args):
+    rng = random.Random(1)
+    items = []
+    ticks = 0
+    for _ in range(args.games):
+        seed, moves, score, min_duration_ms = make_game(rng, args.ticks)
+        items.append((GameMode.WALLS.value, score, Replay.from_moves(seed, moves, min_duration_ms).encode()))
+        ticks += len(moves)
+    print(f"{args.games:,} games, {ticks / args.games:,.0f} ticks on average")
+
+    latencies = []
+    for mode, score, data in items[: args.single]:
+        start = time.perf_counter()
+        assert check_replay(mode, score, data) is None
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(
+        f"single check     p50 {percentile(latencies, 0.5):.2f} ms   p99 {percentile(latencies, 0.99):.2f} ms"
+        f"   {args.single * ticks / args.games / sum(latencies) / 1000:.2f}M ticks/s"
+    )
+
+    for workers in args.workers:
+        verifier = ReplayVerifier(workers, max_pending=1, chunk_size=args.chunk_size)
+        verifier.start()
+        try:
+            # Warm up the worker processes
+            asyncio.run(verifier.check_many(items[: args.chunk_size * max(workers, 1)]))
+            start = time.perf_counter()
+            reasons = asyncio.run(verifier.check_many(items))
+            elapsed = time.perf_counter() - start
+        finally:
+            verifier.shutdown()
+        assert reasons == [None] * len(items)
+        print(f"batch {workers} workers  {args.games / elapsed:>10,.0f} games/s   {ticks / elapsed / 1e6:.2f}M ticks/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark server-side replay verification.")
+    parser.add_argument("--games", type=int, default=5000, help="Replays (default: 5000)")
+    parser.add_argument("--ticks", type=int, default=1000, help="Target ticks per game (default: 1000)")
+    parser.add_argument("--single", type=int, default=500, help="Replays timed one by one (default: 500)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4], help="Pool sizes (default: 0 1 2 4)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Replays per pool task (default: 64)")
+
+    main(parser.parse_args())
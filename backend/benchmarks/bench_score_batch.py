@@ -0,0 +1,71 @@
+"""
+N single score submissions versus one batch of N.
+
+Starts the app in a uvicorn subprocess on a fresh SQLite file, then for each
+batch size records the same scores twice: once as N sequential
+POST /leaderboard/submit calls and once as a single
+POST /leaderboard/submit/batch.
+
+Usage:
+    uv run python benchmarks/bench_score_batch.py --sizes 10 100 1000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_db_concurrency import seed, start_server, wait_until_ready
+from bench_score_submissions import token_for
+
+
+def random_scores(n: int):
+    return [{"score": random.randrange(200) * 10, "mode": random.choice(["walls", "pass-through"])} for _ in range(n)]
+
+
+async def submit_singles(client: httpx.AsyncClient, headers, scores) -> float:
+    start = time.perf_counter()
+    for item in scores:
+        res = await client.post("/leaderboard/submit", json=item, headers=headers)
+        res.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def submit_batch(client: httpx.AsyncClient, headers, scores) -> float:
+    start = time.perf_counter()
+    res = await client.post("/leaderboard/submit/batch", json={"scores": scores}, headers=headers)
+    res.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_server(args.port, f"sqlite:///{tmp}/bench.db")
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120) as client:
+                await wait_until_ready(client)
+                headers = {"Authorization": f"Bearer {token_for(seed(f'{tmp}/bench.db', 1, 0)[0])}"}
+                print(f"{'N':>6} {'singles s':>10} {'scores/s':>9} {'batch s':>9} {'scores/s':>9} {'speedup':>8}")
+                for n in args.sizes:
+                    scores = random_scores(n)
+                    singles = await submit_singles(client, headers, scores)
+                    batch = await submit_batch(client, headers, scores)
+                    print(f"{n:>6} {singles:>10.3f} {n / singles:>9.0f} {batch:>9.3f} {n / batch:>9.0f} {singles / batch:>7.1f}x")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare N single score submissions with one batch of N.")
+    parser.add_argument("--port", type=int, default=8099, help="Port for the uvicorn subprocess (default: 8099)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Batch sizes (default: 10 100 1000)")
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,96 @@
+"""
+Throughput of concurrent score submissions under each SQLite profile.
+
+For every profile, starts the app in a uvicorn subprocess on a fresh SQLite
+file, seeds users, signs a token per user and runs closed-loop clients that
+POST /leaderboard/submit for a fixed duration. Every submission is a write
+transaction (new leaderboard row + user update), so this measures how well
+the journal mode copes with concurrent writers.
+
+Usage:
+    uv run python benchmarks/bench_score_submissions.py --concurrency 30 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+from jose import jwt
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_db_concurrency import report, seed, start_server, wait_until_ready
+from db_setup import SQLITE_PRAGMAS
+from main import ALGORITHM, SECRET_KEY
+
+
+def token_for(email: str) -> str:
+    expire = datetime.utcnow() + timedelta(hours=1)
+    return jwt.encode({"sub": email, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+async def run_submissions(client: httpx.AsyncClient, tokens, concurrency: int, duration: float):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    name = "POST /leaderboard/submit"
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        while time.monotonic() < deadline:
+            headers = {"Authorization": f"Bearer {random.choice(tokens)}"}
+            body = {"score": random.randrange(200) * 10, "mode": random.choice(["walls", "pass-through"])}
+            start = time.perf_counter()
+            try:
+                res = await client.post("/leaderboard/submit", json=body, headers=headers)
+                if res.status_code >= 400:
+                    errors[name] += 1
+            except httpx.HTTPError:
+                errors[name] += 1
+            latencies[name].append(time.perf_counter() - start)
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.monotonic() - start
+
+
+async def bench_profile(profile: str, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {"SQLITE_PROFILE": profile, "USER_RANK_INDEX": "0"}
+        server = start_server(args.port, f"sqlite:///{tmp}/bench.db", env)
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60, limits=limits) as client:
+                await wait_until_ready(client)
+                emails = seed(f"{tmp}/bench.db", args.users, 1)
+                tokens = [token_for(email) for email in emails]
+                print(f"\nSQLite profile '{profile}': concurrency={args.concurrency} duration={args.duration}s")
+                report(*await run_submissions(client, tokens, args.concurrency, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def main(args):
+    for profile in args.profiles:
+        await bench_profile(profile, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent score submissions per SQLite profile.")
+    parser.add_argument("--port", type=int, default=8099, help="Port for the uvicorn subprocess (default: 8099)")
+    parser.add_argument("--users", type=int, default=50, help="Users submitting scores (default: 50)")
+    parser.add_argument("--concurrency", type=int, default=30, help="Concurrent clients (default: 30)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per profile (default: 10)")
+    parser.add_argument(
+        "--profiles", nargs="+", default=list(SQLITE_PRAGMAS), choices=list(SQLITE_PRAGMAS),
+        help="SQLite profiles to compare (default: all)",
+    )
+
+    asyncio.run(main(parser.parse_args()))
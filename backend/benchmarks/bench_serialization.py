@@ -0,0 +1,120 @@
+"""
+CPU cost of encoding the list endpoints' responses, per endpoint, in process.
+
+For each endpoint, --rows rows are encoded two ways and the best of --repeat
+runs is reported:
+
+* models: what the routes did before. GET /leaderboard built one
+  LeaderboardEntry per row and encoded them with a TypeAdapter. GET /live-games
+  built one LiveGame per game (and one Position per segment), then FastAPI
+  validated them against response_model and encoded them again
+  (fastapi.routing.serialize_response, as the route would).
+* fast path: plain dicts from the rows, encoded by pydantic_core.to_json().
+
+Leaderboard rows come from the in-memory index (IndexedEntry) and as ORM
+objects (sql_models.LeaderboardEntry, not attached to a session). No database
+or server is involved; this is the encoding only.
+
+Usage:
+    uv run python benchmarks/bench_serialization.py --rows 10000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.routing import serialize_response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import sql_models
+from leaderboard_index import IndexedEntry
+from live_state import CELLS, CompactSnake, LiveGameState
+from main import _leaderboard_row, _to_leaderboard_entry, app
+from models import GameMode, GameStatus, LeaderboardEntry
+
+_leaderboard_json = TypeAdapter(List[LeaderboardEntry])
+_live_games_field = next(route.response_field for route in app.routes if getattr(route, "path", None) == "/live-games")
+
+
+def leaderboard_rows(n: int, orm: bool):
+    rng = random.Random(1)
+    start = datetime(2026, 1, 1)
+    cls = sql_models.LeaderboardEntry if orm else IndexedEntry
+    return [
+        cls(
+            id=f"entry_{i}", userId=f"user_{i % 1000}", username=f"player_{i % 1000}",
+            avatar=None if i % 3 else f"https://example.com/{i}.png", score=rng.randrange(10_000),
+            mode=rng.choice(["walls", "pass-through"]), date=start + timedelta(seconds=i, microseconds=i),
+        )
+        for i in range(n)
+    ]
+
+
+def live_games(n: int):
+    rng = random.Random(1)
+    games = []
+    for i in range(n):
+        # A straight-ish snake of typical length; only the encoded size matters here
+        start = rng.randrange(CELLS - 60)
+        games.append(LiveGameState(
+            id=f"game_{i}", playerId=f"user_{i}", playerName=f"player_{i}", mode=GameMode.WALLS,
+            snake=CompactSnake(range(start, start + rng.randint(3, 40))), food=rng.randrange(CELLS),
+            status=GameStatus.PLAYING, score=rng.randrange(500), viewers=rng.randrange(5),
+        ))
+    return games
+
+
+def best_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main(args):
+    print(f"{'endpoint':<28} {'models ms':>10} {'fast ms':>10} {'speedup':>8} {'KiB':>8}")
+
+    for label, rows in (("leaderboard (index rows)", leaderboard_rows(args.rows, orm=False)),
+                        ("leaderboard (ORM rows)", leaderboard_rows(args.rows, orm=True))):
+        def models():
+            return _leaderboard_json.dump_json([_to_leaderboard_entry(e, i + 1) for i, e in enumerate(rows)])
+
+        def fast():
+            return to_json([_leaderboard_row(e, i + 1) for i, e in enumerate(rows)])
+
+        assert models() == fast()
+        report(label, best_ms(models, args.repeat), best_ms(fast, args.repeat), len(fast()))
+
+    games = live_games(args.rows)
+
+    def models():
+        content = [game.to_model() for game in games]
+        return asyncio.run(serialize_response(field=_live_games_field, response_content=content, dump_json=True))
+
+    def fast():
+        return to_json([game.to_dict() for game in games])
+
+    assert models() == fast()
+    report("live-games", best_ms(models, args.repeat), best_ms(fast, args.repeat), len(fast()))
+
+
+def report(label: str, models_ms: float, fast_ms: float, size: int):
+    print(f"{label:<28} {models_ms:>10.1f} {fast_ms:>10.1f} {models_ms / fast_ms:>7.1f}x {size / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark encoding the list endpoints' responses.")
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per response (default: 10000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement; the best is reported (default: 20)")
+
+    main(parser.parse_args())
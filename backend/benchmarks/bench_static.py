@@ -0,0 +1,135 @@
+"""
+Serving the frontend with and without the static manifest.
+
+Builds a synthetic dist/ (an index.html and one hashed JS bundle, with .br and
+.gz siblings from frontend/scripts/compress.mjs when node is available, gzip
+only otherwise), starts the app in a uvicorn subprocess with STATIC_DIR
+pointing at it, and runs closed-loop readers of the index page and of the
+bundle for a fixed duration, once with STATIC_MANIFEST=0 and once with it on.
+Each run is repeated for three kinds of client: a plain one, a browser that
+accepts br and gzip, and one that revalidates with If-None-Match. Reports
+requests per second and the bytes on the wire per response.
+
+Usage:
+    uv run python benchmarks/bench_static.py --concurrency 20 --duration 5
+"""
+
+import argparse
+import asyncio
+import gzip
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_db_concurrency import percentile, start_server, wait_until_ready
+
+COMPRESS_SCRIPT = os.path.join(os.path.dirname(__file__), "..", "..", "frontend", "scripts", "compress.mjs")
+BUNDLE = "assets/index-B7xQ2mZk.js"
+CLIENTS = {
+    "plain": {"Accept-Encoding": "identity"},
+    "browser": {"Accept-Encoding": "gzip, deflate, br"},
+    "If-None-Match": {"Accept-Encoding": "gzip, deflate, br"},
+}
+
+
+def build_dist(root: str, bundle_kb: int):
+    """Writes a dist/ shaped like Vite's output, with code-like (moderately compressible) JS."""
+    rng = random.Random(1)
+    os.makedirs(os.path.join(root, "assets"))
+    with open(os.path.join(root, "index.html"), "w") as f:
+        f.write(
+            '<!doctype html><html lang="en"><head><meta charset="UTF-8" />'
+            '<meta name="viewport" content="width=device-width, initial-scale=1.0" /><title>Snake Arena</title>'
+            f'<script type="module" crossorigin src="/{BUNDLE}"></script></head>'
+            '<body><div id="root"></div></body></html>\n'
+        )
+    words = ["const", "return", "function", "props", "state", "useEffect", "snake", "score", "render", "=>", "null"]
+    lines, size = [], 0
+    while size < bundle_kb * 1024:
+        name = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 8)))
+        line = f"{rng.choice(words)} {name}={rng.randint(0, 99999)},{' '.join(rng.choices(words, k=6))};"
+        lines.append(line)
+        size += len(line)
+    with open(os.path.join(root, BUNDLE), "w") as f:
+        f.write("".join(lines))
+
+    if shutil.which("node"):
+        subprocess.run(["node", COMPRESS_SCRIPT, root], check=True)
+    else:
+        for path in ("index.html", BUNDLE):
+            with open(os.path.join(root, path), "rb") as f:
+                data = f.read()
+            with open(os.path.join(root, path + ".gz"), "wb") as f:
+                f.write(gzip.compress(data, 9))
+
+
+async def read_load(client: httpx.AsyncClient, path: str, kind: str, args):
+    latencies, wire_bytes = [], 0
+    deadline = time.monotonic() + args.duration
+
+    async def worker():
+        nonlocal wire_bytes
+        etag = None
+        while time.monotonic() < deadline:
+            headers = dict(CLIENTS[kind])
+            if kind == "If-None-Match" and etag:
+                headers["If-None-Match"] = etag
+            start = time.perf_counter()
+            # Stream so the body is counted as sent, not decoded
+            async with client.stream("GET", path, headers=headers) as res:
+                async for chunk in res.aiter_raw():
+                    wire_bytes += len(chunk)
+            latencies.append(time.perf_counter() - start)
+            assert res.status_code in (200, 304), res.status_code
+            etag = res.headers.get("ETag")
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return latencies, wire_bytes, time.monotonic() - start
+
+
+async def run(manifest: bool, dist: str, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {"STATIC_DIR": dist, "STATIC_MANIFEST": "1" if manifest else "0"}
+        server = start_server(args.port, f"sqlite:///{tmp}/bench.db", env)
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60, limits=limits) as client:
+                await wait_until_ready(client)
+                for path in ("/", f"/{BUNDLE}"):
+                    for kind in CLIENTS:
+                        latencies, wire_bytes, elapsed = await read_load(client, path, kind, args)
+                        label = f"{'manifest' if manifest else 'no manifest'} {'index' if path == '/' else 'bundle'} / {kind}"
+                        print(
+                            f"{label:<36} {len(latencies) / elapsed:>8.1f} {percentile(latencies, 0.5) * 1000:>8.1f} "
+                            f"{percentile(latencies, 0.99) * 1000:>8.1f} {wire_bytes / len(latencies):>10.0f}"
+                        )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as dist:
+        build_dist(dist, args.bundle_kb)
+        print(f"{'run':<36} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'bytes/req':>10}")
+        await run(False, dist, args)
+        await run(True, dist, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark serving the frontend with and without the static manifest.")
+    parser.add_argument("--port", type=int, default=8099, help="Port for the uvicorn subprocess (default: 8099)")
+    parser.add_argument("--bundle-kb", type=int, default=200, help="Size of the JS bundle in KiB (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent readers (default: 20)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per path and client kind (default: 5)")
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,251 @@
+"""
+Server-side bots that play live games for spectators.
+
+``choose_directions()`` picks the next move for many engine slots in one
+batched pass. Boards are bitboards, one ``uint32`` per row, so one NumPy
+operation works on every board at once:
+
+1. A breadth-first search grows outwards from each food over the free cells
+   (the tail moves away this tick, so it counts as free). The first layer
+   that touches a legal neighbour of the head gives the first step of a
+   shortest path.
+2. A flood fill from the tail finds which moves keep the tail reachable,
+   so following the path can't seal the snake into a pocket.
+
+Both run in the same batch, and a board drops out as soon as it is resolved.
+3. A bot takes the path to the food when that move is safe. Otherwise it
+   takes another safe move, or, if none is left, the move with the most
+   room.
+
+``BotFleet`` keeps ``size`` bot games running in a ``GameEngine``. It is one
+of the engine's policies, so it steers every bot just before each step, and
+it starts a new game whenever a bot's game ends.
+"""
+
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from game_engine import DIRECTIONS, NEIGHBOURS, GameEngine
+from ids import new_id
+from live_state import CELLS, GRID_SIZE
+from models import GameMode
+
+ROW_MASK = (1 << GRID_SIZE) - 1
+_COLUMN_SHIFTS = np.arange(GRID_SIZE, dtype=np.uint32)
+
+
+def to_bitboards(cells: np.ndarray) -> np.ndarray:
+    """(n, CELLS) booleans to (n, GRID_SIZE) rows of bits, bit x set for column x."""
+    rows = cells.reshape(-1, GRID_SIZE, GRID_SIZE).astype(np.uint32) << _COLUMN_SHIFTS
+    return rows.sum(axis=2, dtype=np.uint32)
+
+
+def _single_cells(cells: np.ndarray) -> np.ndarray:
+    boards = np.zeros((len(cells), GRID_SIZE), dtype=np.uint32)
+    boards[np.arange(len(cells)), cells // GRID_SIZE] = np.uint32(1) << (cells % GRID_SIZE).astype(np.uint32)
+    return boards
+
+
+def _bit_at(boards: np.ndarray, cells: np.ndarray) -> np.ndarray:
+    """Whether each board has ``cells`` set; ``cells`` is (n, k), -1 reads as unset."""
+    safe = np.maximum(cells, 0)
+    bits = (boards[np.arange(len(boards))[:, None], safe // GRID_SIZE] >> (safe % GRID_SIZE).astype(np.uint32)) & 1
+    return (bits == 1) & (cells >= 0)
+
+
+def _cells_mask(cells: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """(n, k) cells to one board per row with the ``present`` ones set."""
+    boards = np.zeros((len(cells), GRID_SIZE), dtype=np.uint32)
+    rows = np.arange(len(cells))
+    for k in range(cells.shape[1]):
+        at = rows[present[:, k]]
+        cell = cells[at, k]
+        boards[at, cell // GRID_SIZE] |= np.uint32(1) << (cell % GRID_SIZE).astype(np.uint32)
+    return boards
+
+
+def _expand(boards: np.ndarray, wrap: np.ndarray) -> np.ndarray:
+    """Every cell one move away from a set cell. ``wrap`` is ROW_MASK on
+    pass-through boards and 0 on walls boards, shape (n, 1)."""
+    out = boards << 1
+    out |= boards >> 1
+    out |= ((boards >> (GRID_SIZE - 1)) | (boards << (GRID_SIZE - 1))) & wrap
+    out &= ROW_MASK
+    out[:, :-1] |= boards[:, 1:]
+    out[:, 1:] |= boards[:, :-1]
+    out[:, -1] |= boards[:, 0] & wrap[:, 0]
+    out[:, 0] |= boards[:, -1] & wrap[:, 0]
+    return out
+
+
+def _search(free, wrap, start, neighbours, legal, until_all) -> np.ndarray:
+    """Grow a region from ``start`` over the free cells, one move per step,
+    until it reaches a legal neighbour of the head (all of them where
+    ``until_all``) or stops growing. Returns the moves reached by then."""
+    reached = np.zeros(legal.shape, dtype=np.bool_)
+    pending = np.arange(len(free))
+    finished = np.zeros(len(free), dtype=np.bool_)
+    targets = _cells_mask(neighbours, legal)
+    region = _single_cells(start)
+    for _ in range(CELLS):
+        grown = (_expand(region, wrap) & free) | region
+        covered = region & targets
+        done = np.where(until_all, (covered == targets).all(axis=1), covered.any(axis=1))
+        done |= (grown == region).all(axis=1)
+        done &= ~finished
+        if done.any():
+            reached[pending[done]] = legal[done] & _bit_at(region[done], neighbours[done])
+            finished |= done
+            if finished.all():
+                break
+        region = grown
+        # Drop finished boards from the batch once there are enough of them to be worth copying
+        if np.count_nonzero(finished) * 4 >= len(finished):
+            keep = ~finished
+            pending, free, wrap, neighbours, legal, targets, until_all, region, finished = (
+                a[keep] for a in (pending, free, wrap, neighbours, legal, targets, until_all, region, finished)
+            )
+    return reached
+
+
+def _room(free, wrap, start) -> np.ndarray:
+    """Cells reachable from ``start`` (which is not itself free)."""
+    room = np.zeros(len(free), dtype=np.int32)
+    pending = np.arange(len(free))
+    region = _single_cells(start)
+    for _ in range(CELLS):
+        grown = (_expand(region, wrap) & free) | region
+        stuck = (grown == region).all(axis=1)
+        room[pending[stuck]] = np.bitwise_count(region[stuck]).sum(axis=1)
+        if stuck.all():
+            break
+        keep = ~stuck
+        pending, free, wrap, region = pending[keep], free[keep], wrap[keep], grown[keep]
+    return room
+
+
+def choose_directions(engine: GameEngine, slots: np.ndarray) -> np.ndarray:
+    """Next direction (index into DIRECTIONS) for each playing slot in ``slots``."""
+    n = len(slots)
+    rows = np.arange(n)
+    length = engine.length[slots]
+    head_ptr = engine.head_ptr[slots]
+    head = engine.body[slots, head_ptr]
+    tail = engine.body[slots, (head_ptr - length + 1) % CELLS]
+    food = engine.food[slots]
+    walls = engine.walls[slots]
+
+    # What blocks a move this tick: the body, except the tail, which moves on
+    blocked = engine.occupied[slots]
+    blocked[rows, tail] = False
+    neighbours = NEIGHBOURS[walls.astype(np.intp), head]
+    legal = (neighbours >= 0) & ~blocked[rows[:, None], np.maximum(neighbours, 0)]
+    free = ~to_bitboards(blocked) & ROW_MASK
+    wrap = np.where(walls, 0, ROW_MASK).astype(np.uint32)[:, None]
+
+    # Both searches in one batch: breadth-first out from the food, stopping at
+    # the first layer that reaches the head, and a fill from the tail, which
+    # a move keeps within reach if the fill reaches its cell (a path from the
+    # new head never passes back through it)
+    reached = _search(
+        np.concatenate([free, free]), np.concatenate([wrap, wrap]), np.concatenate([food, tail]),
+        np.concatenate([neighbours, neighbours]), np.concatenate([legal, legal]),
+        np.repeat([False, True], n),
+    )
+    shortest, safe = reached[:n], reached[n:]
+
+    # A shortest path to the food if it is safe, else any safe move
+    rank = safe * 2 + legal + 4 * (shortest & safe)
+    directions = rank.argmax(axis=1).astype(np.int8)
+
+    # Cornered: take the legal move with the most room, to last longest
+    cornered = np.flatnonzero(legal.any(axis=1) & ~safe.any(axis=1))
+    if len(cornered):
+        board, d = np.nonzero(legal[cornered])
+        start = neighbours[cornered[board], d]
+        room = np.full((len(cornered), len(DIRECTIONS)), -1, dtype=np.int32)
+        room[board, d] = _room(free[cornered[board]] & ~_single_cells(start), wrap[cornered[board]], start)
+        directions[cornered] = room.argmax(axis=1)
+
+    # No legal move left: carry on and crash
+    trapped = ~legal.any(axis=1)
+    directions[trapped] = engine.direction[slots[trapped]]
+    return directions
+
+
+class BotFleet:
+    def __init__(
+        self,
+        engine: GameEngine,
+        size: int,
+        seed: Optional[int] = None,
+        choose: Callable[[GameEngine, np.ndarray], np.ndarray] = choose_directions,
+    ):
+        self.engine = engine
+        self.size = size
+        self.choose = choose
+        self._rng = random.Random(seed)
+        self._game_ids: List[str] = []
+        self._next_bot = 1
+
+        self.spawned = 0
+        self.decisions = 0
+        self.last_steer_ms = 0.0
+        self.avg_steer_ms = 0.0
+        self.steers = 0
+
+    def start(self):
+        if self.steer not in self.engine.policies:
+            self.engine.policies.append(self.steer)
+
+    def stop(self):
+        if self.steer in self.engine.policies:
+            self.engine.policies.remove(self.steer)
+
+    def _spawn(self) -> str:
+        bot = self._next_bot
+        self._next_bot += 1
+        game = self.engine.spawn(
+            new_id("game"), f"bot_{bot}", f"Bot {bot}", self._rng.choice([GameMode.WALLS, GameMode.PASS_THROUGH])
+        )
+        self.spawned += 1
+        return game.id
+
+    def steer(self):
+        """Replace finished bot games, then set every bot's next direction."""
+        start = time.perf_counter()
+        slots = []
+        running = []
+        for game_id in self._game_ids:
+            slot = self.engine.slot_of(game_id)
+            if slot is not None:
+                slots.append(slot)
+                running.append(game_id)
+        while len(running) < self.size:
+            game_id = self._spawn()
+            slots.append(self.engine.slot_of(game_id))
+            running.append(game_id)
+        self._game_ids = running
+
+        if slots:
+            slots = np.array(slots)
+            self.engine.set_directions(slots, self.choose(self.engine, slots))
+            self.decisions += len(slots)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.steers += 1
+        self.last_steer_ms = elapsed_ms
+        self.avg_steer_ms += (elapsed_ms - self.avg_steer_ms) * (0.1 if self.steers > 1 else 1.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "bots": len(self._game_ids),
+            "size": self.size,
+            "spawned": self.spawned,
+            "decisions": self.decisions,
+            "last_steer_ms": round(self.last_steer_ms, 3),
+            "avg_steer_ms": round(self.avg_steer_ms, 3),
+        }
@@ -0,0 +1,225 @@
+"""
+Fan-out of spectator stream frames.
+
+With one ``LiveGameStream`` per WebSocket, every viewer of a game works out
+and JSON-encodes the same delta. A slow viewer also sees the game stall,
+because its handler only reads the game between sends. Instead, each watched
+game has one ``GameChannel``. On every change the channel computes the frame
+once, encodes it once into an immutable ``str``, and appends that same
+object to each subscriber's bounded queue.
+
+A subscriber whose queue is full (its socket is not keeping up) loses its
+queued frames and is marked for resync. The next frame it gets is a fresh
+snapshot, also encoded once and shared by everyone resyncing from the same
+state. Publishing never waits on a subscriber.
+
+On the live game hub, channels are driven by ``LiveGameEvents``. Workers
+that don't hold the games pass ``poll`` to ``subscribe()``: one task per
+watched game then fetches the state every ``poll_interval`` seconds, however
+many viewers there are. A failed poll is retried with exponential backoff;
+after ``poll_retries`` failures in a row the channel is marked ``failed`` and
+its subscribers are closed, so viewers can reconnect rather than wait on a
+stream that no longer moves. Like the rest of the live game code this must only
+be used from the event loop.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+
+from live_state import LiveGameState
+from live_stream import LiveGameStream
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between retries of a failed poll, in seconds
+MAX_POLL_BACKOFF = 5.0
+
+
+class Subscriber:
+    __slots__ = ("channel", "queue", "resync", "closed", "_wakeup")
+
+    def __init__(self, channel: "GameChannel", maxsize: int):
+        self.channel = channel
+        self.queue: Deque[str] = deque(maxlen=maxsize)
+        self.resync = False
+        self.closed = False
+        self._wakeup = asyncio.Event()
+
+    def _push(self, frame: str):
+        if self.resync:
+            self.channel.dropped += 1
+            return
+        if len(self.queue) == self.queue.maxlen:
+            # Too far behind: drop everything queued and start over from a snapshot
+            self.channel.dropped += len(self.queue) + 1
+            self.channel.resyncs += 1
+            self.queue.clear()
+            self.resync = True
+        else:
+            self.queue.append(frame)
+        self._wakeup.set()
+
+    def _close(self):
+        self.closed = True
+        self._wakeup.set()
+
+    def close(self):
+        """Stop waiting for frames, e.g. when the viewer has gone; ``get()`` returns None."""
+        self.queue.clear()
+        self.resync = False
+        self._close()
+
+    async def get(self) -> Optional[str]:
+        """Next encoded frame to send, or None once the game is gone."""
+        while True:
+            if self.resync and not self.closed:
+                self.resync = False
+                snapshot = self.channel.snapshot()
+                # The snapshot already includes anything queued while it was built
+                self.queue.clear()
+                if snapshot is not None:
+                    return snapshot
+            if self.queue:
+                return self.queue.popleft()
+            if self.closed:
+                return None
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+
+class GameChannel:
+    def __init__(self, game_id: str, game: LiveGameState, queue_size: int):
+        self.game_id = game_id
+        self.game: Optional[LiveGameState] = game
+        self.queue_size = queue_size
+        self.subscribers: Set[Subscriber] = set()
+        # What every subscriber has been sent up to the last frame
+        self._stream = LiveGameStream(game)
+        self._snapshot: Optional[str] = None
+        self.poller: Optional[asyncio.Task] = None
+        # Set when polling gave up; subscribers are closed, but the game may go on
+        self.failed = False
+
+        self.frames = 0
+        self.bytes_encoded = 0
+        self.deliveries = 0
+        self.dropped = 0
+        self.resyncs = 0
+        self.poll_errors = 0
+
+    def publish(self, game: Optional[LiveGameState]):
+        """Fan the change since the last frame out to every subscriber."""
+        if game is None:
+            self.game = None
+            for subscriber in self.subscribers:
+                subscriber._close()
+            return
+        self.game = game
+        frame = self._stream.next_frame(game)
+        if frame is None:
+            return
+        encoded = json.dumps(frame)
+        self._snapshot = encoded if frame["type"] == "snapshot" else None
+        self.frames += 1
+        self.bytes_encoded += len(encoded)
+        self.deliveries += len(self.subscribers)
+        for subscriber in self.subscribers:
+            subscriber._push(encoded)
+
+    def snapshot(self) -> Optional[str]:
+        """The whole game as of the latest frame, encoded once per frame."""
+        if self.game is None:
+            return None
+        # Send out any change not published yet, so the snapshot and the
+        # deltas that follow it start from the same state
+        self.publish(self.game)
+        if self._snapshot is None:
+            self._snapshot = json.dumps(self._stream.snapshot(self.game))
+            self.bytes_encoded += len(self._snapshot)
+        return self._snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscribers),
+            "frames": self.frames,
+            "bytes_encoded": self.bytes_encoded,
+            "deliveries": self.deliveries,
+            "dropped": self.dropped,
+            "resyncs": self.resyncs,
+            "poll_errors": self.poll_errors,
+        }
+
+
+class LiveGameBroadcaster:
+    def __init__(self, queue_size: int = 32, poll_interval: float = 0.12, poll_retries: int = 8):
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.poll_retries = poll_retries
+        self._channels: Dict[str, GameChannel] = {}
+
+    def subscribe(
+        self,
+        game: LiveGameState,
+        poll: Optional[Callable[[str], Awaitable[Optional[LiveGameState]]]] = None,
+    ) -> Subscriber:
+        """Start following a game; the first ``get()`` returns a snapshot."""
+        channel = self._channels.get(game.id)
+        if channel is None or channel.game is None:
+            # A channel whose game ended or whose polling failed never sends again
+            channel = self._channels[game.id] = GameChannel(game.id, game, self.queue_size)
+            if poll is not None:
+                channel.poller = asyncio.create_task(self._poll(channel, poll))
+        subscriber = Subscriber(channel, self.queue_size)
+        subscriber.resync = True
+        channel.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        channel = subscriber.channel
+        channel.subscribers.discard(subscriber)
+        if not channel.subscribers and self._channels.get(channel.game_id) is channel:
+            del self._channels[channel.game_id]
+            if channel.poller is not None:
+                channel.poller.cancel()
+
+    def publish(self, game_id: str, game: Optional[LiveGameState]):
+        channel = self._channels.get(game_id)
+        if channel is not None:
+            channel.publish(game)
+
+    async def _poll(self, channel: GameChannel, poll):
+        failures = 0
+        while channel.game is not None:
+            await asyncio.sleep(min(self.poll_interval * 2 ** failures, MAX_POLL_BACKOFF))
+            try:
+                game = await poll(channel.game_id)
+            except Exception:
+                failures += 1
+                channel.poll_errors += 1
+                if failures > self.poll_retries:
+                    logger.exception("Giving up on live game %s after %d failed polls", channel.game_id, failures)
+                    channel.failed = True
+                    channel.publish(None)
+                    return
+                logger.warning("Polling live game %s failed; retrying", channel.game_id, exc_info=failures == 1)
+                continue
+            failures = 0
+            channel.publish(game)
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        channels = list(self._channels.values())
+        busiest = heapq.nlargest(top, channels, key=lambda c: len(c.subscribers))
+        return {
+            "games": len(channels),
+            "subscribers": sum(len(c.subscribers) for c in channels),
+            "frames": sum(c.frames for c in channels),
+            "deliveries": sum(c.deliveries for c in channels),
+            "dropped": sum(c.dropped for c in channels),
+            "resyncs": sum(c.resyncs for c in channels),
+            "poll_errors": sum(c.poll_errors for c in channels),
+            "busiest": {c.game_id: c.stats() for c in busiest},
+        }
@@ -1,10 +1,84 @@
-from typing import Dict
-from models import LiveGame
-from db_setup import engine, Base
+import contextlib
+import fcntl
+import gc
+import hashlib
+import os
+import tempfile
+from live_registry import LiveGameRegistry
+from db_setup import SQLALCHEMY_DATABASE_URL, engine, Base, SessionLocal
+from leaderboard_index import LeaderboardIndex
+from user_rank import UserRankIndex
+from sqlalchemy import text
+import player_best
+import sql_models
 
-# Ephemeral store for live games (high frequency updates, no need for persistence)
-live_games: Dict[str, LiveGame] = {}
+# Ephemeral store for live games (high frequency updates, no need for persistence),
+# bounded and self-evicting
+live_games = LiveGameRegistry(
+    maxsize=int(os.getenv("LIVE_GAMES_MAX", "10000")),
+    game_over_ttl=float(os.getenv("LIVE_GAME_OVER_TTL", "60")),
+    idle_ttl=float(os.getenv("LIVE_GAME_IDLE_TTL", "600")),
+)
 
-def init_db():
+# Ranked copy of the leaderboard table, served without touching the database
+leaderboard_index = LeaderboardIndex()
+
+# Rank structure over users.highScore ("exact" or "approximate")
+user_rank_index = UserRankIndex(os.getenv("USER_RANK_MODE", "exact"))
+
+def _create_schema():
     Base.metadata.create_all(bind=engine)
+    # create_all() skips indexes on tables that already exist
+    for index in sql_models.LeaderboardEntry.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+# pg_advisory_lock() key for init_db(); any constant shared by every replica
+_SCHEMA_LOCK_KEY = 0x736E616B
+
+@contextlib.contextmanager
+def _schema_lock():
+    """
+    Serialize init_db() between processes.
+
+    CREATE TABLE after an existence check races when uvicorn --workers start
+    together, and so does the player_best backfill. Workers on one host take
+    a file lock; on PostgreSQL an advisory lock also covers other hosts.
+    """
+    url_hash = hashlib.sha1(SQLALCHEMY_DATABASE_URL.encode()).hexdigest()[:16]
+    with open(os.path.join(tempfile.gettempdir(), f"snake-arena-schema-{url_hash}.lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        if engine.dialect.name != "postgresql":
+            yield
+            return
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _SCHEMA_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _SCHEMA_LOCK_KEY})
+
+def init_db():
+    with _schema_lock():
+        _create_schema()
+        db = SessionLocal()
+        try:
+            # Databases from before the projection existed start out empty
+            if player_best.needs_backfill(db):
+                player_best.rebuild(db)
+                db.commit()
+        finally:
+            db.close()
 
+def load_rank_indexes(leaderboard: bool = True, users: bool = True, freeze: bool = True):
+    """Load the enabled indexes; with ``freeze``, move everything allocated so far out of GC scans."""
+    db = SessionLocal()
+    try:
+        if leaderboard:
+            leaderboard_index.load(db)
+        if users:
+            user_rank_index.load(db)
+    finally:
+        db.close()
+    if freeze and (leaderboard or users):
+        # Keep the collector from rescanning the (long-lived) index nodes
+        gc.freeze()
@@ -1,14 +1,77 @@
+import functools
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from anyio import CapacityLimiter, to_thread
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./snake_arena.db")
 
-connect_args = {"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {}
+# Connection pool (ignored for in-memory SQLite, which uses a single connection)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "0") == "1"
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args=connect_args
-)
+# "performance" (WAL, synchronous=NORMAL, mmap, larger cache) or "default"
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "performance")
+SQLITE_PRAGMAS = {
+    "default": {},
+    "performance": {
+        "journal_mode": "WAL",
+        # Safe with WAL: a power loss can drop the last commits but not corrupt the file
+        "synchronous": "NORMAL",
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        # Negative values are KiB
+        "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+    },
+}
+
+# Worker threads for database-bound routes. The default matches the pool
+# (pool_size + max_overflow) so a thread never waits on a connection.
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+db_limiter = CapacityLimiter(DB_THREADPOOL_SIZE)
+
+
+def engine_options(url: str) -> dict:
+    if not url.startswith("sqlite"):
+        return {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_pre_ping": DB_POOL_PRE_PING,
+            "pool_recycle": DB_POOL_RECYCLE,
+        }
+    options = {"connect_args": {"check_same_thread": False}}
+    if ":memory:" not in url and "mode=memory" not in url:
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    return options
+
+
+def apply_sqlite_profile(engine: Engine, profile: str = SQLITE_PROFILE):
+    """Run the profile's PRAGMAs on every new connection of a SQLite engine."""
+    if profile not in SQLITE_PRAGMAS:
+        raise ValueError(f"Unknown SQLite profile: {profile}")
+    pragmas = SQLITE_PRAGMAS[profile]
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+if engine.dialect.name == "sqlite":
+    apply_sqlite_profile(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -19,3 +82,27 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def db_offload(fn):
+    """
+    Run a synchronous route or dependency on the bounded database thread pool.
+
+    The wrapper is a coroutine, so the event loop never blocks on a query.
+    Sessions passed in are closed before the thread is released, which hands
+    their connection back to the pool; at most DB_THREADPOOL_SIZE connections
+    are ever checked out by routes. A closed Session can still be used again,
+    so a session shared with a dependency keeps working.
+    """
+    def call(args, kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            for value in kwargs.values():
+                if isinstance(value, Session):
+                    value.close()
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await to_thread.run_sync(call, args, kwargs, limiter=db_limiter)
+
+    return wrapper
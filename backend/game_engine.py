@@ -0,0 +1,343 @@
+"""
+Server-side tick engine for live games.
+
+All active games share one set of NumPy arrays (one row per game slot), so a
+tick computes movement, wrap-around, wall and self collisions, eating and
+food respawn for every game at once. The rules match ``moveSnake`` in the
+frontend's ``useGameLogic.ts``: a 20x20 grid, +10 per food, the tail cell is
+not an obstacle, and a collision ends the game without moving the snake.
+
+After each step the engine writes the changes back to the ``LiveGameState``
+objects that the REST and WebSocket routes read. That work is O(1) per game.
+
+Only games created with ``spawn()`` (today, the bots in bots.py) hold a slot
+and are simulated. Games put into ``games`` another way, e.g. through
+``LiveGameStore.add_game``, are driven by whoever feeds them and are never
+stepped or adopted by the engine.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from models import Direction, GameMode, GameStatus
+from live_state import CELLS, FOOD_SCORE, GRID_SIZE, CompactSnake, LiveGameState, to_cell
+
+logger = logging.getLogger(__name__)
+
+INITIAL_SNAKE = [(10, 10), (9, 10), (8, 10)]
+
+# Row order matches DIRECTIONS in the frontend: UP, DOWN, LEFT, RIGHT
+DIRECTIONS = [Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT]
+DIRECTION_INDEX = {d: i for i, d in enumerate(DIRECTIONS)}
+DX = np.array([0, 0, -1, 1], dtype=np.int16)
+DY = np.array([-1, 1, 0, 0], dtype=np.int16)
+OPPOSITE = np.array([1, 0, 3, 2], dtype=np.int8)
+
+
+def _neighbour_table(walls: bool) -> np.ndarray:
+    cell = np.arange(CELLS)
+    x = cell[:, None] % GRID_SIZE + DX
+    y = cell[:, None] // GRID_SIZE + DY
+    table = (np.mod(y, GRID_SIZE) * GRID_SIZE + np.mod(x, GRID_SIZE)).astype(np.int16)
+    if walls:
+        table[(x < 0) | (x >= GRID_SIZE) | (y < 0) | (y >= GRID_SIZE)] = -1
+    return table
+
+
+# The move rules in one place, shared by the engine, bots.py and replay_verifier.py:
+# NEIGHBOURS[walls, cell, d] is the cell that direction d (DIRECTIONS order)
+# leads to from ``cell``; pass-through wraps, walls gives -1 off the board
+NEIGHBOURS = np.stack([_neighbour_table(False), _neighbour_table(True)])
+
+
+class TickResult:
+    """Slots touched by one step, for writing changes back to LiveGameState objects."""
+
+    __slots__ = ("moved", "ate", "crashed", "new_heads", "new_food")
+
+    def __init__(self, moved, ate, crashed, new_heads, new_food):
+        self.moved = moved
+        self.ate = ate
+        self.crashed = crashed
+        self.new_heads = new_heads
+        self.new_food = new_food
+
+
+class GameEngine:
+    def __init__(
+        self,
+        games: Dict[str, LiveGameState],
+        tick_seconds: float = 0.12,
+        capacity: int = 256,
+        seed: Optional[int] = None,
+        on_tick: Optional[Callable[[List[str]], None]] = None,
+    ):
+        self.games = games
+        self.tick_seconds = tick_seconds
+        self.on_tick = on_tick
+        # Called before every step, e.g. to steer bots; see bots.py
+        self.policies: List[Callable[[], None]] = []
+        self._rng = np.random.default_rng(seed)
+        self._slot_ids: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._allocate(capacity)
+        self._task: Optional[asyncio.Task] = None
+
+        self.ticks = 0
+        self.last_tick_ms = 0.0
+        self.avg_tick_ms = 0.0
+        self.max_tick_ms = 0.0
+        self.last_games_per_tick = 0
+
+    # --- State arrays ---
+
+    def _allocate(self, capacity: int):
+        old = len(self._slot_ids)
+        self.playing = self._grow(getattr(self, "playing", None), capacity, np.bool_)
+        self.walls = self._grow(getattr(self, "walls", None), capacity, np.bool_)
+        self.direction = self._grow(getattr(self, "direction", None), capacity, np.int8)
+        self.next_direction = self._grow(getattr(self, "next_direction", None), capacity, np.int8)
+        # Ring buffer of cell indices (y * GRID_SIZE + x); head_ptr points at the head
+        self.body = self._grow(getattr(self, "body", None), (capacity, CELLS), np.int16)
+        self.head_ptr = self._grow(getattr(self, "head_ptr", None), capacity, np.int32)
+        self.length = self._grow(getattr(self, "length", None), capacity, np.int32)
+        self.occupied = self._grow(getattr(self, "occupied", None), (capacity, CELLS), np.bool_)
+        self.food = self._grow(getattr(self, "food", None), capacity, np.int16)
+        self.score = self._grow(getattr(self, "score", None), capacity, np.int32)
+        self._slot_ids.extend([None] * (capacity - old))
+        self._free.extend(reversed(range(old, capacity)))
+
+    @staticmethod
+    def _grow(array, shape, dtype):
+        grown = np.zeros(shape, dtype=dtype)
+        if array is not None:
+            grown[: len(array)] = array
+        return grown
+
+    @property
+    def capacity(self) -> int:
+        return len(self._slot_ids)
+
+    @property
+    def active_games(self) -> int:
+        return int(np.count_nonzero(self.playing))
+
+    # --- Game lifecycle ---
+
+    def spawn(
+        self,
+        game_id: str,
+        player_id: str,
+        player_name: str,
+        mode: GameMode,
+        player_avatar: Optional[str] = None,
+    ) -> LiveGameState:
+        self.release(game_id)
+        if not self._free:
+            self._allocate(self.capacity * 2)
+        slot = self._free.pop()
+        self._slot_ids[slot] = game_id
+        self._slots[game_id] = slot
+
+        cells = [to_cell(x, y) for x, y in INITIAL_SNAKE]
+        self.body[slot] = 0
+        self.occupied[slot] = False
+        # Head at index len - 1, tail at index 0 of the ring
+        self.body[slot, : len(cells)] = cells[::-1]
+        self.head_ptr[slot] = len(cells) - 1
+        self.length[slot] = len(cells)
+        self.occupied[slot, cells] = True
+        self.direction[slot] = self.next_direction[slot] = DIRECTION_INDEX[Direction.RIGHT]
+        self.walls[slot] = mode == GameMode.WALLS
+        self.score[slot] = 0
+        self.food[slot] = self._random_free_cells(np.array([slot]))[0]
+        self.playing[slot] = True
+
+        game = LiveGameState(
+            id=game_id,
+            playerId=player_id,
+            playerName=player_name,
+            playerAvatar=player_avatar,
+            mode=mode,
+            snake=CompactSnake(cells),
+            food=int(self.food[slot]),
+            startedAt=datetime.utcnow(),
+        )
+        self.games[game_id] = game
+        return game
+
+    def release(self, game_id: str):
+        """Stop simulating a game and free its slot; its state stays in ``games``."""
+        slot = self._slots.pop(game_id, None)
+        if slot is None:
+            return
+        self.playing[slot] = False
+        self._slot_ids[slot] = None
+        self._free.append(slot)
+
+    def slot_of(self, game_id: str) -> Optional[int]:
+        """The game's row in the state arrays while it is being simulated."""
+        return self._slots.get(game_id)
+
+    def set_direction(self, game_id: str, direction: Direction) -> bool:
+        """Queue a turn for the next tick; reversing onto the body is ignored."""
+        slot = self._slots.get(game_id)
+        if slot is None or not self.playing[slot]:
+            return False
+        d = DIRECTION_INDEX[Direction(direction)]
+        if d == OPPOSITE[self.direction[slot]]:
+            return False
+        self.next_direction[slot] = d
+        return True
+
+    def set_directions(self, slots: np.ndarray, directions: np.ndarray):
+        """Batched ``set_direction`` for policies that steer many games at once."""
+        allowed = directions != OPPOSITE[self.direction[slots]]
+        self.next_direction[slots[allowed]] = directions[allowed]
+
+    # --- Simulation ---
+
+    def _random_free_cells(self, slots: np.ndarray) -> np.ndarray:
+        """One uniformly random unoccupied cell per slot (-1 when the board is full)."""
+        weights = self._rng.random((len(slots), CELLS))
+        weights[self.occupied[slots]] = -1.0
+        cells = weights.argmax(axis=1).astype(np.int16)
+        cells[weights.max(axis=1) < 0] = -1
+        return cells
+
+    def step(self) -> TickResult:
+        """Advance every playing game in an engine slot by one move."""
+        slots = np.flatnonzero(self.playing)
+        d = self.next_direction[slots]
+        self.direction[slots] = d
+
+        head_ptr = self.head_ptr[slots]
+        length = self.length[slots]
+        head = self.body[slots, head_ptr]
+        new_head = NEIGHBOURS[self.walls[slots].astype(np.intp), head, d]
+        # Walls games that left the board crash; their -1 head is masked out below
+        crashed = new_head < 0
+
+        tail_ptr = (head_ptr - length + 1) % CELLS
+        tail = self.body[slots, tail_ptr]
+        # The tail moves out of the way this tick, so it is not an obstacle
+        crashed |= self.occupied[slots, new_head] & (new_head != tail)
+
+        alive = ~crashed
+        moved = slots[alive]
+        new_head = new_head[alive]
+        ate = new_head == self.food[moved]
+
+        grow = moved[ate]
+        shrink = moved[~ate]
+        self.occupied[shrink, tail[alive][~ate]] = False
+        new_ptr = (head_ptr[alive] + 1) % CELLS
+        self.head_ptr[moved] = new_ptr
+        self.body[moved, new_ptr] = new_head
+        self.occupied[moved, new_head] = True
+
+        self.length[grow] += 1
+        self.score[grow] += FOOD_SCORE
+        new_food = self._random_free_cells(grow) if len(grow) else np.empty(0, dtype=np.int16)
+        self.food[grow] = new_food
+
+        # A full board has nowhere left for food: the game is over
+        finished = slots[crashed]
+        if len(grow):
+            finished = np.concatenate([finished, grow[new_food < 0]])
+        self.playing[finished] = False
+
+        return TickResult(moved, ate, finished, new_head, new_food)
+
+    # --- Sync back to LiveGameState ---
+
+    def apply(self, result: TickResult) -> List[str]:
+        """Write one step's changes to the game states; returns changed game ids."""
+        changed = []
+        ate = result.ate.tolist()
+        heads = result.new_heads.tolist()
+        food_iter = iter(result.new_food.tolist())
+        for slot, head, did_eat in zip(result.moved.tolist(), heads, ate):
+            # Take this slot's food even if its game is gone, or every later
+            # game that ate this tick would get the wrong cell
+            food = next(food_iter) if did_eat else None
+            game = self.games.get(self._slot_ids[slot])
+            if game is None:
+                continue
+            if did_eat:
+                game.score = int(self.score[slot])
+                if food >= 0:
+                    game.food = food
+            else:
+                game.snake.pop_tail()
+            game.snake.push_head(head)
+            changed.append(game.id)
+
+        for slot in result.crashed.tolist():
+            game_id = self._slot_ids[slot]
+            game = self.games.get(game_id)
+            if game is not None:
+                game.status = GameStatus.GAME_OVER
+                changed.append(game_id)
+            self.release(game_id)
+        return changed
+
+    def tick(self) -> List[str]:
+        start = time.perf_counter()
+        for policy in self.policies:
+            policy()
+        result = self.step()
+        changed = self.apply(result)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.ticks += 1
+        self.last_tick_ms = elapsed_ms
+        self.avg_tick_ms += (elapsed_ms - self.avg_tick_ms) * (0.1 if self.ticks > 1 else 1.0)
+        self.max_tick_ms = max(self.max_tick_ms, elapsed_ms)
+        self.last_games_per_tick = len(result.moved) + len(result.crashed)
+        return changed
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            changed = self.tick()
+            if self.on_tick and changed:
+                self.on_tick(changed)
+            next_tick += self.tick_seconds
+            delay = next_tick - loop.time()
+            if delay < 0:
+                logger.warning("Game engine tick overran by %.1f ms", -delay * 1000)
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "ticks": self.ticks,
+            "tick_seconds": self.tick_seconds,
+            "active_games": self.active_games,
+            "games_per_tick": self.last_games_per_tick,
+            "last_tick_ms": round(self.last_tick_ms, 3),
+            "avg_tick_ms": round(self.avg_tick_ms, 3),
+            "max_tick_ms": round(self.max_tick_ms, 3),
+        }
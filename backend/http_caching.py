@@ -0,0 +1,30 @@
+"""
+Content negotiation and ETag checks shared by the cached responses.
+"""
+
+
+def accepts_encoding(accept_encoding: str, coding: str) -> bool:
+    """Whether an ``Accept-Encoding`` header allows ``coding`` (``q=0`` refuses it)."""
+    wildcard = None
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if name not in (coding, "*"):
+            continue
+        q = params.strip()
+        try:
+            allowed = not q.startswith("q=") or float(q[2:]) > 0
+        except ValueError:
+            allowed = False
+        if name == coding:
+            return allowed
+        wildcard = allowed
+    return bool(wildcard)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" match
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
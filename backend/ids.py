@@ -0,0 +1,89 @@
+"""
+Time-ordered, collision-free IDs for users and scores.
+
+IDs are Snowflake-style 63-bit integers:
+
+    | 41 bits: ms since EPOCH | 10 bits: worker id | 12 bits: sequence |
+
+rendered as ``<prefix>_<19 zero-padded digits>``. Because the prefix is fixed
+and the number has a fixed width, string order is creation order. That makes
+IDs usable as keyset-cursor tie-breakers, and new rows land at the right-hand
+edge of the primary key index.
+
+Each process needs its own worker id (0-1023) to guarantee uniqueness. Set
+``ID_WORKER_ID`` per process or host. When it is unset, the id is a hash of
+the host name and process id, re-derived in forked children. Container
+replicas often share a process id but not a host name; two processes can
+still hash to the same id, so set ``ID_WORKER_ID`` where that matters.
+"""
+
+import hashlib
+import os
+import socket
+import threading
+import time
+from typing import Optional
+
+# 2024-01-01T00:00:00Z; 41 bits of milliseconds last until 2093
+EPOCH_MS = 1704067200000
+
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+ID_DIGITS = 19
+
+
+def _derive_worker_id() -> int:
+    digest = hashlib.blake2b(f"{socket.gethostname()}/{os.getpid()}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest) & MAX_WORKER_ID
+
+
+class IdGenerator:
+    def __init__(self, worker_id: Optional[int] = None):
+        self._derived = worker_id is None
+        self.worker_id = _derive_worker_id() if worker_id is None else worker_id
+        if not 0 <= self.worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        if self._derived:
+            self.worker_id = _derive_worker_id()
+
+    def next_int(self) -> int:
+        with self._lock:
+            now = time.time_ns() // 1_000_000 - EPOCH_MS
+            if now > self._last_ms:
+                self._last_ms = now
+                self._sequence = 0
+            else:
+                # Same millisecond, or the clock stepped back: keep counting
+                # from the last timestamp so IDs never go backwards
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    # 4096 IDs in one millisecond: borrow the next one
+                    self._last_ms += 1
+                    self._sequence = 0
+            return (self._last_ms << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS) | self._sequence
+
+    def new_id(self, prefix: str) -> str:
+        return f"{prefix}_{self.next_int():0{ID_DIGITS}d}"
+
+
+def timestamp_ms(id_value: str) -> int:
+    """UNIX time in milliseconds at which an ID was generated."""
+    number = int(id_value.rsplit("_", 1)[1])
+    return (number >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS
+
+
+_worker_id = os.getenv("ID_WORKER_ID")
+_generator = IdGenerator(int(_worker_id) if _worker_id is not None else None)
+os.register_at_fork(after_in_child=_generator._after_fork)
+
+
+def new_id(prefix: str) -> str:
+    return _generator.new_id(prefix)
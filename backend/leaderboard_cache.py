@@ -0,0 +1,124 @@
+"""
+Cache of serialized ``GET /leaderboard`` responses.
+
+Leaderboard pages are viewed far more often than scores are submitted, so
+each page is kept as ready-to-send JSON, plus a gzipped copy, keyed by its
+query parameters. Every write calls ``invalidate()``, which bumps a version
+number. A cached page is served only while its version is current, so a
+write invalidates every page at once without walking the cache.
+
+The ETag is a hash of the body and next cursor, so every worker gives the
+same page the same ETag and a page that changed never matches an old one;
+``If-None-Match`` is answered with 304. Each process keeps its own cache and
+only sees its own writes, so entries also expire after ``ttl`` seconds: a
+write made by another worker shows up here, with a new ETag, within ``ttl``.
+"""
+
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+from http_caching import accepts_encoding, etag_matches
+
+# Bodies smaller than this are not worth a gzip header
+MIN_GZIP_BYTES = 512
+
+
+class CachedPage:
+    __slots__ = ("version", "etag", "body", "gzipped", "next_cursor", "expires_at")
+
+    def __init__(self, version: int, etag: str, body: bytes, next_cursor: Optional[str], expires_at: float):
+        self.version = version
+        self.etag = etag
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=6) if len(body) >= MIN_GZIP_BYTES else None
+        self.next_cursor = next_cursor
+        self.expires_at = expires_at
+
+
+class LeaderboardCache:
+    def __init__(self, maxsize: int = 256, ttl: float = 5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = 0
+        self._pages: "OrderedDict[Hashable, CachedPage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.bytes_saved = 0
+
+    def invalidate(self):
+        """Mark every cached page stale; call after any leaderboard write."""
+        with self._lock:
+            self.version += 1
+            self._pages.clear()
+
+    def get(self, key: Hashable) -> Optional[CachedPage]:
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None and page.version == self.version and page.expires_at > time.monotonic():
+                self._pages.move_to_end(key)
+                self.hits += 1
+                return page
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, version: int, body: bytes, next_cursor: Optional[str] = None) -> CachedPage:
+        """
+        Cache a page computed at ``version``.
+
+        Read ``version`` *before* computing the page: if a write lands in
+        between, the page is stored as already stale rather than served as new.
+        """
+        digest = hashlib.blake2b(body, digest_size=12)
+        digest.update((next_cursor or "").encode())
+        page = CachedPage(version, f'W/"{digest.hexdigest()}"', body, next_cursor, time.monotonic() + self.ttl)
+        if self.maxsize > 0:
+            with self._lock:
+                if version == self.version:
+                    self._pages[key] = page
+                    self._pages.move_to_end(key)
+                    while len(self._pages) > self.maxsize:
+                        self._pages.popitem(last=False)
+        return page
+
+    def respond(self, page: CachedPage, request_headers: Headers) -> Response:
+        headers = {"ETag": page.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if page.next_cursor:
+            headers["X-Next-Cursor"] = page.next_cursor
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, page.etag):
+            self.not_modified += 1
+            self.bytes_saved += len(page.body)
+            return Response(status_code=304, headers=headers)
+
+        body = page.body
+        if page.gzipped is not None and accepts_encoding(request_headers.get("accept-encoding", ""), "gzip"):
+            headers["Content-Encoding"] = "gzip"
+            body = page.gzipped
+            self.bytes_saved += len(page.body) - len(body)
+        self.bytes_sent += len(body)
+        return Response(body, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._pages),
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "bytes_sent": self.bytes_sent,
+            "bytes_saved": self.bytes_saved,
+        }
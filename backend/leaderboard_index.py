@@ -0,0 +1,296 @@
+"""
+In-memory ranked leaderboard index.
+
+Keeps every leaderboard entry in an indexable skip list per game mode,
+ordered exactly like the SQL leaderboard (score DESC, date, id), so top-N,
+rank-of-score and page-at-offset reads are O(log n) and never touch the
+database. The index is bulk-loaded from the ``leaderboard`` table at startup
+and updated incrementally on every submitted score.
+"""
+
+import gc
+import random
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+import sql_models
+
+MAX_LEVEL = 16
+LEVEL_PROBABILITY = 0.25
+
+
+class _Node:
+    __slots__ = ("key", "value", "next", "width")
+
+    def __init__(self, key, value, level: int):
+        self.key = key
+        self.value = value
+        self.next: List[Optional["_Node"]] = [None] * level
+        # width[l] = how many positions following next[l] advances
+        self.width: List[int] = [1] * level
+
+
+class IndexableSkipList:
+    """Sorted map with O(log n) insert, remove, rank and positional access."""
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+        self.clear()
+
+    def clear(self):
+        self._head = _Node(None, None, MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < MAX_LEVEL and self._rng.random() < LEVEL_PROBABILITY:
+            level += 1
+        return level
+
+    def _predecessors(self, key) -> Tuple[List[_Node], List[int]]:
+        """Last node with node.key < key on every level, and its position."""
+        update = [self._head] * MAX_LEVEL
+        positions = [0] * MAX_LEVEL
+        node, pos = self._head, 0
+        for level in reversed(range(self._level)):
+            nxt = node.next[level]
+            while nxt is not None and nxt.key < key:
+                pos += node.width[level]
+                node = nxt
+                nxt = node.next[level]
+            update[level] = node
+            positions[level] = pos
+        return update, positions
+
+    def bisect_left(self, key) -> int:
+        """Number of keys strictly smaller than ``key``."""
+        node, pos = self._head, 0
+        for level in reversed(range(self._level)):
+            nxt = node.next[level]
+            while nxt is not None and nxt.key < key:
+                pos += node.width[level]
+                node = nxt
+                nxt = node.next[level]
+        return pos
+
+    def bisect_right(self, key) -> int:
+        """Number of keys smaller than or equal to ``key``."""
+        node, pos = self._head, 0
+        for level in reversed(range(self._level)):
+            nxt = node.next[level]
+            while nxt is not None and nxt.key <= key:
+                pos += node.width[level]
+                node = nxt
+                nxt = node.next[level]
+        return pos
+
+    def insert(self, key, value=None):
+        update, positions = self._predecessors(key)
+        existing = update[0].next[0]
+        if existing is not None and existing.key == key:
+            existing.value = value
+            return
+
+        level = self._random_level()
+        if level > self._level:
+            for l in range(self._level, level):
+                # Head links on fresh levels span the whole list
+                self._head.width[l] = self._size + 1
+            self._level = level
+
+        pos = positions[0] + 1
+        node = _Node(key, value, level)
+        for l in range(level):
+            prev = update[l]
+            node.next[l] = prev.next[l]
+            prev.next[l] = node
+            node.width[l] = prev.width[l] - (pos - positions[l]) + 1
+            prev.width[l] = pos - positions[l]
+        for l in range(level, self._level):
+            update[l].width[l] += 1
+        self._size += 1
+
+    def remove(self, key) -> bool:
+        update, _ = self._predecessors(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            return False
+        for l in range(self._level):
+            prev = update[l]
+            if prev.next[l] is node:
+                prev.width[l] += node.width[l] - 1
+                prev.next[l] = node.next[l]
+            else:
+                prev.width[l] -= 1
+        self._size -= 1
+        return True
+
+    def _node_at(self, index: int) -> Optional[_Node]:
+        if index < 0 or index >= self._size:
+            return None
+        node, remaining = self._head, index + 1
+        for level in reversed(range(self._level)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+            if remaining == 0:
+                break
+        return node
+
+    def items_from(self, index: int, limit: int) -> Iterator[Tuple[Any, Any]]:
+        node = self._node_at(index)
+        while node is not None and limit > 0:
+            yield node.key, node.value
+            node = node.next[0]
+            limit -= 1
+
+    def __getitem__(self, index: int) -> Tuple[Any, Any]:
+        node = self._node_at(index)
+        if node is None:
+            raise IndexError(index)
+        return node.key, node.value
+
+    def __iter__(self) -> Iterator[Tuple[Any, Any]]:
+        return self.items_from(0, self._size)
+
+    def bulk_load(self, items):
+        """Replace the contents with ``items``, which must already be sorted by key."""
+        self.clear()
+        last = [self._head] * MAX_LEVEL
+        last_pos = [0] * MAX_LEVEL
+        pos = 0
+        for key, value in items:
+            pos += 1
+            level = self._random_level()
+            self._level = max(self._level, level)
+            node = _Node(key, value, level)
+            for l in range(level):
+                last[l].next[l] = node
+                last[l].width[l] = pos - last_pos[l]
+                last[l] = node
+                last_pos[l] = pos
+        for l in range(MAX_LEVEL):
+            last[l].width[l] = pos + 1 - last_pos[l]
+        self._size = pos
+
+
+class IndexedEntry(NamedTuple):
+    id: str
+    userId: str
+    username: str
+    avatar: Optional[str]
+    score: int
+    mode: str
+    date: datetime
+
+
+def sort_key(entry) -> Tuple[int, datetime, str]:
+    """Leaderboard order: highest score first, then earliest date, then id."""
+    return (-entry.score, entry.date, entry.id)
+
+
+def _as_indexed(e: sql_models.LeaderboardEntry) -> IndexedEntry:
+    return IndexedEntry(e.id, e.userId, e.username, e.avatar, e.score, e.mode, e.date)
+
+
+class LeaderboardIndex:
+    """Per-mode ranked leaderboards; the ``None`` mode holds every entry."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._lists: Dict[Optional[str], IndexableSkipList] = {None: IndexableSkipList()}
+        self.ready = False
+
+    def _list(self, mode: Optional[str]) -> IndexableSkipList:
+        lst = self._lists.get(mode)
+        if lst is None:
+            lst = self._lists[mode] = IndexableSkipList()
+        return lst
+
+    def load(self, db: Session):
+        entries = sorted(
+            (_as_indexed(e) for e in db.query(sql_models.LeaderboardEntry).yield_per(10_000)),
+            key=sort_key,
+        )
+        self.load_entries(entries)
+
+    def load_entries(self, entries: List[IndexedEntry]):
+        """Bulk-load from entries already sorted with ``sort_key``."""
+        keyed = [(sort_key(e), e) for e in entries]
+        by_mode: Dict[str, List[Tuple[Any, IndexedEntry]]] = {}
+        for item in keyed:
+            by_mode.setdefault(item[1].mode, []).append(item)
+        # Millions of new long-lived nodes would otherwise trigger repeated
+        # full collections while the lists are being linked
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with self._lock:
+                self._lists = {None: IndexableSkipList()}
+                self._lists[None].bulk_load(keyed)
+                for mode, mode_items in by_mode.items():
+                    self._list(mode).bulk_load(mode_items)
+                self.ready = True
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def add(self, entry):
+        e = entry if isinstance(entry, IndexedEntry) else _as_indexed(entry)
+        key = sort_key(e)
+        with self._lock:
+            self._lists[None].insert(key, e)
+            self._list(e.mode).insert(key, e)
+
+    def __len__(self) -> int:
+        return len(self._lists[None])
+
+    def count(self, mode: Optional[str] = None) -> int:
+        return len(self._lists.get(mode, ()))
+
+    def top(self, n: int, mode: Optional[str] = None) -> List[IndexedEntry]:
+        return self.page(0, n, mode)
+
+    def page(self, offset: int, limit: int, mode: Optional[str] = None) -> List[IndexedEntry]:
+        """Entries ranked ``offset + 1`` .. ``offset + limit``."""
+        with self._lock:
+            lst = self._lists.get(mode)
+            if lst is None:
+                return []
+            return [value for _, value in lst.items_from(offset, limit)]
+
+    def offset_after(self, score: int, date: datetime, entry_id: str, mode: Optional[str] = None) -> int:
+        """Offset of the first entry ranked after the given sort key."""
+        with self._lock:
+            lst = self._lists.get(mode)
+            return lst.bisect_right((-score, date, entry_id)) if lst else 0
+
+    def rank_of_score(self, score: int, mode: Optional[str] = None) -> int:
+        """Rank a new entry with ``score`` would get: 1 + entries scoring higher."""
+        with self._lock:
+            lst = self._lists.get(mode)
+            # (-score,) sorts before every (-score, date, id) key
+            return (lst.bisect_left((-score,)) if lst else 0) + 1
+
+    def mismatches(self, db: Session, mode: Optional[str] = None) -> List[str]:
+        """Compare against the SQL ordering; returns the ids that disagree."""
+        entry = sql_models.LeaderboardEntry
+        query = db.query(entry.id)
+        if mode:
+            query = query.filter(entry.mode == mode)
+        sql_ids = [row.id for row in query.order_by(entry.score.desc(), entry.date.asc(), entry.id.asc())]
+        with self._lock:
+            lst = self._lists.get(mode)
+            index_ids = [value.id for _, value in lst] if lst else []
+        bad = [a or b for a, b in zip(sql_ids, index_ids) if a != b]
+        if len(sql_ids) != len(index_ids):
+            longer = sql_ids if len(sql_ids) > len(index_ids) else index_ids
+            bad.extend(longer[min(len(sql_ids), len(index_ids)):])
+        return bad
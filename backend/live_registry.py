@@ -0,0 +1,219 @@
+"""
+Bounded registry of live games.
+
+A plain dict never forgets a game, so finished and abandoned games would
+stay in memory and in every ``GET /live-games`` response. ``LiveGameRegistry``
+is a mapping of game id -> ``LiveGameState`` that evicts:
+
+* finished games ``game_over_ttl`` seconds after they ended;
+* any game without activity (a move, a status change, a viewer joining or
+  leaving) for ``idle_ttl`` seconds;
+* when ``maxsize`` is reached, the oldest finished game, or failing that the
+  least recently active one, to make room for a new game.
+
+Activity and finish times are kept in insertion-ordered dicts, so a sweep
+only looks at the games it removes. Games are also indexed by mode and
+status, which makes filtered listings proportional to the result and counts
+O(1).
+
+The registry cannot see a game object being mutated: call ``touch()`` after
+changing a game so it is re-indexed and counted as active. Like the rest of
+the live game code it must only be used from the event loop.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from live_state import LiveGameState
+from models import GameMode, GameStatus
+
+
+class LiveGameRegistry(MutableMapping):
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        game_over_ttl: float = 60.0,
+        idle_ttl: float = 600.0,
+        sweep_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ):
+        self.maxsize = maxsize
+        self.game_over_ttl = game_over_ttl
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self.on_evict = on_evict
+        self._clock = clock
+        self._games: Dict[str, LiveGameState] = {}
+        # Indexed (mode, status) of each game, to notice changes in touch()
+        self._keys: Dict[str, Tuple[GameMode, GameStatus]] = {}
+        self._by_mode: Dict[GameMode, Dict[str, None]] = {mode: {} for mode in GameMode}
+        self._by_status: Dict[GameStatus, Dict[str, None]] = {status: {} for status in GameStatus}
+        self._counts: Counter = Counter()
+        # Least recently active / earliest finished first
+        self._activity: Dict[str, float] = {}
+        self._finished: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.evicted_expired = 0
+        self.evicted_capacity = 0
+
+    # --- Mapping interface ---
+
+    def __getitem__(self, game_id: str) -> LiveGameState:
+        return self._games[game_id]
+
+    def __setitem__(self, game_id: str, game: LiveGameState):
+        if game_id in self._games:
+            self._unindex(game_id)
+        elif self.maxsize > 0 and len(self._games) >= self.maxsize:
+            self._evict(self._eviction_candidate())
+            self.evicted_capacity += 1
+        self._games[game_id] = game
+        self._index(game_id, game)
+
+    def __delitem__(self, game_id: str):
+        del self._games[game_id]
+        self._unindex(game_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._games)
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def __contains__(self, game_id: object) -> bool:
+        return game_id in self._games
+
+    def get(self, game_id: str, default: Any = None) -> Optional[LiveGameState]:
+        return self._games.get(game_id, default)
+
+    def values(self):
+        return self._games.values()
+
+    # --- Indexes ---
+
+    def _index(self, game_id: str, game: LiveGameState):
+        key = (game.mode, game.status)
+        self._keys[game_id] = key
+        self._by_mode[game.mode][game_id] = None
+        self._by_status[game.status][game_id] = None
+        self._counts[key] += 1
+        self._activity[game_id] = self._clock()
+        if game.status == GameStatus.GAME_OVER:
+            self._finished[game_id] = self._clock()
+
+    def _unindex(self, game_id: str):
+        mode, status = key = self._keys.pop(game_id)
+        del self._by_mode[mode][game_id]
+        del self._by_status[status][game_id]
+        self._counts[key] -= 1
+        self._activity.pop(game_id, None)
+        self._finished.pop(game_id, None)
+
+    def touch(self, game_id: str):
+        """Record activity on a game and re-index it if its status or mode changed."""
+        game = self._games.get(game_id)
+        if game is None:
+            return
+        if self._keys[game_id] != (game.mode, game.status):
+            self._unindex(game_id)
+            self._index(game_id, game)
+            return
+        # Re-insert to move the game to the most recently active end
+        del self._activity[game_id]
+        self._activity[game_id] = self._clock()
+
+    def count(self, mode: Optional[GameMode] = None, status: Optional[GameStatus] = None) -> int:
+        if mode is None and status is None:
+            return len(self._games)
+        return sum(
+            n for (m, s), n in self._counts.items()
+            if (mode is None or m == mode) and (status is None or s == status)
+        )
+
+    def select(
+        self,
+        mode: Optional[GameMode] = None,
+        status: Optional[GameStatus] = None,
+        limit: Optional[int] = None,
+    ) -> List[LiveGameState]:
+        """Games matching the filters, oldest first."""
+        if mode is not None and status is not None:
+            # Walk the smaller index, check the other attribute
+            if len(self._by_mode[mode]) <= len(self._by_status[status]):
+                ids: Iterable[str] = (i for i in self._by_mode[mode] if self._keys[i][1] == status)
+            else:
+                ids = (i for i in self._by_status[status] if self._keys[i][0] == mode)
+        elif mode is not None:
+            ids = self._by_mode[mode]
+        elif status is not None:
+            ids = self._by_status[status]
+        else:
+            ids = self._games
+        games = []
+        for game_id in ids:
+            if limit is not None and len(games) >= limit:
+                break
+            games.append(self._games[game_id])
+        return games
+
+    # --- Eviction ---
+
+    def _eviction_candidate(self) -> str:
+        if self._finished:
+            return next(iter(self._finished))
+        return next(iter(self._activity))
+
+    def _evict(self, game_id: str):
+        del self[game_id]
+        if self.on_evict:
+            self.on_evict(game_id)
+
+    def sweep(self) -> int:
+        """Evict expired games; returns how many were removed."""
+        now = self._clock()
+        expired = []
+        for game_id, finished_at in self._finished.items():
+            if finished_at + self.game_over_ttl > now:
+                break
+            expired.append(game_id)
+        for game_id, active_at in self._activity.items():
+            if active_at + self.idle_ttl > now:
+                break
+            if game_id not in self._finished or self._finished[game_id] + self.game_over_ttl > now:
+                expired.append(game_id)
+        for game_id in expired:
+            self._evict(game_id)
+        self.evicted_expired += len(expired)
+        return len(expired)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._games),
+            "max_size": self.maxsize,
+            **{status.value: len(ids) for status, ids in self._by_status.items()},
+            "evicted_expired": self.evicted_expired,
+            "evicted_capacity": self.evicted_capacity,
+        }
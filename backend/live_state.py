@@ -0,0 +1,194 @@
+"""
+Compact internal representation of live games.
+
+``LiveGame`` stores the snake as a list of Pydantic ``Position`` objects, one
+validated object per segment. Live games change every tick, so they are kept
+internally as a ``LiveGameState`` instead. Its ``CompactSnake`` is a ring buffer
+of packed ``uint16`` cell indices plus an occupancy bitset. Moving is O(1),
+including the self-collision check. The public ``LiveGame`` model is built
+only at the API boundary through ``LiveGameState.to_model()``.
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from models import Direction, GameMode, GameStatus, LiveGame, Position
+
+GRID_SIZE = 20
+CELLS = GRID_SIZE * GRID_SIZE
+FOOD_SCORE = 10
+
+VECTORS = {
+    Direction.UP: (0, -1),
+    Direction.DOWN: (0, 1),
+    Direction.LEFT: (-1, 0),
+    Direction.RIGHT: (1, 0),
+}
+
+# Positions are never mutated, so every snake can share one object per cell
+CELL_POSITIONS = [Position(x=c % GRID_SIZE, y=c // GRID_SIZE) for c in range(CELLS)]
+# The same, as plain dicts for LiveGameState.to_dict()
+CELL_DICTS = [{"x": c % GRID_SIZE, "y": c // GRID_SIZE} for c in range(CELLS)]
+
+
+def to_cell(x: int, y: int) -> int:
+    return y * GRID_SIZE + x
+
+
+class CompactSnake:
+    """Snake body as a ring buffer of cell indices, head first."""
+
+    __slots__ = ("_ring", "_head", "_length", "_occupied")
+
+    def __init__(self, cells: Iterable[int] = ()):
+        self._ring = array("H", bytes(2 * CELLS))
+        self._occupied = bytearray(CELLS // 8 + 1)
+        self._head = -1
+        self._length = 0
+        # Input is head first; build from the tail so the head ends up newest
+        for cell in reversed(list(cells)):
+            self.push_head(cell)
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[Position]) -> "CompactSnake":
+        return cls(to_cell(p.x, p.y) for p in positions)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def head(self) -> int:
+        return self._ring[self._head]
+
+    @property
+    def tail(self) -> int:
+        return self._ring[(self._head - self._length + 1) % CELLS]
+
+    def segment(self, index: int) -> int:
+        """Cell of the ``index``-th segment counting from the head."""
+        return self._ring[(self._head - index) % CELLS]
+
+    def occupies(self, cell: int) -> bool:
+        return bool(self._occupied[cell >> 3] & (1 << (cell & 7)))
+
+    def push_head(self, cell: int):
+        self._head = (self._head + 1) % CELLS
+        self._ring[self._head] = cell
+        self._occupied[cell >> 3] |= 1 << (cell & 7)
+        self._length += 1
+
+    def pop_tail(self) -> int:
+        cell = self.tail
+        self._length -= 1
+        self._occupied[cell >> 3] &= ~(1 << (cell & 7)) & 0xFF
+        return cell
+
+    def cells(self) -> array:
+        """Cells of every segment, head first."""
+        start = self._head - self._length + 1
+        if start >= 0:
+            return self._ring[start : self._head + 1][::-1]
+        # The body wraps around the end of the ring
+        return (self._ring[start:] + self._ring[: self._head + 1])[::-1]
+
+    def to_positions(self) -> List[Position]:
+        return [CELL_POSITIONS[c] for c in self.cells()]
+
+    def to_dicts(self) -> List[Dict[str, int]]:
+        return [CELL_DICTS[c] for c in self.cells()]
+
+    def move(self, direction: Direction, mode: GameMode, food: int) -> Tuple[bool, bool]:
+        """
+        One step with the rules of ``moveSnake`` in useGameLogic.ts.
+
+        Returns ``(ate, collision)``; on collision the snake is left unchanged.
+        """
+        dx, dy = VECTORS[direction]
+        x = self.head % GRID_SIZE + dx
+        y = self.head // GRID_SIZE + dy
+        if mode == GameMode.PASS_THROUGH:
+            x %= GRID_SIZE
+            y %= GRID_SIZE
+        elif not (0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE):
+            return False, True
+
+        cell = to_cell(x, y)
+        # The tail moves out of the way this step, so it is not an obstacle
+        if self.occupies(cell) and cell != self.tail:
+            return False, True
+
+        ate = cell == food
+        if not ate:
+            self.pop_tail()
+        self.push_head(cell)
+        return ate, False
+
+
+@dataclass(slots=True)
+class LiveGameState:
+    id: str
+    playerId: str
+    playerName: str
+    mode: GameMode
+    snake: CompactSnake
+    food: int
+    status: GameStatus = GameStatus.PLAYING
+    score: int = 0
+    viewers: int = 0
+    playerAvatar: Optional[str] = None
+    startedAt: datetime = field(default_factory=datetime.utcnow)
+
+    @classmethod
+    def from_model(cls, game: LiveGame) -> "LiveGameState":
+        return cls(
+            id=game.id,
+            playerId=game.playerId,
+            playerName=game.playerName,
+            playerAvatar=game.playerAvatar,
+            mode=game.mode,
+            snake=CompactSnake.from_positions(game.snake),
+            food=to_cell(game.food.x, game.food.y),
+            status=game.status,
+            score=game.score,
+            viewers=game.viewers,
+            startedAt=game.startedAt,
+        )
+
+    def to_model(self) -> LiveGame:
+        return LiveGame(
+            id=self.id,
+            playerId=self.playerId,
+            playerName=self.playerName,
+            playerAvatar=self.playerAvatar,
+            score=self.score,
+            mode=self.mode,
+            snake=self.snake.to_positions(),
+            food=CELL_POSITIONS[self.food],
+            status=self.status,
+            viewers=self.viewers,
+            startedAt=self.startedAt,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The fields of ``to_model()`` as plain values, in the same order.
+
+        For list responses: ``pydantic_core.to_json()`` encodes these to the
+        same bytes as the model, without building and validating one
+        ``LiveGame`` and one ``Position`` per segment first.
+        """
+        return {
+            "id": self.id,
+            "playerId": self.playerId,
+            "playerName": self.playerName,
+            "playerAvatar": self.playerAvatar,
+            "score": self.score,
+            "mode": self.mode,
+            "snake": self.snake.to_dicts(),
+            "food": CELL_DICTS[self.food],
+            "status": self.status,
+            "viewers": self.viewers,
+            "startedAt": self.startedAt,
+        }
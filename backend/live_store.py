@@ -0,0 +1,375 @@
+"""
+Where the live game routes read and update live games.
+
+``LiveGameStore`` is the interface the ``/live-games`` routes and the
+spectator WebSocket go through. There are two implementations:
+
+* ``LocalLiveGameStore`` (``LIVE_STORE=memory``, the default) serves this
+  process's ``LiveGameRegistry`` and ``ViewerPresence`` directly. With more
+  than one uvicorn worker, each worker would have its own games and viewers.
+* ``SocketLiveGameStore`` (``LIVE_STORE=socket``) shares one set of live
+  games between every worker on a machine. The first worker to take an
+  exclusive lock on ``<socket path>.lock`` becomes the hub. It keeps the
+  games (and runs the tick engine) and serves its local store on a Unix
+  domain socket. The other workers forward each call over that socket.
+  Requests are JSON lines tagged with an id, so one connection carries many
+  concurrent calls. Each response is a JSON header line with the same id and
+  the byte length of the JSON result that follows it. If the hub goes away, the next call lets
+  another worker take over, starting with no games.
+
+Spectator streams on the hub are driven by game events. Other workers poll
+the hub for the games their spectators watch (see broadcast.py).
+"""
+
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from live_registry import LiveGameRegistry
+from live_state import LiveGameState
+from live_stream import LiveGameEvents
+from models import GameMode, GameStatus, LiveGame
+from presence import ViewerPresence
+
+logger = logging.getLogger(__name__)
+
+# Results cross the socket as JSON encoded and decoded by pydantic-core
+_game_list = TypeAdapter(List[LiveGame])
+_optional_game = TypeAdapter(Optional[LiveGame])
+
+# Longest message line; a page of 1000 long snakes is a few MiB of JSON
+STREAM_LIMIT = 64 * 2**20
+
+
+class GameNotFound(LookupError):
+    pass
+
+
+class StoreUnavailable(ConnectionError):
+    """No live game hub could be reached, and this process could not become it."""
+
+
+class HubError(RuntimeError):
+    """The hub failed to run an operation; the message is the hub's error."""
+
+
+class LiveGameStore(ABC):
+    # True if this process holds the games (and should run the engine for them)
+    owns_games = True
+    # Called once this process holds the games, to start the engine and sweeps
+    on_hub: Optional[Callable[[], None]] = None
+
+    async def start(self):
+        if self.on_hub:
+            self.on_hub()
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def list_games(
+        self, mode: Optional[GameMode] = None, status: Optional[GameStatus] = None, limit: Optional[int] = None
+    ) -> List[LiveGame]:
+        ...
+
+    @abstractmethod
+    async def list_games_json(
+        self, mode: Optional[GameMode] = None, status: Optional[GameStatus] = None, limit: Optional[int] = None
+    ) -> bytes:
+        """``list_games()`` encoded as a JSON array, for responses that pass it straight through."""
+
+    @abstractmethod
+    async def get_game(self, game_id: str) -> Optional[LiveGame]:
+        ...
+
+    @abstractmethod
+    async def add_game(self, game: LiveGame):
+        ...
+
+    @abstractmethod
+    async def heartbeat(self, game_id: str, viewer_id: str) -> Optional[int]:
+        """Count a viewer as watching; returns the viewer count, or None if presence is full."""
+
+    @abstractmethod
+    async def leave(self, game_id: str, viewer_id: str):
+        ...
+
+    @abstractmethod
+    async def get_state(self, game_id: str) -> Optional[LiveGameState]:
+        """Current state of a game, for computing spectator stream frames."""
+
+
+class LocalLiveGameStore(LiveGameStore):
+    def __init__(self, games: LiveGameRegistry, presence: ViewerPresence, events: LiveGameEvents):
+        self.games = games
+        self.presence = presence
+        self.events = events
+        presence.on_change = self._viewers_changed
+
+    def _viewers_changed(self, game_ids: Iterable[str]):
+        for game_id in game_ids:
+            game = self.games.get(game_id)
+            if game is not None:
+                game.viewers = self.presence.count(game_id)
+                self.games.touch(game_id)
+                self.events.publish(game_id)
+
+    async def list_games(self, mode=None, status=None, limit=None) -> List[LiveGame]:
+        return [game.to_model() for game in self.games.select(mode, status, limit)]
+
+    async def list_games_json(self, mode=None, status=None, limit=None) -> bytes:
+        return to_json([game.to_dict() for game in self.games.select(mode, status, limit)])
+
+    async def get_game(self, game_id: str) -> Optional[LiveGame]:
+        game = self.games.get(game_id)
+        return game.to_model() if game is not None else None
+
+    async def add_game(self, game: LiveGame):
+        self.games[game.id] = LiveGameState.from_model(game)
+        self.events.publish(game.id)
+
+    async def heartbeat(self, game_id: str, viewer_id: str) -> Optional[int]:
+        if game_id not in self.games:
+            raise GameNotFound(game_id)
+        return self.presence.heartbeat(game_id, viewer_id)
+
+    async def leave(self, game_id: str, viewer_id: str):
+        if game_id not in self.games:
+            raise GameNotFound(game_id)
+        self.presence.leave(game_id, viewer_id)
+
+    async def get_state(self, game_id: str) -> Optional[LiveGameState]:
+        return self.games.get(game_id)
+
+
+class SocketLiveGameStore(LiveGameStore):
+    """
+    Live games shared by the workers on one machine over a Unix socket.
+
+    Pass ``local`` to let this process become the hub; without it the store
+    is a client only (e.g. a tool feeding games to running servers).
+    """
+
+    def __init__(self, path: str, local: Optional[LocalLiveGameStore] = None):
+        self.path = path
+        self.local = local
+        self.owns_games = False
+        self._lock_file = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Set[asyncio.StreamWriter] = set()
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._connecting = asyncio.Lock()
+        self._ids = itertools.count()
+        self._pending: Dict[int, asyncio.Future] = {}
+
+        self.requests = 0
+        self.served = 0
+
+    # --- Hub election ---
+
+    async def start(self):
+        if self.local is None or not self._try_lock():
+            return
+        # A hub that crashed leaves its socket file behind
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path, limit=STREAM_LIMIT)
+        self.owns_games = True
+        logger.info("Serving live games on %s (pid %d)", self.path, os.getpid())
+        if self.on_hub:
+            self.on_hub()
+
+    def _try_lock(self) -> bool:
+        import fcntl
+
+        lock_file = open(self.path + ".lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+        self._disconnect(ConnectionError("Live game store closed"))
+
+    # --- Hub side ---
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients.add(writer)
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                header: Dict[str, Any] = {"id": request["id"]}
+                payload = b""
+                try:
+                    payload = await self._dispatch(request["op"], request.get("args", {}))
+                    header["len"] = len(payload)
+                except GameNotFound:
+                    header["error"] = "not_found"
+                except Exception as e:
+                    # Fail this request only; the connection carries other callers' requests
+                    logger.exception("Live store operation %r failed", request.get("op"))
+                    header["error"] = "failed"
+                    header["detail"] = f"{type(e).__name__}: {e}"
+                writer.write(json.dumps(header).encode() + b"\n" + payload)
+                await writer.drain()
+                self.served += 1
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _dispatch(self, op: str, args: Dict[str, Any]) -> bytes:
+        """Run one operation on the local store; returns the result as JSON."""
+        local = self.local
+        if op == "list":
+            mode = GameMode(args["mode"]) if args.get("mode") else None
+            status = GameStatus(args["status"]) if args.get("status") else None
+            return await local.list_games_json(mode, status, args.get("limit"))
+        if op == "get":
+            return _optional_game.dump_json(await local.get_game(args["game_id"]))
+        if op == "add":
+            result = await local.add_game(LiveGame.model_validate(args["game"]))
+        elif op == "heartbeat":
+            result = await local.heartbeat(args["game_id"], args["viewer_id"])
+        elif op == "leave":
+            result = await local.leave(args["game_id"], args["viewer_id"])
+        else:
+            raise ValueError(f"Unknown live store operation: {op}")
+        return json.dumps(result).encode()
+
+    # --- Client side ---
+
+    async def _connect(self):
+        async with self._connecting:
+            if self._writer is not None:
+                return
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(self.path, limit=STREAM_LIMIT)
+            except (FileNotFoundError, ConnectionError) as e:
+                # No hub (any more): try to become it
+                await self.start()
+                if not self.owns_games:
+                    raise StoreUnavailable(f"No live game hub at {self.path}") from e
+                return
+            self._read_task = asyncio.create_task(self._read_responses(self._reader))
+
+    async def _read_responses(self, reader: asyncio.StreamReader):
+        try:
+            while line := await reader.readline():
+                header = json.loads(line)
+                payload = await reader.readexactly(header["len"]) if "len" in header else None
+                future = self._pending.pop(header["id"], None)
+                if future is not None and not future.done():
+                    future.set_result((header, payload))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        self._disconnect(ConnectionError("Live game hub closed the connection"))
+
+    def _disconnect(self, error: Exception):
+        if self._read_task is not None and self._read_task is not asyncio.current_task():
+            self._read_task.cancel()
+        self._read_task = None
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def _call(self, op: str, **args) -> bytes:
+        """Run an operation on the hub (here, if this process is it); returns the JSON result."""
+        if self.owns_games:
+            return await self._dispatch(op, args)
+        for attempt in range(2):
+            if self._writer is None:
+                await self._connect()
+                if self.owns_games:
+                    return await self._dispatch(op, args)
+            request_id = next(self._ids)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+            try:
+                self._writer.write(json.dumps({"id": request_id, "op": op, "args": args}).encode() + b"\n")
+                header, payload = await future
+            except ConnectionError as e:
+                self._pending.pop(request_id, None)
+                self._disconnect(ConnectionError("Live game hub went away"))
+                if attempt:
+                    raise StoreUnavailable("Live game hub went away") from e
+                continue
+            self.requests += 1
+            if header.get("error") == "not_found":
+                raise GameNotFound(args.get("game_id"))
+            if header.get("error"):
+                raise HubError(header.get("detail", header["error"]))
+            return payload
+
+    async def list_games(self, mode=None, status=None, limit=None) -> List[LiveGame]:
+        if self.owns_games:
+            return await self.local.list_games(mode, status, limit)
+        payload = await self._call(
+            "list", mode=mode.value if mode else None, status=status.value if status else None, limit=limit
+        )
+        return _game_list.validate_json(payload)
+
+    async def list_games_json(self, mode=None, status=None, limit=None) -> bytes:
+        if self.owns_games:
+            return await self.local.list_games_json(mode, status, limit)
+        # The hub's encoding is passed through as it is
+        return await self._call(
+            "list", mode=mode.value if mode else None, status=status.value if status else None, limit=limit
+        )
+
+    async def get_game(self, game_id: str) -> Optional[LiveGame]:
+        if self.owns_games:
+            return await self.local.get_game(game_id)
+        return _optional_game.validate_json(await self._call("get", game_id=game_id))
+
+    async def add_game(self, game: LiveGame):
+        await self._call("add", game=game.model_dump(mode="json"))
+
+    async def heartbeat(self, game_id: str, viewer_id: str) -> Optional[int]:
+        return json.loads(await self._call("heartbeat", game_id=game_id, viewer_id=viewer_id))
+
+    async def leave(self, game_id: str, viewer_id: str):
+        await self._call("leave", game_id=game_id, viewer_id=viewer_id)
+
+    async def get_state(self, game_id: str) -> Optional[LiveGameState]:
+        if self.owns_games:
+            return await self.local.get_state(game_id)
+        game = await self.get_game(game_id)
+        return LiveGameState.from_model(game) if game is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hub": self.owns_games,
+            "requests": self.requests,
+            "served": self.served,
+            "pending": len(self._pending),
+        }
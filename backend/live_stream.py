@@ -0,0 +1,78 @@
+"""
+Snapshot + delta frames for spectating live games over WebSockets.
+
+A viewer first receives the whole ``LiveGame``; after that each frame only
+carries what changed since the previous one: the new head (and whether the
+tail was dropped), food, score, status and viewer count. Working out a delta
+is O(1) in the snake length. When the game cannot be described as a single
+step from what the viewer last saw (a reset, or frames skipped while the
+viewer was busy), the stream falls back to a fresh snapshot.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from live_state import GRID_SIZE, LiveGameState
+
+
+def _position(cell: int) -> Dict[str, int]:
+    return {"x": cell % GRID_SIZE, "y": cell // GRID_SIZE}
+
+
+class LiveGameStream:
+    """Tracks what viewers have been sent and turns game updates into frames."""
+
+    def __init__(self, game: LiveGameState):
+        self._remember(game)
+
+    def _remember(self, game: LiveGameState):
+        self.head: Optional[int] = game.snake.head if len(game.snake) else None
+        self.length = len(game.snake)
+        self.food = game.food
+        self.score = game.score
+        self.status = game.status
+        self.viewers = game.viewers
+
+    def snapshot(self, game: LiveGameState) -> Dict[str, Any]:
+        self._remember(game)
+        return {"type": "snapshot", "game": game.to_model().model_dump(mode="json")}
+
+    def next_frame(self, game: LiveGameState) -> Optional[Dict[str, Any]]:
+        """Delta from the last frame, a snapshot if none fits, or None if unchanged."""
+        frame: Dict[str, Any] = {}
+
+        length = len(game.snake)
+        head = game.snake.head if length else None
+        if head != self.head:
+            grew = length - self.length
+            if length < 2 or game.snake.segment(1) != self.head or grew not in (0, 1):
+                return self.snapshot(game)
+            frame["head"] = _position(head)
+            frame["tailRemoved"] = grew == 0
+        elif length != self.length:
+            return self.snapshot(game)
+
+        if game.food != self.food:
+            frame["food"] = _position(game.food)
+        if game.score != self.score:
+            frame["score"] = game.score
+        if game.status != self.status:
+            frame["status"] = game.status.value
+        if game.viewers != self.viewers:
+            frame["viewers"] = game.viewers
+
+        if not frame:
+            return None
+        self._remember(game)
+        return {"type": "delta", **frame}
+
+
+class LiveGameEvents:
+    """Tells listeners when a game changes. Must be used on the event loop."""
+
+    def __init__(self):
+        # Called with the game id on every change, e.g. to fan frames out
+        self.listeners: List[Callable[[str], None]] = []
+
+    def publish(self, game_id: str):
+        for listener in self.listeners:
+            listener(game_id)
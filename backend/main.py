@@ -1,37 +1,120 @@
+import asyncio
+import json
 import os
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from passlib.exc import UnknownHashError
+from sqlalchemy import and_, insert, or_, select
 from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from pydantic_core import to_json
 
 from models import (
     User, GameMode, GameStatus, Position, 
     AuthCredentials, SignUpCredentials, AuthResponse,
-    LeaderboardEntry, LiveGame, UserStats, 
+    LeaderboardEntry, LiveGame, UserStats, ScoreBatch, ScoreSubmission, ViewerHeartbeat, ReplayUpload,
     Token, TokenData
 )
 import sql_models
-from db_setup import get_db
-from database import init_db, live_games
+import player_best
+from ids import new_id
+from db_setup import SessionLocal, get_db, db_offload
+from database import init_db, live_games, leaderboard_index, user_rank_index, load_rank_indexes
+from leaderboard_index import IndexedEntry, sort_key
+from leaderboard_cache import LeaderboardCache
+from pagination import LeaderboardCursor, InvalidCursor
+from replay import InvalidReplay, Replay
+from replay_verifier import ReplayVerifier, VerifierBusy
+from live_stream import LiveGameEvents
+from broadcast import LiveGameBroadcaster
+from presence import ViewerPresence
+from live_store import GameNotFound, HubError, LocalLiveGameStore, SocketLiveGameStore, StoreUnavailable
+from game_engine import GameEngine
+from bots import BotFleet
+from auth_cache import AuthCache
+from password_hashing import HasherBusy, PasswordHasher, pwd_context
+from process_pool import default_workers
+from score_buffer import ScoreBuffer, add_games, merge_pending
+from static_files import StaticManifest
+import metrics
 
 # Configuration
 SECRET_KEY = "super-secret-key-change-me"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+LEADERBOARD_PAGE_SIZE = 50
+LEADERBOARD_MAX_PAGE_SIZE = 100
+# Moves per line when streaming a replay back
+REPLAY_CHUNK_TICKS = 4096
+# Replay the submitted game on the server and reject scores it doesn't back up
+REPLAY_VERIFY_ENABLED = os.getenv("REPLAY_VERIFY", "1") == "1"
+# Refuse scores submitted without a replay (0 accepts them unchecked)
+REPLAY_REQUIRED = os.getenv("REPLAY_REQUIRED", "1") == "1"
+# Ticks of replay one request may ask the verifier to play back (~3M ticks/s per core)
+REPLAY_MAX_TICKS_PER_REQUEST = int(os.getenv("REPLAY_MAX_TICKS_PER_REQUEST", "1000000"))
+LIVE_GAMES_PAGE_SIZE = 100
+LIVE_GAMES_MAX_PAGE_SIZE = 1000
+# Frames a spectator may fall behind by before it is resynced from a snapshot
+LIVE_STREAM_QUEUE = int(os.getenv("LIVE_STREAM_QUEUE", "32"))
+LIVE_ENGINE_ENABLED = os.getenv("LIVE_ENGINE", "1") == "1"
+LIVE_ENGINE_TICK_MS = int(os.getenv("LIVE_ENGINE_TICK_MS", "120"))
+# Bot games kept running on the engine, for spectators when no one is playing
+LIVE_BOTS = int(os.getenv("LIVE_BOTS", "0"))
+# Spectators who stop sending heartbeats drop out of the viewer count after this long
+VIEWER_TTL = float(os.getenv("VIEWER_TTL", "30"))
+VIEWER_MAX = int(os.getenv("VIEWER_MAX", "500000"))
+# "memory" (this process only) or "socket" (shared by the workers on this machine)
+LIVE_STORE = os.getenv("LIVE_STORE", "memory")
+LIVE_STORE_SOCKET = os.getenv("LIVE_STORE_SOCKET", "/tmp/snake-arena-live.sock")
+# The in-memory indexes only see this process's writes, so with several workers
+# (LIVE_STORE=socket) they would drift apart; they are off there unless set explicitly
+_INDEX_DEFAULT = "0" if LIVE_STORE == "socket" else "1"
+LEADERBOARD_INDEX_ENABLED = os.getenv("LEADERBOARD_INDEX", _INDEX_DEFAULT) == "1"
+USER_RANK_INDEX_ENABLED = os.getenv("USER_RANK_INDEX", _INDEX_DEFAULT) == "1"
+# gc.freeze() once the indexes are loaded, so collections skip their nodes
+INDEX_GC_FREEZE_ENABLED = os.getenv("INDEX_GC_FREEZE", "1") == "1"
+# Opt-in: accept scores into memory and commit them in background batches
+SCORE_WRITE_BEHIND_ENABLED = os.getenv("SCORE_WRITE_BEHIND", "0") == "1"
+SCORE_FLUSH_INTERVAL_MS = int(os.getenv("SCORE_FLUSH_INTERVAL_MS", "200"))
+SCORE_FLUSH_BATCH_SIZE = int(os.getenv("SCORE_FLUSH_BATCH_SIZE", "500"))
+# Frontend build output served by the catch-all route
+STATIC_DIR = os.getenv("STATIC_DIR", "/app/static")
+# Index STATIC_DIR at startup and serve from memory (0 looks files up on every request)
+STATIC_MANIFEST_ENABLED = os.getenv("STATIC_MANIFEST", "1") == "1"
+STATIC_MEMORY_MAX = int(os.getenv("STATIC_MEMORY_MAX", str(256 * 1024)))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    load_rank_indexes(
+        leaderboard=LEADERBOARD_INDEX_ENABLED, users=USER_RANK_INDEX_ENABLED, freeze=INDEX_GC_FREEZE_ENABLED
+    )
+    if STATIC_MANIFEST_ENABLED and os.path.isdir(STATIC_DIR):
+        static_manifest.load()
+    password_hasher.start()
+    if REPLAY_VERIFY_ENABLED:
+        replay_verifier.start()
+    if SCORE_WRITE_BEHIND_ENABLED:
+        score_buffer.start()
+    # Starts the engine and sweeps here if this process holds the live games
+    await live_store.start()
     yield
+    await live_store.stop()
+    await viewer_presence.stop()
+    await live_games.stop()
+    await game_engine.stop()
+    # Commit every buffered score before the process exits
+    await score_buffer.stop()
+    password_hasher.shutdown()
+    replay_verifier.shutdown()
 
 app = FastAPI(title="Snake Arena API", lifespan=lifespan)
 
@@ -42,33 +125,163 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+)
+
+# Wakes /ws/live-games streams when a game changes
+live_game_events = LiveGameEvents()
+
+def _publish_live_game_changes(game_ids: List[str]):
+    for game_id in game_ids:
+        live_games.touch(game_id)
+        live_game_events.publish(game_id)
+
+# Advances the games it spawned (the bots) on a fixed tick; fed games are left alone
+game_engine = GameEngine(
+    live_games,
+    tick_seconds=LIVE_ENGINE_TICK_MS / 1000,
+    on_tick=_publish_live_game_changes
+)
+metrics.register("engine", game_engine.stats)
+
+bot_fleet = BotFleet(game_engine, size=LIVE_BOTS)
+metrics.register("bots", bot_fleet.stats)
+
+# Who is watching which game, kept alive by heartbeats
+viewer_presence = ViewerPresence(ttl=VIEWER_TTL, max_viewers=VIEWER_MAX)
+metrics.register("presence", viewer_presence.stats)
+
+def _start_live_games():
+    live_games.start()
+    viewer_presence.start()
+    if LIVE_ENGINE_ENABLED:
+        if LIVE_BOTS > 0:
+            bot_fleet.start()
+        game_engine.start()
+
+# What the live game routes go through; see live_store.py
+live_store = LocalLiveGameStore(live_games, viewer_presence, live_game_events)
+if LIVE_STORE == "socket":
+    live_store = SocketLiveGameStore(LIVE_STORE_SOCKET, local=live_store)
+    metrics.register("live_store", live_store.stats)
+elif LIVE_STORE != "memory":
+    raise ValueError(f"Unknown LIVE_STORE {LIVE_STORE!r}; expected 'memory' or 'socket'")
+live_store.on_hub = _start_live_games
+
+def _on_live_game_evicted(game_id: str):
+    game_engine.release(game_id)
+    viewer_presence.forget_game(game_id)
+    # Open spectator streams notice the game is gone and close
+    live_game_events.publish(game_id)
+
+live_games.on_evict = _on_live_game_evicted
+metrics.register("live_games", live_games.stats)
+
+# Encodes each spectator frame once per game and queues it for every viewer
+live_broadcaster = LiveGameBroadcaster(
+    queue_size=LIVE_STREAM_QUEUE, poll_interval=LIVE_ENGINE_TICK_MS / 1000
+)
+live_game_events.listeners.append(lambda game_id: live_broadcaster.publish(game_id, live_games.get(game_id)))
+metrics.register("broadcast", live_broadcaster.stats)
+
+# Decoded tokens and user rows for get_current_user (AUTH_CACHE_SIZE=0 disables)
+auth_cache = AuthCache(
+    maxsize=int(os.getenv("AUTH_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("AUTH_CACHE_TTL", "60")),
 )
+metrics.register("auth_cache", auth_cache.stats)
+
+# Serialized leaderboard pages with ETags (LEADERBOARD_CACHE_SIZE=0 disables)
+leaderboard_cache = LeaderboardCache(
+    maxsize=int(os.getenv("LEADERBOARD_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("LEADERBOARD_CACHE_TTL", "5")),
+)
+metrics.register("leaderboard_cache", leaderboard_cache.stats)
+
+def _on_scores_flushed(user_ids: List[str]):
+    for user_id in user_ids:
+        auth_cache.invalidate_user(user_id)
+    # Flushed scores reach player_best, which backs ?distinct=true
+    leaderboard_cache.invalidate()
+
+score_buffer = ScoreBuffer(
+    SessionLocal,
+    flush_interval=SCORE_FLUSH_INTERVAL_MS / 1000,
+    batch_size=SCORE_FLUSH_BATCH_SIZE,
+    on_flush=_on_scores_flushed,
+)
+metrics.register("score_buffer", score_buffer.stats)
 
 # Auth helper setup
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# sha256_crypt runs on worker processes so logins don't stall the event loop
+password_hasher = PasswordHasher(
+    workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(default_workers()))),
+    max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64")),
+)
+metrics.register("password_hashing", password_hasher.stats)
+
+@app.exception_handler(HasherBusy)
+async def hasher_busy_handler(request, exc: HasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many sign-in attempts in progress, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+# Replays are simulated in pure Python, so they get worker processes too
+replay_verifier = ReplayVerifier(
+    workers=int(os.getenv("REPLAY_VERIFY_WORKERS", str(default_workers()))),
+    max_pending=int(os.getenv("REPLAY_VERIFY_MAX_PENDING", "256")),
+)
+metrics.register("replay_verifier", replay_verifier.stats)
+
+@app.exception_handler(VerifierBusy)
+async def verifier_busy_handler(request, exc: VerifierBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many scores being verified, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+# The hub is unreachable, or failed to run the operation
+@app.exception_handler(StoreUnavailable)
+@app.exception_handler(HubError)
+async def live_store_unavailable_handler(request, exc: Exception):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Live games are temporarily unavailable"},
+        headers={"Retry-After": "1"},
+    )
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_password_and_upgrade(
+@db_offload
+def _save_password_hash(user_db: sql_models.User, hashed_password: str, db: Session):
+    db.add(user_db)
+    user_db.hashed_password = hashed_password
+    db.commit()
+    # Reload while attached; the caller reads the row after the session closes
+    db.refresh(user_db)
+
+async def verify_password_and_upgrade(
     plain_password: str,
     stored_hash: str,
     user_db: sql_models.User,
     db: Session
 ) -> bool:
     try:
-        verified = pwd_context.verify(plain_password, stored_hash)
+        verified = await password_hasher.verify(plain_password, stored_hash)
     except UnknownHashError:
         verified = plain_password == stored_hash
         if verified:
-            user_db.hashed_password = get_password_hash(plain_password)
-            db.commit()
+            await _save_password_hash(user_db, await password_hasher.hash(plain_password), db=db)
         return verified
 
-    if verified and pwd_context.needs_update(stored_hash):
-        user_db.hashed_password = get_password_hash(plain_password)
-        db.commit()
+    if verified and password_hasher.needs_update(stored_hash):
+        await _save_password_hash(user_db, await password_hasher.hash(plain_password), db=db)
     return verified
 
 def create_access_token(data: dict):
@@ -78,12 +291,29 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+@db_offload
+def get_current_user_row(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> sql_models.User:
+    """
+    The authenticated user's row, attached to the request's session.
+
+    The session is closed when this dependency returns, so handlers that
+    write to the row call ``db.add()`` on it first (no query is issued).
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    user_id = auth_cache.user_id_for(token)
+    if user_id is not None:
+        user = auth_cache.attach_user(user_id, db)
+        if user is None:
+            user = db.get(sql_models.User, user_id)
+            if user is None:
+                raise credentials_exception
+            auth_cache.remember_user(user)
+        return user
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -96,31 +326,39 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     user = db.query(sql_models.User).filter(sql_models.User.email == email).first()
     if user is None:
         raise credentials_exception
-        
+    auth_cache.remember_token(token, user.id, float(payload.get("exp", 0)))
+    auth_cache.remember_user(user)
+    return user
+
+async def get_current_user(user: sql_models.User = Depends(get_current_user_row)) -> User:
+    # Scores still in the write-behind buffer count too
+    pending_games, pending_best = score_buffer.pending_totals(user.id)
     # Convert SQLAlchemy model to Pydantic model
     return User(
         id=user.id,
         username=user.username,
         email=user.email,
         avatar=user.avatar,
-        highScore=user.highScore,
-        gamesPlayed=user.gamesPlayed,
+        highScore=max(user.highScore, pending_best),
+        gamesPlayed=user.gamesPlayed + pending_games,
         createdAt=user.createdAt
     )
 
 # --- Auth Routes ---
 
-@app.post("/auth/signup", response_model=AuthResponse)
-async def signup(credentials: SignUpCredentials, db: Session = Depends(get_db)):
-    # Check if user exists
+@db_offload
+def _find_user_by_email(email: str, db: Session) -> Optional[sql_models.User]:
+    return db.query(sql_models.User).filter(sql_models.User.email == email).first()
+
+@db_offload
+def _signup_taken(credentials: SignUpCredentials, db: Session) -> bool:
     existing_email = db.query(sql_models.User).filter(sql_models.User.email == credentials.email).first()
     existing_username = db.query(sql_models.User).filter(sql_models.User.username == credentials.username).first()
-    
-    if existing_email or existing_username:
-        raise HTTPException(status_code=400, detail="Email or username already exists")
-    
-    user_id = f"user_{int(datetime.utcnow().timestamp())}"
-    hashed_password = get_password_hash(credentials.password)
+    return bool(existing_email or existing_username)
+
+@db_offload
+def _create_user(credentials: SignUpCredentials, hashed_password: str, db: Session) -> sql_models.User:
+    user_id = new_id("user")
     
     new_user_db = sql_models.User(
         id=user_id,
@@ -135,6 +373,18 @@ async def signup(credentials: SignUpCredentials, db: Session = Depends(get_db)):
     db.add(new_user_db)
     db.commit()
     db.refresh(new_user_db)
+    return new_user_db
+
+@app.post("/auth/signup", response_model=AuthResponse)
+async def signup(credentials: SignUpCredentials, db: Session = Depends(get_db)):
+    # Check if user exists
+    if await _signup_taken(credentials, db=db):
+        raise HTTPException(status_code=400, detail="Email or username already exists")
+    
+    hashed_password = await password_hasher.hash(credentials.password)
+    new_user_db = await _create_user(credentials, hashed_password, db=db)
+    if user_rank_index.ready:
+        user_rank_index.add_user(new_user_db.id, new_user_db.highScore)
     
     token = create_access_token(data={"sub": new_user_db.email})
     
@@ -152,11 +402,11 @@ async def signup(credentials: SignUpCredentials, db: Session = Depends(get_db)):
 
 @app.post("/auth/login", response_model=AuthResponse)
 async def login(credentials: AuthCredentials, db: Session = Depends(get_db)):
-    user_db = db.query(sql_models.User).filter(sql_models.User.email == credentials.email).first()
+    user_db = await _find_user_by_email(credentials.email, db=db)
     if not user_db:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
-    if not verify_password_and_upgrade(credentials.password, user_db.hashed_password, user_db, db):
+    if not await verify_password_and_upgrade(credentials.password, user_db.hashed_password, user_db, db):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     token = create_access_token(data={"sub": user_db.email})
@@ -184,33 +434,164 @@ async def me(current_user: User = Depends(get_current_user)):
 # --- Leaderboard Routes ---
 
 @app.get("/leaderboard", response_model=List[LeaderboardEntry])
-async def get_leaderboard(mode: Optional[GameMode] = Query(None), db: Session = Depends(get_db)):
-    query = db.query(sql_models.LeaderboardEntry)
-    if mode:
-        query = query.filter(sql_models.LeaderboardEntry.mode == mode.value)
-    
-    # Sort by score descending
-    entries_db = query.order_by(sql_models.LeaderboardEntry.score.desc()).all()
-    
-    # Convert to Pydantic models
-    entries = []
-    for i, e in enumerate(entries_db):
-        entries.append(LeaderboardEntry(
-            id=e.id,
-            rank=i + 1,
-            userId=e.userId,
-            username=e.username,
-            avatar=e.avatar,
-            score=e.score,
-            mode=GameMode(e.mode), # Convert string back to Enum
-            date=e.date
-        ))
-    return entries
+async def get_leaderboard(
+    request: Request,
+    mode: Optional[GameMode] = Query(None),
+    limit: int = Query(LEADERBOARD_PAGE_SIZE, ge=1, le=LEADERBOARD_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    include_all: bool = Query(False, alias="all"),
+    distinct: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    key = (mode, limit, cursor, include_all, distinct)
+    page = leaderboard_cache.get(key)
+    if page is None:
+        # Read the version first; see LeaderboardCache.put()
+        version = leaderboard_cache.version
+        entries, next_cursor = await _leaderboard_page(mode, limit, cursor, include_all, distinct, db=db)
+        page = leaderboard_cache.put(key, version, to_json(entries), next_cursor)
+    return leaderboard_cache.respond(page, request.headers)
+
+@db_offload
+def _leaderboard_page(
+    mode: Optional[GameMode],
+    limit: int,
+    cursor: Optional[str],
+    include_all: bool,
+    distinct: bool,
+    db: Session
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of the leaderboard and the cursor for the next one (None on the last page).
+
+    Entries are ``LeaderboardEntry`` fields as plain values, ready for
+    ``to_json()``; see ``_leaderboard_row()``.
+    """
+    if distinct:
+        # One row per player, from the player_best projection
+        model = sql_models.PlayerBest
+        scope = mode.value if mode else player_best.ALL_MODES
+        # Taken before the query; see merge_pending()
+        pending = _pending_player_bests(mode, scope, db) if len(score_buffer) else []
+        query = db.query(model).filter(model.scope == scope)
+        if pending:
+            # Their unflushed best replaces the row in player_best
+            query = query.filter(model.userId.notin_([e.userId for e in pending]))
+    else:
+        if leaderboard_index.ready and not include_all:
+            return _leaderboard_page_from_index(mode, limit, cursor)
+
+        # Taken before the query; see merge_pending()
+        pending = score_buffer.pending(mode.value if mode else None) if len(score_buffer) else []
+
+        model = sql_models.LeaderboardEntry
+        query = db.query(model)
+        if mode:
+            query = query.filter(model.mode == mode.value)
+
+    # Sort by score descending; date and id break ties so pages are stable
+    query = query.order_by(
+        model.score.desc(),
+        model.date.asc(),
+        model.id.asc()
+    )
+
+    # Legacy path: the whole table in one response
+    if include_all:
+        rows = merge_pending(query.all(), pending)
+        return [_leaderboard_row(e, i + 1) for i, e in enumerate(rows)], None
+
+    rank_offset = 0
+    after = None
+    if cursor:
+        try:
+            after = LeaderboardCursor.decode(cursor)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(_after_cursor(after, model))
+        rank_offset = after.rank
+
+    # Fetch one extra row to know whether another page exists
+    entries_db = query.limit(limit + 1).all()
+    if pending:
+        after_key = sort_key(after) if after else None
+        entries_db = merge_pending(entries_db, pending, after_key, limit + 1)
+    entries = [_leaderboard_row(e, rank_offset + i + 1) for i, e in enumerate(entries_db[:limit])]
+    return entries, _next_cursor(entries, has_more=len(entries_db) > limit)
+
+def _pending_player_bests(mode: Optional[GameMode], scope: str, db: Session) -> List[IndexedEntry]:
+    """Unflushed entries that beat their player's row in ``player_best``, one per player, in leaderboard order."""
+    best: Dict[str, IndexedEntry] = {}
+    for e in score_buffer.pending(mode.value if mode else None):
+        best.setdefault(e.userId, e)
+    if not best:
+        return []
+    model = sql_models.PlayerBest
+    flushed = {
+        row.userId: row
+        for row in db.query(model).filter(model.scope == scope, model.userId.in_(list(best)))
+    }
+    return [e for e in best.values() if e.userId not in flushed or sort_key(e) < sort_key(flushed[e.userId])]
+
+def _leaderboard_page_from_index(
+    mode: Optional[GameMode], limit: int, cursor: Optional[str]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    mode_value = mode.value if mode else None
+    offset = 0
+    if cursor:
+        try:
+            after = LeaderboardCursor.decode(cursor)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        offset = leaderboard_index.offset_after(after.score, after.date, after.id, mode_value)
+
+    rows = leaderboard_index.page(offset, limit + 1, mode_value)
+    entries = [_leaderboard_row(e, offset + i + 1) for i, e in enumerate(rows[:limit])]
+    return entries, _next_cursor(entries, has_more=len(rows) > limit)
+
+def _next_cursor(entries: List[Dict[str, Any]], has_more: bool) -> Optional[str]:
+    if not has_more:
+        return None
+    last = entries[-1]
+    return LeaderboardCursor(score=last["score"], date=last["date"], id=last["id"], rank=last["rank"]).encode()
+
+def _after_cursor(after: LeaderboardCursor, entry=sql_models.LeaderboardEntry):
+    return or_(
+        entry.score < after.score,
+        and_(entry.score == after.score, entry.date > after.date),
+        and_(entry.score == after.score, entry.date == after.date, entry.id > after.id),
+    )
+
+def _leaderboard_row(e: sql_models.LeaderboardEntry, rank: int) -> Dict[str, Any]:
+    # Rows from the database or the index are already valid, so they are encoded
+    # as they are instead of being validated into a LeaderboardEntry first
+    return {
+        "id": e.id,
+        "rank": rank,
+        "userId": e.userId,
+        "username": e.username,
+        "avatar": e.avatar,
+        "score": e.score,
+        "mode": e.mode,
+        "date": e.date,
+    }
+
+def _to_leaderboard_entry(e: sql_models.LeaderboardEntry, rank: int) -> LeaderboardEntry:
+    return LeaderboardEntry(
+        id=e.id,
+        rank=rank,
+        userId=e.userId,
+        username=e.username,
+        avatar=e.avatar,
+        score=e.score,
+        mode=GameMode(e.mode), # Convert string back to Enum
+        date=e.date
+    )
 
 @app.post("/leaderboard/submit", response_model=LeaderboardEntry)
 async def submit_score(
     score_data: dict, 
-    current_user: User = Depends(get_current_user),
+    user_db: sql_models.User = Depends(get_current_user_row),
     db: Session = Depends(get_db)
 ):
     score = score_data.get("score")
@@ -218,30 +599,48 @@ async def submit_score(
     
     if score is None or mode is None:
         raise HTTPException(status_code=400, detail="Score and mode are required")
+    try:
+        submission = ScoreSubmission.model_validate({"score": score, "mode": mode})
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="Invalid score or mode")
+    score, mode = submission.score, submission.mode.value
+    replay = _parse_replay(score_data.get("replay"))
+    await _verify_replays([(mode, score, replay)])
+    return await _record_score(user_db, score, mode, replay, db=db)
+
+@db_offload
+def _record_score(user_db: sql_models.User, score: int, mode: str, replay: Optional[Replay], db: Session):
+    if SCORE_WRITE_BEHIND_ENABLED:
+        return _buffer_score(user_db, score, mode, replay)
     
-    entry_id = f"score_{int(datetime.utcnow().timestamp())}"
+    entry_id = new_id("score")
     new_entry_db = sql_models.LeaderboardEntry(
         id=entry_id,
         rank=0, # Calculated on read
-        userId=current_user.id,
-        username=current_user.username,
-        avatar=current_user.avatar,
+        userId=user_db.id,
+        username=user_db.username,
+        avatar=user_db.avatar,
         score=score,
         mode=mode, # Storing as string (Enum value)
         date=datetime.utcnow()
     )
     
     db.add(new_entry_db)
+    if replay is not None:
+        db.add(sql_models.Replay(entryId=entry_id, data=replay.encode()))
+    player_best.upsert(db, [new_entry_db])
     
     # Update user's high score if applicable
-    user_db = db.query(sql_models.User).filter(sql_models.User.id == current_user.id).first()
-    if user_db:
-        if score > user_db.highScore:
-            user_db.highScore = score
-        user_db.gamesPlayed += 1
+    previous_high_score = _add_user_games(db, user_db.id, 1, score)
     
     db.commit()
+    auth_cache.invalidate_user(user_db.id)
+    leaderboard_cache.invalidate()
     db.refresh(new_entry_db)
+    if leaderboard_index.ready:
+        leaderboard_index.add(new_entry_db)
+    if score > previous_high_score and user_rank_index.ready:
+        user_rank_index.update(user_db.id, previous_high_score, score)
     
     return LeaderboardEntry(
         id=new_entry_db.id,
@@ -254,45 +653,233 @@ async def submit_score(
         date=new_entry_db.date
     )
 
+def _add_user_games(db: Session, user_id: str, games: int, best: int) -> int:
+    """
+    Count ``games`` more games for the user and raise their high score to ``best``.
+
+    The user row may have been rebuilt from the auth cache, so its counters can
+    be stale: they are read under a row lock and updated with SQL expressions.
+    Returns the high score before the update.
+    """
+    previous_high_score = db.execute(
+        select(sql_models.User.highScore).where(sql_models.User.id == user_id).with_for_update()
+    ).scalar_one()
+    db.execute(add_games, {"user_id": user_id, "games": games, "best": best})
+    return previous_high_score
+
+def _parse_replay(raw) -> Optional[Replay]:
+    if raw is None:
+        return None
+    try:
+        upload = ReplayUpload.model_validate(raw)
+        return Replay.from_moves(upload.seed, upload.moves, upload.durationMs)
+    except (ValidationError, InvalidReplay):
+        raise HTTPException(status_code=400, detail="Invalid replay")
+
+async def _verify_replays(submissions: List[Tuple[str, int, Optional[Replay]]]):
+    """Reject the whole submission unless every replay plays back to its score."""
+    if REPLAY_REQUIRED and any(replay is None for _, _, replay in submissions):
+        raise HTTPException(status_code=422, detail="Replay required")
+    # One request holds one verifier slot, so bound the work behind it
+    if sum(replay.ticks for _, _, replay in submissions if replay is not None) > REPLAY_MAX_TICKS_PER_REQUEST:
+        raise HTTPException(status_code=422, detail="Replays too long")
+    if not REPLAY_VERIFY_ENABLED:
+        return
+    checks = [(mode, score, replay.encode()) for mode, score, replay in submissions if replay is not None]
+    if not checks:
+        return
+    for reason in await replay_verifier.check_many(checks):
+        if reason is not None:
+            raise HTTPException(status_code=422, detail=f"Replay rejected: {reason}")
+
+def _buffer_score(
+    user_db: sql_models.User, score: int, mode: str, replay: Optional[Replay] = None
+) -> LeaderboardEntry:
+    """Write-behind variant of submit_score: queue the row, update the in-memory indexes."""
+    entry = IndexedEntry(
+        new_id("score"), user_db.id, user_db.username, user_db.avatar, score, mode, datetime.utcnow()
+    )
+    high_score = max(user_db.highScore, score_buffer.pending_totals(user_db.id)[1])
+    score_buffer.add(entry, replay.encode() if replay is not None else None)
+    leaderboard_cache.invalidate()
+    if leaderboard_index.ready:
+        leaderboard_index.add(entry)
+    if score > high_score and user_rank_index.ready:
+        user_rank_index.update(user_db.id, high_score, score)
+    return _to_leaderboard_entry(entry, 0)
+
+@app.post("/leaderboard/submit/batch", response_model=List[LeaderboardEntry])
+async def submit_score_batch(
+    batch: ScoreBatch,
+    user_db: sql_models.User = Depends(get_current_user_row),
+    db: Session = Depends(get_db)
+):
+    """Record many finished games in one transaction: one INSERT, one user UPDATE."""
+    replays = [
+        Replay.from_moves(item.replay.seed, item.replay.moves, item.replay.durationMs) if item.replay else None
+        for item in batch.scores
+    ]
+    await _verify_replays([(item.mode.value, item.score, r) for item, r in zip(batch.scores, replays)])
+    return await _record_score_batch(batch, replays, user_db, db=db)
+
+@db_offload
+def _record_score_batch(
+    batch: ScoreBatch, replays: List[Optional[Replay]], user_db: sql_models.User, db: Session
+) -> List[LeaderboardEntry]:
+    now = datetime.utcnow()
+    entries = [
+        IndexedEntry(new_id("score"), user_db.id, user_db.username, user_db.avatar, item.score, item.mode.value, now)
+        for item in batch.scores
+    ]
+    db.execute(insert(sql_models.LeaderboardEntry), [{**e._asdict(), "rank": 0} for e in entries])
+    replay_rows = [
+        {"entryId": e.id, "data": replay.encode()} for e, replay in zip(entries, replays) if replay is not None
+    ]
+    if replay_rows:
+        db.execute(insert(sql_models.Replay), replay_rows)
+    player_best.upsert(db, entries)
+
+    best = max(item.score for item in batch.scores)
+    previous_high_score = _add_user_games(db, user_db.id, len(entries), best)
+
+    db.commit()
+    auth_cache.invalidate_user(user_db.id)
+    leaderboard_cache.invalidate()
+    if leaderboard_index.ready:
+        for entry in entries:
+            leaderboard_index.add(entry)
+    if best > previous_high_score and user_rank_index.ready:
+        user_rank_index.update(user_db.id, previous_high_score, best)
+
+    return [_to_leaderboard_entry(e, 0) for e in entries]
+
+@app.get("/leaderboard/{entry_id}/replay")
+async def get_replay(entry_id: str, db: Session = Depends(get_db)):
+    """Stream a recorded game as NDJSON: a header line, then the moves in chunks."""
+    found = await _load_replay(entry_id, db=db)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Replay not found")
+    entry, data = found
+    replay = Replay.decode(data)
+    header = {
+        "entryId": entry.id, "mode": entry.mode, "score": entry.score,
+        "seed": replay.seed, "ticks": replay.ticks, "durationMs": replay.duration_ms,
+    }
+
+    async def lines():
+        yield json.dumps(header) + "\n"
+        # Decoded one chunk at a time, as the client reads
+        for moves in replay.moves(REPLAY_CHUNK_TICKS):
+            yield json.dumps({"moves": moves}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@db_offload
+def _load_replay(entry_id: str, db: Session):
+    pending = score_buffer.pending_replay(entry_id) if len(score_buffer) else None
+    if pending is not None:
+        return pending
+    return (
+        db.query(sql_models.LeaderboardEntry, sql_models.Replay.data)
+        .join(sql_models.Replay, sql_models.Replay.entryId == sql_models.LeaderboardEntry.id)
+        .filter(sql_models.LeaderboardEntry.id == entry_id)
+        .first()
+    )
+
 # --- Live Games Routes (In-Memory) ---
 
 @app.get("/live-games", response_model=List[LiveGame])
-async def get_live_games():
-    return list(live_games.values())
+async def get_live_games(
+    mode: Optional[GameMode] = Query(None),
+    game_status: Optional[GameStatus] = Query(None, alias="status"),
+    limit: int = Query(LIVE_GAMES_PAGE_SIZE, ge=1, le=LIVE_GAMES_MAX_PAGE_SIZE),
+):
+    # Encoded from the registry directly; response_model still documents the schema
+    return Response(await live_store.list_games_json(mode, game_status, limit), media_type="application/json")
 
 @app.get("/live-games/{game_id}", response_model=LiveGame)
 async def get_live_game(game_id: str):
-    game = live_games.get(game_id)
+    game = await live_store.get_game(game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     return game
 
 @app.post("/live-games/{game_id}/join")
-async def join_as_viewer(game_id: str):
-    game = live_games.get(game_id)
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-    game.viewers += 1
-    return {"detail": "Joined successfully"}
+async def join_as_viewer(game_id: str, viewer: Optional[ViewerHeartbeat] = None):
+    # Clients that don't send a viewer id still count until VIEWER_TTL passes
+    viewer_id = viewer.viewerId if viewer else new_id("viewer")
+    viewers = await _viewer_heartbeat(game_id, viewer_id)
+    return {"detail": "Joined successfully", "viewerId": viewer_id, "viewers": viewers}
+
+@app.post("/live-games/{game_id}/heartbeat")
+async def viewer_heartbeat(game_id: str, viewer: ViewerHeartbeat):
+    return {"viewers": await _viewer_heartbeat(game_id, viewer.viewerId), "ttl": VIEWER_TTL}
 
 @app.post("/live-games/{game_id}/leave")
-async def leave_as_viewer(game_id: str):
-    game = live_games.get(game_id)
-    if not game:
+async def leave_as_viewer(game_id: str, viewer: Optional[ViewerHeartbeat] = None):
+    try:
+        if viewer:
+            await live_store.leave(game_id, viewer.viewerId)
+        elif await live_store.get_game(game_id) is None:
+            raise GameNotFound(game_id)
+    except GameNotFound:
         raise HTTPException(status_code=404, detail="Game not found")
-    if game.viewers > 0:
-        game.viewers -= 1
     return {"detail": "Left successfully"}
 
+async def _viewer_heartbeat(game_id: str, viewer_id: str) -> int:
+    try:
+        viewers = await live_store.heartbeat(game_id, viewer_id)
+    except GameNotFound:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if viewers is None:
+        raise HTTPException(status_code=503, detail="Too many viewers", headers={"Retry-After": "5"})
+    return viewers
+
+@app.websocket("/ws/live-games/{game_id}")
+async def live_game_stream(websocket: WebSocket, game_id: str):
+    await websocket.accept()
+    game = await live_store.get_state(game_id)
+    if not game:
+        await websocket.close(code=4404, reason="Game not found")
+        return
+
+    # Only workers that don't hold the games need to poll for changes
+    poll = None if live_store.owns_games else live_store.get_state
+    subscriber = live_broadcaster.subscribe(game, poll=poll)
+    # Viewers don't send anything; reading only tells us when they go away
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket, subscriber))
+    try:
+        while (frame := await subscriber.get()) is not None:
+            await websocket.send_text(frame)
+        if not disconnected.done():
+            if subscriber.channel.failed:
+                # Polling the live game hub kept failing; the client may reconnect
+                await websocket.close(code=1011, reason="Live game unavailable")
+            else:
+                await websocket.close(code=4404, reason="Game ended")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        live_broadcaster.unsubscribe(subscriber)
+
+async def _wait_for_disconnect(websocket: WebSocket, subscriber):
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            subscriber.close()
+            return
+
 # --- User Profile Routes ---
 
 @app.patch("/users/profile", response_model=User)
-async def update_profile(
+@db_offload
+def update_profile(
     updates: dict, 
-    current_user: User = Depends(get_current_user),
+    user_db: sql_models.User = Depends(get_current_user_row),
     db: Session = Depends(get_db)
 ):
-    user_db = db.query(sql_models.User).filter(sql_models.User.id == current_user.id).first()
+    db.add(user_db)
     
     if "username" in updates:
         user_db.username = updates["username"]
@@ -300,6 +887,7 @@ async def update_profile(
         user_db.avatar = updates["avatar"]
     
     db.commit()
+    auth_cache.invalidate_user(user_db.id)
     db.refresh(user_db)
     
     return User(
@@ -313,37 +901,59 @@ async def update_profile(
     )
 
 @app.get("/users/{user_id}/stats", response_model=UserStats)
-async def get_user_stats(user_id: str, db: Session = Depends(get_db)):
+@db_offload
+def get_user_stats(user_id: str, db: Session = Depends(get_db)):
     user_db = db.query(sql_models.User).filter(sql_models.User.id == user_id).first()
     if not user_db:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Calculate rank based on high score
-    # Optimized: count users with higher score + 1
-    rank = db.query(sql_models.User).filter(sql_models.User.highScore > user_db.highScore).count() + 1
+    pending_games, pending_best = score_buffer.pending_totals(user_id)
+    high_score = max(user_db.highScore, pending_best)
+    
+    # Calculate rank based on high score: count users with higher score + 1
+    if user_rank_index.ready:
+        rank = user_rank_index.rank(high_score)
+    else:
+        rank = db.query(sql_models.User).filter(sql_models.User.highScore > high_score).count() + 1
     
     return UserStats(
-        highScore=user_db.highScore,
-        gamesPlayed=user_db.gamesPlayed,
+        highScore=high_score,
+        gamesPlayed=user_db.gamesPlayed + pending_games,
         rank=rank
     )
 
+# --- Metrics ---
+
+@app.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
+
 # --- Static Files & SPA Routing ---
 
 # Mount the static directory
-# This assumes the frontend build output is in /app/static
-if os.path.exists("/app/static"):
-    app.mount("/static", StaticFiles(directory="/app/static"), name="static")
+# This assumes the frontend build output is in STATIC_DIR
+if os.path.exists(STATIC_DIR):
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+
+# Paths, encodings and headers of the built frontend, filled in at startup
+static_manifest = StaticManifest(STATIC_DIR, memory_limit=STATIC_MEMORY_MAX)
+metrics.register("static", static_manifest.stats)
 
 @app.get("/{full_path:path}")
-async def serve_spa(full_path: str):
-    # If the file exists in /app/static, serve it
-    file_path = os.path.join("/app/static", full_path)
+async def serve_spa(full_path: str, request: Request):
+    if STATIC_MANIFEST_ENABLED:
+        response = static_manifest.respond(full_path, request.headers)
+        if response is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return response
+
+    # If the file exists in STATIC_DIR, serve it
+    file_path = os.path.join(STATIC_DIR, full_path)
     if os.path.isfile(file_path):
         return FileResponse(file_path)
     
     # Catch-all: serve index.html for SPA routing
-    index_path = os.path.join("/app/static", "index.html")
+    index_path = os.path.join(STATIC_DIR, "index.html")
     if os.path.exists(index_path):
         return FileResponse(index_path)
     
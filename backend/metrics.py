@@ -0,0 +1,18 @@
+"""
+Runtime metrics exposed at ``GET /metrics``.
+
+Subsystems register a zero-argument callable returning a JSON-serializable
+dict; the endpoint calls each one when it is scraped.
+"""
+
+from typing import Any, Callable, Dict
+
+_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, source: Callable[[], Dict[str, Any]]):
+    _sources[name] = source
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: source() for name, source in _sources.items()}
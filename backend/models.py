@@ -13,6 +13,12 @@ class GameStatus(str, Enum):
     PAUSED = "paused"
     GAME_OVER = "game-over"
 
+class Direction(str, Enum):
+    UP = "UP"
+    DOWN = "DOWN"
+    LEFT = "LEFT"
+    RIGHT = "RIGHT"
+
 class Position(BaseModel):
     x: int
     y: int
@@ -47,6 +53,26 @@ class LeaderboardEntry(BaseModel):
     mode: GameMode
     date: datetime = Field(default_factory=datetime.utcnow)
 
+class ReplayUpload(BaseModel):
+    # Seed of the game's food generator
+    seed: int = Field(ge=0, lt=2**32)
+    # The direction taken on each tick: U, D, L or R
+    moves: str = Field(max_length=200_000, pattern="^[UDLR]*$")
+    durationMs: int = Field(ge=0)
+
+class ScoreSubmission(BaseModel):
+    # Fits the INTEGER column on every backend
+    score: int = Field(ge=0, lt=2**31)
+    mode: GameMode
+    replay: Optional[ReplayUpload] = None
+
+class ScoreBatch(BaseModel):
+    scores: List[ScoreSubmission] = Field(min_length=1, max_length=1000)
+
+class ViewerHeartbeat(BaseModel):
+    # Chosen by the client, e.g. one random id per browser tab
+    viewerId: str = Field(min_length=1, max_length=64)
+
 class LiveGame(BaseModel):
     id: str
     playerId: str
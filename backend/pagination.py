@@ -0,0 +1,45 @@
+"""
+Keyset cursors for the leaderboard.
+
+Leaderboard pages are ordered by ``score DESC, date ASC, id ASC``; a cursor
+captures the sort key of the last row on a page plus its rank so the next
+page can continue with an index range scan and keep ranks stable.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class LeaderboardCursor:
+    score: int
+    date: datetime
+    id: str
+    rank: int
+
+    def encode(self) -> str:
+        raw = json.dumps(
+            [self.score, self.date.isoformat(), self.id, self.rank],
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "LeaderboardCursor":
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            score, date, entry_id, rank = json.loads(base64.urlsafe_b64decode(padded))
+            return cls(
+                score=int(score),
+                date=datetime.fromisoformat(date),
+                id=str(entry_id),
+                rank=int(rank),
+            )
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor(str(e)) from e
@@ -0,0 +1,51 @@
+"""
+Password hashing on a bounded process pool.
+
+``sha256_crypt`` runs hundreds of thousands of rounds in pure Python and holds
+the GIL the whole time, so hashing in the server process stalls every other
+request, whichever thread it runs on. ``PasswordHasher`` runs it on a
+``ProcessPool`` (see process_pool.py) instead.
+
+Requests beyond ``max_pending`` in flight are rejected with ``HasherBusy``
+rather than queued: a login burst then degrades into fast 503s for the
+excess instead of unbounded latency for everyone.
+"""
+
+from typing import Any, Dict
+
+from passlib.context import CryptContext
+
+from process_pool import PoolBusy, ProcessPool
+
+pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+
+
+class HasherBusy(PoolBusy):
+    """Too many hash operations are already queued."""
+
+
+# Module-level so the process pool can pickle them by reference
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, stored_hash: str) -> bool:
+    return pwd_context.verify(password, stored_hash)
+
+
+class PasswordHasher(ProcessPool):
+    busy_error = HasherBusy
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, stored_hash: str) -> bool:
+        """Like ``CryptContext.verify``, including ``UnknownHashError`` for unrecognized hashes."""
+        return await self._run(_verify, password, stored_hash)
+
+    def needs_update(self, stored_hash: str) -> bool:
+        # Only parses the hash; cheap enough to run inline
+        return pwd_context.needs_update(stored_hash)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "rejected": self.busy}
@@ -0,0 +1,90 @@
+"""
+Maintained ``(userId, mode) -> best entry`` projection behind
+``GET /leaderboard?distinct=true``.
+
+The ``leaderboard`` table keeps every game, so showing each player once would
+need a GROUP BY over all of them. ``player_best`` holds at most one row per
+player and scope: one per game mode, plus ``"all"`` for the best across modes.
+Writes upsert into it, so a distinct leaderboard page is an index range scan
+over players rather than games.
+"""
+
+import functools
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import and_, func, insert, literal, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+import sql_models
+from leaderboard_index import sort_key
+
+ALL_MODES = "all"
+
+_COLUMNS = ("id", "userId", "username", "avatar", "score", "mode", "date")
+
+
+def best_per_player(entries: Iterable) -> Dict[Tuple[str, str], dict]:
+    """The best of ``entries`` per (userId, scope), in leaderboard order."""
+    best: Dict[Tuple[str, str], object] = {}
+    for e in entries:
+        for scope in (e.mode, ALL_MODES):
+            key = (e.userId, scope)
+            current = best.get(key)
+            if current is None or sort_key(e) < sort_key(current):
+                best[key] = e
+    return {
+        key: {"scope": key[1], **{column: getattr(e, column) for column in _COLUMNS}}
+        for key, e in best.items()
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _upsert_statement(dialect: str):
+    if dialect == "postgresql":
+        stmt = postgresql.insert(sql_models.PlayerBest)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(sql_models.PlayerBest)
+    else:
+        raise NotImplementedError(f"player_best upsert is not implemented for {dialect}")
+
+    table = sql_models.PlayerBest.__table__
+    new = stmt.excluded
+    # Replace only an entry that ranks below the new one (same order as the leaderboard)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.userId, table.c.scope],
+        set_={column: new[column] for column in _COLUMNS if column != "userId"},
+        where=or_(
+            new.score > table.c.score,
+            and_(new.score == table.c.score, new.date < table.c.date),
+            and_(new.score == table.c.score, new.date == table.c.date, new.id < table.c.id),
+        ),
+    )
+
+
+def upsert(db: Session, entries: Iterable):
+    """Fold new leaderboard entries into the projection (caller commits)."""
+    rows = list(best_per_player(entries).values())
+    if rows:
+        db.execute(_upsert_statement(db.get_bind().dialect.name), rows)
+
+
+def rebuild(db: Session):
+    """Recompute the projection from the whole leaderboard table (caller commits)."""
+    entry = sql_models.LeaderboardEntry
+    db.query(sql_models.PlayerBest).delete()
+    for scope, partition in ((entry.mode, (entry.userId, entry.mode)), (literal(ALL_MODES), (entry.userId,))):
+        ranked = select(
+            entry.userId, scope.label("scope"), entry.id, entry.username, entry.avatar, entry.score, entry.mode,
+            entry.date,
+            func.row_number().over(partition_by=partition, order_by=(entry.score.desc(), entry.date, entry.id)).label("n"),
+        ).subquery()
+        columns = ["userId", "scope", *(c for c in _COLUMNS if c != "userId")]
+        best = select(*(ranked.c[c] for c in columns)).where(ranked.c.n == 1)
+        db.execute(insert(sql_models.PlayerBest).from_select(columns, best))
+
+
+def needs_backfill(db: Session) -> bool:
+    """True for a database created before the projection existed."""
+    has_games = db.query(sql_models.LeaderboardEntry.id).limit(1).first() is not None
+    return has_games and db.query(func.count()).select_from(sql_models.PlayerBest).scalar() == 0
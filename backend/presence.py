@@ -0,0 +1,165 @@
+"""
+Heartbeat-based viewer presence for live games.
+
+Spectators identify themselves with a client-chosen viewer id and repeat
+``heartbeat()`` while they watch. A viewer who stops sending heartbeats (a
+closed tab, a lost ``leave`` call) drops out ``ttl`` seconds after the last
+one, so counts cannot drift upwards. A heartbeat is idempotent: repeating it
+or retrying it never counts a viewer twice.
+
+Expiry uses a time wheel: a ring of ``ceil(ttl / resolution) + 1`` buckets.
+Each bucket holds the viewers whose presence runs out in one ``resolution``
+slot. A heartbeat moves the viewer to the bucket for ``now + ttl``, and
+``advance()`` empties the buckets whose slot has passed. Both are O(1) per
+viewer, however many viewers there are. Reading a game's viewer count is a
+``len()``. Memory is bounded by ``max_viewers``; heartbeats from new viewers
+are refused once it is reached.
+
+Like the live game registry, this must only be used from the event loop.
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+Key = Tuple[str, str]
+
+
+class ViewerPresence:
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        resolution: float = 1.0,
+        max_viewers: int = 500_000,
+        clock: Callable[[], float] = time.monotonic,
+        on_change: Optional[Callable[[Iterable[str]], None]] = None,
+    ):
+        self.ttl = ttl
+        self.resolution = resolution
+        self.max_viewers = max_viewers
+        self.on_change = on_change
+        self._clock = clock
+        self._ttl_ticks = max(1, math.ceil(ttl / resolution))
+        self._wheel: List[Dict[Key, None]] = [{} for _ in range(self._ttl_ticks + 1)]
+        self._tick = self._now_tick()
+        # (game id, viewer id) -> tick at which the viewer expires
+        self._expires: Dict[Key, int] = {}
+        self._by_game: Dict[str, Dict[str, None]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.heartbeats = 0
+        self.expired = 0
+        self.rejected = 0
+
+    def _now_tick(self) -> int:
+        return int(self._clock() / self.resolution)
+
+    def heartbeat(self, game_id: str, viewer_id: str) -> Optional[int]:
+        """Mark a viewer present for another ``ttl``; returns the game's count, or None if full."""
+        self.advance()
+        key = (game_id, viewer_id)
+        old = self._expires.get(key)
+        if old is None and len(self._expires) >= self.max_viewers:
+            self.rejected += 1
+            return None
+        self.heartbeats += 1
+
+        expires = self._tick + self._ttl_ticks
+        if old is not None:
+            if old == expires:
+                return len(self._by_game[game_id])
+            del self._wheel[old % len(self._wheel)][key]
+        self._wheel[expires % len(self._wheel)][key] = None
+        self._expires[key] = expires
+        if old is None:
+            self._by_game.setdefault(game_id, {})[viewer_id] = None
+            self._changed([game_id])
+        return len(self._by_game[game_id])
+
+    def leave(self, game_id: str, viewer_id: str) -> bool:
+        key = (game_id, viewer_id)
+        expires = self._expires.pop(key, None)
+        if expires is None:
+            return False
+        del self._wheel[expires % len(self._wheel)][key]
+        self._remove_viewer(game_id, viewer_id)
+        self._changed([game_id])
+        return True
+
+    def forget_game(self, game_id: str):
+        """Drop every viewer of a game that no longer exists."""
+        for viewer_id in self._by_game.pop(game_id, {}):
+            key = (game_id, viewer_id)
+            del self._wheel[self._expires.pop(key) % len(self._wheel)][key]
+
+    def count(self, game_id: str) -> int:
+        viewers = self._by_game.get(game_id)
+        return len(viewers) if viewers else 0
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def _remove_viewer(self, game_id: str, viewer_id: str):
+        viewers = self._by_game[game_id]
+        del viewers[viewer_id]
+        if not viewers:
+            del self._by_game[game_id]
+
+    def _changed(self, game_ids: Iterable[str]):
+        if self.on_change:
+            self.on_change(game_ids)
+
+    def advance(self) -> int:
+        """Expire viewers whose last heartbeat is ``ttl`` old; returns how many."""
+        now = self._now_tick()
+        if now <= self._tick:
+            return 0
+        # Past a full turn of the wheel every bucket has expired
+        first = max(self._tick + 1, now - len(self._wheel) + 1)
+        self._tick = now
+        changed: Set[str] = set()
+        expired = 0
+        for tick in range(first, now + 1):
+            bucket = self._wheel[tick % len(self._wheel)]
+            if not bucket:
+                continue
+            self._wheel[tick % len(self._wheel)] = {}
+            for game_id, viewer_id in bucket:
+                del self._expires[(game_id, viewer_id)]
+                self._remove_viewer(game_id, viewer_id)
+                changed.add(game_id)
+            expired += len(bucket)
+        self.expired += expired
+        if changed:
+            self._changed(changed)
+        return expired
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.resolution)
+            self.advance()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "viewers": len(self._expires),
+            "games": len(self._by_game),
+            "heartbeats": self.heartbeats,
+            "expired": self.expired,
+            "rejected": self.rejected,
+            "ttl": self.ttl,
+            "max_viewers": self.max_viewers,
+        }
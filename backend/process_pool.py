@@ -0,0 +1,103 @@
+"""
+Bounded process pools for CPU-bound work that holds the GIL.
+
+Pure-Python work such as password hashing or replay simulation stalls every
+other request in the server process, whichever thread it runs on.
+``ProcessPool`` sends it to a ``ProcessPoolExecutor`` instead and awaits the
+result. Until ``start()`` (or with ``workers=0``) the work runs on a thread
+in this process.
+
+Calls beyond ``max_pending`` in flight are rejected with the pool's
+``PoolBusy`` subclass rather than queued: a burst then degrades into fast
+503s for the excess instead of unbounded latency for everyone.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+
+from anyio import to_thread
+
+# Per pool and per server process, so keep it small
+MAX_DEFAULT_WORKERS = 4
+
+
+class PoolBusy(Exception):
+    """Too many operations are already in flight."""
+
+
+def default_workers() -> int:
+    """
+    CPUs this process may run on, at most ``MAX_DEFAULT_WORKERS``.
+
+    ``os.cpu_count()`` is the host's core count, which in a container can be
+    far more than its CPU quota, and every uvicorn worker starts its own pools.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        available = len(os.sched_getaffinity(0))
+    else:
+        available = os.cpu_count() or 1
+    return min(MAX_DEFAULT_WORKERS, available)
+
+
+class ProcessPool:
+    busy_error: Type[PoolBusy] = PoolBusy
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.busy = 0
+        self._latencies_ms = deque(maxlen=1024)
+
+    def start(self):
+        """Start the worker processes; until then work runs on a thread in this process."""
+        if self._executor is None and self.workers > 0:
+            # spawn: forking a process that already runs threads is unsafe
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        return (await self._map(fn, [args]))[0]
+
+    async def _map(self, fn: Callable[..., Any], calls: Sequence[tuple]) -> List[Any]:
+        """``fn(*args)`` for each of ``calls``, spread over the pool; together they take one pending slot."""
+        if self.pending >= self.max_pending:
+            self.busy += 1
+            raise self.busy_error()
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            if self._executor is None:
+                return [await to_thread.run_sync(fn, *args) for args in calls]
+            loop = asyncio.get_running_loop()
+            return list(await asyncio.gather(*(loop.run_in_executor(self._executor, fn, *args) for args in calls)))
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self._latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self._latencies_ms)
+
+        def percentile(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 3) if ordered else 0.0
+
+        return {
+            "workers": self.workers if self._executor is not None else 0,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "p50_ms": percentile(0.5),
+            "p99_ms": percentile(0.99),
+        }
@@ -0,0 +1,125 @@
+"""
+Compact binary game replays.
+
+A game is fully described by the seed of its food generator and the
+direction the snake moved on each tick. Tick timing follows from the speed
+rule (150 ms, 5 ms faster per food, down to 50 ms), so apart from the wall
+clock duration nothing else is stored. The encoding is:
+
+    version   1 byte   (1)
+    seed      4 bytes  unsigned, little-endian
+    ticks     varint   (unsigned LEB128)
+    duration  varint   milliseconds from start to game over
+    moves     ceil(ticks / 4) bytes, 2 bits per tick, first tick in the low bits
+
+Directions are coded by their index in ``MOVE_LETTERS`` (the order of
+``game_engine.DIRECTIONS``). A 1000-tick game takes 256 bytes.
+
+On the API, moves travel as a string with one letter per tick (``U``, ``D``,
+``L``, ``R``). ``Replay.moves()`` decodes the packed form back to letters a
+chunk at a time, so a long replay can be streamed without expanding it all
+first.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import Iterator, Tuple
+
+import numpy as np
+
+VERSION = 1
+MOVE_LETTERS = "UDLR"
+# A game long enough to fill the board several times over
+MAX_TICKS = 200_000
+
+_LETTERS = MOVE_LETTERS.encode()
+_LETTER_CODES = bytes.maketrans(_LETTERS, bytes(range(4)))
+_CODE_LETTERS = bytes.maketrans(bytes(range(4)), _LETTERS)
+_SHIFTS = np.array([0, 2, 4, 6], dtype=np.uint8)
+_SEED = struct.Struct("<BI")
+
+
+class InvalidReplay(ValueError):
+    pass
+
+
+def _write_varint(value: int, out: bytearray):
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        if offset >= len(data) or shift > 63:
+            raise InvalidReplay("Truncated replay header")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+@dataclass(frozen=True)
+class Replay:
+    seed: int
+    ticks: int
+    duration_ms: int
+    # 2 bits per tick, as stored
+    packed: bytes
+
+    @classmethod
+    def from_moves(cls, seed: int, moves: str, duration_ms: int) -> "Replay":
+        if not 0 <= seed < 2**32:
+            raise InvalidReplay("Seed must be a 32-bit unsigned integer")
+        if duration_ms < 0:
+            raise InvalidReplay("Duration must not be negative")
+        if len(moves) > MAX_TICKS:
+            raise InvalidReplay(f"Replays are limited to {MAX_TICKS} ticks")
+        # Pad to whole bytes with U (code 0); the padding is never read back
+        raw = (moves + "U" * (-len(moves) % 4)).encode()
+        if raw.translate(None, _LETTERS):
+            raise InvalidReplay("Moves must be U, D, L or R")
+        raw = raw.translate(_LETTER_CODES)
+        # Four codes as one little-endian word: c0 | c1 << 8 | c2 << 16 | c3 << 24
+        words = np.frombuffer(raw, dtype="<u4")
+        packed = (words | words >> 6 | words >> 12 | words >> 18).astype(np.uint8)
+        return cls(seed, len(moves), duration_ms, packed.tobytes())
+
+    def encode(self) -> bytes:
+        out = bytearray(_SEED.pack(VERSION, self.seed))
+        _write_varint(self.ticks, out)
+        _write_varint(self.duration_ms, out)
+        out += self.packed
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data: bytes) -> "Replay":
+        if len(data) < _SEED.size:
+            raise InvalidReplay("Truncated replay header")
+        version, seed = _SEED.unpack_from(data)
+        if version != VERSION:
+            raise InvalidReplay(f"Unsupported replay version {version}")
+        ticks, offset = _read_varint(data, _SEED.size)
+        duration_ms, offset = _read_varint(data, offset)
+        packed = data[offset:]
+        if len(packed) != (ticks + 3) // 4:
+            raise InvalidReplay("Replay length does not match its tick count")
+        return cls(seed, ticks, duration_ms, packed)
+
+    def codes(self) -> bytes:
+        """One byte per tick: the direction's index in ``MOVE_LETTERS``."""
+        packed = np.frombuffer(self.packed, dtype=np.uint8)
+        return ((packed[:, None] >> _SHIFTS) & 3).tobytes()[: self.ticks]
+
+    def moves(self, chunk_ticks: int = 4096) -> Iterator[str]:
+        """The moves as letters, ``chunk_ticks`` (a multiple of 4) at a time."""
+        chunk_bytes = max(1, chunk_ticks // 4)
+        for start in range(0, len(self.packed), chunk_bytes):
+            packed = np.frombuffer(self.packed[start : start + chunk_bytes], dtype=np.uint8)
+            letters = ((packed[:, None] >> _SHIFTS) & 3).tobytes().translate(_CODE_LETTERS).decode()
+            # The last byte may hold padding
+            yield letters[: self.ticks - start * 4]
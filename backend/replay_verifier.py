@@ -0,0 +1,206 @@
+"""
+Server-side replay verification for submitted scores.
+
+``simulate()`` plays a replay back with the frontend's rules: ``moveSnake``,
+``generateFood`` and ``advanceGame`` in ``useGameLogic.ts``, with food placed
+by the same seeded mulberry32 streams as ``lib/random.ts``. ``check_replay()``
+then accepts a score only if all of these hold:
+
+* the game ended in a collision on its last tick, and not before;
+* the snake never reversed onto itself (the client ignores those key presses);
+* the score matches the food eaten;
+* the game lasted at least as long as its ticks take at full speed.
+
+Both sides are checked against ``specs/replay-vectors.json``.
+
+A replay is simulated in pure Python, about a microsecond per tick, so it
+holds the GIL. ``ReplayVerifier`` runs checks on a ``ProcessPool`` (see
+process_pool.py), like ``PasswordHasher``. Batches are split into chunks so that one
+pickled task covers many replays.
+"""
+
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from game_engine import NEIGHBOURS
+from live_state import CELLS, FOOD_SCORE, GRID_SIZE
+from models import GameMode
+from process_pool import PoolBusy, ProcessPool
+from replay import InvalidReplay, Replay
+
+INITIAL_SNAKE = [(10, 10), (9, 10), (8, 10)]
+INITIAL_SPEED = 150
+SPEED_INCREMENT = 5
+MIN_SPEED = 50
+# Ticks wait for requestAnimationFrame, so real games only run slower than the
+# speed rule; the slack covers clock differences between timestamps
+DURATION_TOLERANCE = 0.9
+
+_MASK = 0xFFFFFFFF
+
+
+# game_engine.NEIGHBOURS as one plain list per move (MOVE_LETTERS is DIRECTIONS
+# order): indexing lists is much faster than NumPy scalars in the per-tick loop
+_NEIGHBOURS = {
+    GameMode.WALLS: tuple(NEIGHBOURS[1].T.tolist()),
+    GameMode.PASS_THROUGH: tuple(NEIGHBOURS[0].T.tolist()),
+}
+
+
+class VerifierBusy(PoolBusy):
+    """Too many replay checks are already queued."""
+
+
+class GameResult(NamedTuple):
+    score: int
+    # Ticks played before the game ended (or the moves ran out)
+    ticks: int
+    crashed: bool
+    # The first move that turned the snake back on itself, if any
+    reversed_at: Optional[int]
+    # Shortest possible wall-clock time for the ticks played
+    min_duration_ms: int
+    snake: List[Tuple[int, int]]
+    food: Tuple[int, int]
+
+
+def mulberry32(seed: int) -> Callable[[], float]:
+    """Same sequence as ``mulberry32`` in ``lib/random.ts``."""
+    state = seed & _MASK
+
+    def next_float() -> float:
+        nonlocal state
+        state = (state + 0x6D2B79F5) & _MASK
+        t = state
+        t = ((t ^ (t >> 15)) * (t | 1)) & _MASK
+        t ^= (t + ((t ^ (t >> 7)) * (t | 61))) & _MASK
+        return ((t ^ (t >> 14)) & _MASK) / 4294967296
+
+    return next_float
+
+
+def food_random(seed: int, foods_eaten: int) -> Callable[[], float]:
+    return mulberry32(seed + foods_eaten * 0x9E3779B9)
+
+
+def _place_food(occupied: bytearray, random: Callable[[], float]) -> int:
+    while True:
+        x = int(random() * GRID_SIZE)
+        y = int(random() * GRID_SIZE)
+        cell = y * GRID_SIZE + x
+        if not occupied[cell]:
+            return cell
+
+
+def simulate(mode: GameMode, replay: Replay) -> GameResult:
+    """Play the replay until the snake crashes or the moves run out."""
+    neighbours = _NEIGHBOURS[GameMode(mode)]
+    seed = replay.seed
+    snake = deque(y * GRID_SIZE + x for x, y in INITIAL_SNAKE)
+    occupied = bytearray(CELLS)
+    for cell in snake:
+        occupied[cell] = 1
+    food = _place_food(occupied, food_random(seed, 0))
+    head = snake[0]
+    direction = move = 3  # RIGHT
+    score, speed = 0, INITIAL_SPEED
+    # Ticks before the current speed took effect, and their total wait
+    speed_since, waited = 0, 0
+    crashed = False
+
+    ticks = 0
+    for ticks, move in enumerate(replay.codes(), 1):
+        cell = neighbours[move][head]
+        # The tail moves on this tick, so it is not an obstacle
+        if cell < 0 or (occupied[cell] and cell != snake[-1]):
+            crashed = True
+            break
+        if cell == food:
+            score += FOOD_SCORE
+            waited += speed * (ticks - speed_since)
+            speed_since = ticks
+            speed = max(MIN_SPEED, speed - SPEED_INCREMENT)
+            snake.appendleft(cell)
+            occupied[cell] = 1
+            if len(snake) == CELLS:
+                # No cell left for food; the client would stop here too
+                break
+            food = _place_food(occupied, food_random(seed, score // FOOD_SCORE))
+        else:
+            occupied[snake.pop()] = 0
+            snake.appendleft(cell)
+            occupied[cell] = 1
+        head = cell
+        direction = move
+
+    # Turning back always runs into the neck, so only the crash can be one.
+    # Opposite directions differ in the low bit.
+    reversed_at = ticks - 1 if crashed and move ^ 1 == direction else None
+    # Every tick after the first waits for the speed of the tick before it
+    min_duration = waited + speed * (ticks - speed_since) - INITIAL_SPEED if ticks else 0
+    return GameResult(
+        score, ticks, crashed, reversed_at, min_duration,
+        [(c % GRID_SIZE, c // GRID_SIZE) for c in snake], (food % GRID_SIZE, food // GRID_SIZE),
+    )
+
+
+def check_replay(mode: str, score: int, data: bytes) -> Optional[str]:
+    """Why the encoded replay does not back up the score, or None if it does."""
+    try:
+        replay = Replay.decode(data)
+        result = simulate(GameMode(mode), replay)
+    except (InvalidReplay, ValueError):
+        return "malformed"
+    if result.reversed_at is not None:
+        return "reversed"
+    if not result.crashed:
+        return "unfinished"
+    if result.ticks < replay.ticks:
+        return "moves after game over"
+    if result.score != score:
+        return "score mismatch"
+    if replay.duration_ms < result.min_duration_ms * DURATION_TOLERANCE:
+        return "too fast"
+    return None
+
+
+# Module-level so the process pool can pickle it by reference
+def _check_chunk(items: Sequence[Tuple[str, int, bytes]]) -> List[Optional[str]]:
+    return [check_replay(mode, score, data) for mode, score, data in items]
+
+
+class ReplayVerifier(ProcessPool):
+    busy_error = VerifierBusy
+
+    def __init__(self, workers: int, max_pending: int, chunk_size: int = 64):
+        super().__init__(workers, max_pending)
+        self.chunk_size = chunk_size
+        self.checked = 0
+        self.rejected = 0
+        self.check_seconds = 0.0
+
+    async def check(self, mode: str, score: int, data: bytes) -> Optional[str]:
+        return (await self.check_many([(mode, score, data)]))[0]
+
+    async def check_many(self, items: Sequence[Tuple[str, int, bytes]]) -> List[Optional[str]]:
+        """``check_replay()`` for each ``(mode, score, encoded replay)``, spread over the pool."""
+        chunks = [(items[i : i + self.chunk_size],) for i in range(0, len(items), self.chunk_size)]
+        start = time.perf_counter()
+        try:
+            results = await self._map(_check_chunk, chunks)
+        finally:
+            self.check_seconds += time.perf_counter() - start
+        reasons = [reason for chunk in results for reason in chunk]
+        self.checked += len(reasons)
+        self.rejected += sum(reason is not None for reason in reasons)
+        return reasons
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "checked": self.checked,
+            "rejected": self.rejected,
+            "busy": self.busy,
+            "avg_ms": round(self.check_seconds * 1000 / self.checked, 3) if self.checked else 0.0,
+        }
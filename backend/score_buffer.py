@@ -0,0 +1,286 @@
+"""
+Write-behind buffer for leaderboard submissions.
+
+With ``SCORE_WRITE_BEHIND=1`` an accepted score is appended here instead of
+being committed in the request. A background task flushes the buffer every
+``flush_interval`` seconds, or as soon as ``batch_size`` scores are waiting.
+A flush is one transaction: a bulk INSERT into ``leaderboard`` (and
+``replays``), the ``player_best`` upserts and one aggregated ``highScore`` /
+``gamesPlayed`` UPDATE per user. ``stop()`` flushes whatever is left, so a
+graceful shutdown loses nothing; a crash loses at most the scores accepted
+since the last flush.
+
+If the database is unavailable the scores stay queued and are retried. If a
+batch fails for any other reason, its rows are written one at a time and the
+ones that still fail are dropped (logged, and kept in ``dead_letters``), so
+one bad row never holds up the rest of the queue.
+
+Until a score is flushed, read paths merge it in (``merge_pending()``,
+``pending_totals()``) so players see it straight away.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+import player_best
+import sql_models
+from leaderboard_index import IndexedEntry, sort_key
+
+logger = logging.getLogger(__name__)
+
+_users = sql_models.User.__table__
+# Counters are updated in SQL, never written back from a possibly stale row
+add_games = (
+    _users.update()
+    .where(_users.c.id == bindparam("user_id"))
+    .values(
+        gamesPlayed=_users.c.gamesPlayed + bindparam("games"),
+        highScore=case((_users.c.highScore < bindparam("best"), bindparam("best")), else_=_users.c.highScore),
+    )
+)
+
+
+def merge_pending(
+    rows: Iterable[Any],
+    pending: List[IndexedEntry],
+    after: Optional[tuple] = None,
+    limit: Optional[int] = None,
+) -> List[Any]:
+    """
+    Merge rows already in leaderboard order with unflushed entries.
+
+    Take ``pending`` *before* querying for ``rows``: a score flushed in
+    between then shows up in both (and is de-duplicated) instead of in
+    neither. ``after`` is the sort key of the last row the caller has seen.
+    """
+    if after is not None:
+        pending = [e for e in pending if sort_key(e) > after]
+    merged, seen = [], set()
+    for row in heapq.merge(rows, pending, key=sort_key):
+        if row.id in seen:
+            continue
+        seen.add(row.id)
+        merged.append(row)
+        if limit is not None and len(merged) >= limit:
+            break
+    return merged
+
+
+class ScoreBuffer:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval: float = 0.2,
+        batch_size: int = 500,
+        on_flush: Optional[Callable[[List[str]], None]] = None,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self._lock = threading.Lock()
+        # Held for a whole flush so shutdown never writes a batch twice
+        self._flush_lock = threading.Lock()
+        # id -> (accepted at, entry), oldest first
+        self._pending: "OrderedDict[str, Tuple[float, IndexedEntry]]" = OrderedDict()
+        # entry id -> encoded replay, for the pending entries that have one
+        self._replays: Dict[str, bytes] = {}
+        # user id -> (scores waiting, best score waiting)
+        self._totals: Dict[str, Tuple[int, int]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # (entry, error) for the most recent rows that could not be written
+        self.dead_letters: "deque[Tuple[IndexedEntry, str]]" = deque(maxlen=100)
+
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+        self.last_batch_size = 0
+
+    # --- Accepting scores (any thread) ---
+
+    def add(self, entry: IndexedEntry, replay: Optional[bytes] = None):
+        with self._lock:
+            self._pending[entry.id] = (time.monotonic(), entry)
+            if replay is not None:
+                self._replays[entry.id] = replay
+            games, best = self._totals.get(entry.userId, (0, 0))
+            self._totals[entry.userId] = (games + 1, max(best, entry.score))
+            full = len(self._pending) >= self.batch_size
+        if full and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    # --- Reads ---
+
+    def pending(self, mode: Optional[str] = None) -> List[IndexedEntry]:
+        """Unflushed entries for ``mode`` (all modes if None), in leaderboard order."""
+        with self._lock:
+            entries = [e for _, e in self._pending.values() if mode is None or e.mode == mode]
+        return sorted(entries, key=sort_key)
+
+    def pending_totals(self, user_id: str) -> Tuple[int, int]:
+        """``(games, best score)`` accepted for a user but not yet flushed."""
+        return self._totals.get(user_id, (0, 0))
+
+    def pending_replay(self, entry_id: str) -> Optional[Tuple[IndexedEntry, bytes]]:
+        """An unflushed entry and its encoded replay, if it has one."""
+        with self._lock:
+            replay = self._replays.get(entry_id)
+            return (self._pending[entry_id][1], replay) if replay is not None else None
+
+    # --- Flushing ---
+
+    def flush(self) -> int:
+        """Write up to ``batch_size`` of the oldest scores; returns how many were written."""
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> int:
+        with self._lock:
+            batch = [e for _, e in itertools.islice(self._pending.values(), self.batch_size)]
+            replays = {e.id: self._replays[e.id] for e in batch if e.id in self._replays}
+        if not batch:
+            return 0
+
+        start = time.perf_counter()
+        dropped = []
+        try:
+            self._write(batch, replays)
+            written = batch
+        except OperationalError:
+            # The database is unreachable or busy; everything stays queued
+            self.failures += 1
+            raise
+        except Exception:
+            self.failures += 1
+            logger.exception("Failed to flush %d buffered scores; writing them one at a time", len(batch))
+            written, dropped = self._write_each(batch, replays)
+
+        with self._lock:
+            for e in itertools.chain(written, dropped):
+                del self._pending[e.id]
+                self._replays.pop(e.id, None)
+            self._totals = {}
+            for _, e in self._pending.values():
+                games, best = self._totals.get(e.userId, (0, 0))
+                self._totals[e.userId] = (games + 1, max(best, e.score))
+
+        self.flushed += len(written)
+        self.dropped += len(dropped)
+        self.batches += 1
+        self.last_batch_size = len(written)
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        if self.on_flush and written:
+            self.on_flush(list({e.userId: None for e in written}))
+        return len(written) + len(dropped)
+
+    def _write(self, batch: List[IndexedEntry], replays: Dict[str, bytes]):
+        """Write ``batch`` in one transaction."""
+        totals: Dict[str, Tuple[int, int]] = {}
+        for e in batch:
+            games, best = totals.get(e.userId, (0, 0))
+            totals[e.userId] = (games + 1, max(best, e.score))
+
+        db = self.session_factory()
+        try:
+            db.execute(insert(sql_models.LeaderboardEntry), [{**e._asdict(), "rank": 0} for e in batch])
+            replay_rows = [{"entryId": e.id, "data": replays[e.id]} for e in batch if e.id in replays]
+            if replay_rows:
+                db.execute(insert(sql_models.Replay), replay_rows)
+            player_best.upsert(db, batch)
+            db.execute(add_games, [
+                {"user_id": user_id, "games": games, "best": best} for user_id, (games, best) in totals.items()
+            ])
+            db.commit()
+        finally:
+            db.close()
+
+    def _write_each(
+        self, batch: List[IndexedEntry], replays: Dict[str, bytes]
+    ) -> Tuple[List[IndexedEntry], List[IndexedEntry]]:
+        """Write rows one per transaction; returns ``(written, dropped)``."""
+        written, dropped = [], []
+        for e in batch:
+            try:
+                self._write([e], replays)
+            except OperationalError:
+                # Not the row's fault: leave it and the rest queued
+                logger.exception("Database unavailable while isolating a failed batch")
+                break
+            except Exception as error:
+                logger.exception("Dropping buffered score %s that cannot be written", e.id)
+                self.dead_letters.append((e, repr(error)))
+                dropped.append(e)
+            else:
+                written.append(e)
+        return written, dropped
+
+    def flush_all(self):
+        while self.flush():
+            pass
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                # Keep going while full batches are waiting
+                while await asyncio.to_thread(self.flush) >= self.batch_size:
+                    pass
+            except Exception:
+                # The scores stay queued and are retried on the next interval
+                logger.exception("Failed to flush %d buffered scores", len(self._pending))
+
+    def start(self):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the flush task and write everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+        await asyncio.to_thread(self.flush_all)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            oldest = next(iter(self._pending.values()), None)
+        return {
+            "pending": len(self._pending),
+            "lag_ms": round((time.monotonic() - oldest[0]) * 1000, 3) if oldest else 0.0,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_batch_size": self.last_batch_size,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "flush_interval_ms": self.flush_interval * 1000,
+            "batch_size": self.batch_size,
+        }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum
+from sqlalchemy import Column, Integer, LargeBinary, String, DateTime, Enum, Index
 from datetime import datetime
 from db_setup import Base
 import models # Pydantic models for Enum reference
@@ -26,3 +26,35 @@ class LeaderboardEntry(Base):
     score = Column(Integer)
     mode = Column(String) # Storing Enum as string
     date = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Keyset pagination walks these in (score DESC, date, id) order,
+        # so a leaderboard page is a single index range scan.
+        Index("ix_leaderboard_mode_score", mode, score.desc(), date, id),
+        Index("ix_leaderboard_score", score.desc(), date, id),
+    )
+
+class PlayerBest(Base):
+    """Each player's best leaderboard entry, per mode and overall ("all")."""
+    __tablename__ = "player_best"
+
+    userId = Column(String, primary_key=True)
+    scope = Column(String, primary_key=True) # A GameMode value, or "all"
+    # The rest mirrors the LeaderboardEntry that set the best score
+    id = Column(String)
+    username = Column(String)
+    avatar = Column(String, nullable=True)
+    score = Column(Integer)
+    mode = Column(String)
+    date = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_player_best_scope_score", scope, score.desc(), date, id),
+    )
+
+class Replay(Base):
+    """A recorded game, stored next to the leaderboard entry it scored (see replay.py)."""
+    __tablename__ = "replays"
+
+    entryId = Column(String, primary_key=True) # LeaderboardEntry.id
+    data = Column(LargeBinary)
@@ -0,0 +1,148 @@
+"""
+The single-page app's static files, indexed once at startup.
+
+``StaticManifest.load()`` walks the frontend build output and records what
+every file needs to be served: its media type, ETag and cache policy, and
+the ``.br``/``.gz`` siblings written by ``frontend/scripts/compress.mjs``.
+After that a request is a dict lookup, with no filesystem calls:
+
+* ``Accept-Encoding`` picks brotli, then gzip, then the file as it is. Each
+  encoding has its own strong ETag (a hash of its bytes), and responses
+  carry ``Vary: Accept-Encoding`` whenever there is a choice.
+* Vite names the files in ``assets/`` after a hash of their contents, so
+  they never change: ``Cache-Control: public, max-age=31536000, immutable``.
+  Everything else, ``index.html`` in particular, is ``no-cache`` and is
+  revalidated with ``If-None-Match``, which gets ``304`` when it matches.
+* Files up to ``memory_limit`` bytes are kept in memory. Larger ones are sent
+  with ``FileResponse`` and the stat taken at startup; Starlette hands them to
+  the server as ``http.response.pathsend`` (sendfile) where the server
+  supports it, and streams them in chunks otherwise.
+
+Unknown paths get ``index.html``, for client-side routing. Files changed
+after startup are not noticed; a deploy restarts the process.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+
+from http_caching import accepts_encoding, etag_matches
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# Vite's build output: assets/<name>-<content hash>.<ext>
+_HASHED_ASSET = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+# Precompressed siblings, most preferred first
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+class Variant:
+    """One encoding of a file: where it is, and the response headers for it."""
+
+    __slots__ = ("path", "stat", "body", "headers")
+
+    def __init__(self, path: str, stat: os.stat_result, body: Optional[bytes], headers: Dict[str, str]):
+        self.path = path
+        self.stat = stat
+        self.body = body
+        self.headers = headers
+
+
+class StaticManifest:
+    def __init__(self, root: str, memory_limit: int = 256 * 1024, index: str = "index.html"):
+        self.root = root
+        self.memory_limit = memory_limit
+        self.index = index
+        # URL path (relative, "/"-separated) -> encoding ("identity", "br", "gzip") -> variant
+        self.files: Dict[str, Dict[str, Variant]] = {}
+
+        self.requests = 0
+        self.not_modified = 0
+        self.from_disk = 0
+        self.bytes_sent = 0
+        self.encodings: Dict[str, int] = {"identity": 0, **{coding: 0 for coding in ENCODINGS}}
+
+    def load(self) -> int:
+        """Index every file under ``root``; returns how many were found."""
+        files = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                url_path = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if any(name.endswith(suffix) and os.path.isfile(path[: -len(suffix)]) for suffix in ENCODINGS.values()):
+                    continue  # A sibling of another file, indexed with it
+                files[url_path] = self._variants(url_path, path)
+        self.files = files
+        return len(files)
+
+    def _variants(self, url_path: str, path: str) -> Dict[str, Variant]:
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type in ("application/javascript", "application/json"):
+            media_type += "; charset=utf-8"
+        common = {
+            "Content-Type": media_type,
+            "Cache-Control": IMMUTABLE if _HASHED_ASSET.match(url_path) else REVALIDATE,
+        }
+        paths = {"identity": path}
+        for coding, suffix in ENCODINGS.items():
+            if os.path.isfile(path + suffix):
+                paths[coding] = path + suffix
+        if len(paths) > 1:
+            common["Vary"] = "Accept-Encoding"
+
+        variants = {}
+        for coding, variant_path in paths.items():
+            stat = os.stat(variant_path)
+            with open(variant_path, "rb") as f:
+                digest = hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=12)).hexdigest()
+                body = None
+                if stat.st_size <= self.memory_limit:
+                    f.seek(0)
+                    body = f.read()
+            headers = {**common, "ETag": f'"{digest}"'}
+            if coding != "identity":
+                headers["Content-Encoding"] = coding
+            variants[coding] = Variant(variant_path, stat, body, headers)
+        return variants
+
+    def respond(self, url_path: str, request_headers: Headers) -> Optional[Response]:
+        """The response for ``GET /<url_path>``, or None if there is nothing to serve."""
+        variants = self.files.get(url_path) or self.files.get(self.index)
+        if variants is None:
+            return None
+        self.requests += 1
+
+        coding = "identity"
+        if len(variants) > 1:
+            accept_encoding = request_headers.get("accept-encoding", "")
+            coding = next((c for c in ENCODINGS if c in variants and accepts_encoding(accept_encoding, c)), coding)
+        variant = variants[coding]
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, variant.headers["ETag"]):
+            self.not_modified += 1
+            headers = {k: v for k, v in variant.headers.items() if k not in ("Content-Type", "Content-Encoding")}
+            return Response(status_code=304, headers=headers)
+
+        self.encodings[coding] += 1
+        self.bytes_sent += variant.stat.st_size
+        if variant.body is not None:
+            return Response(variant.body, headers=variant.headers)
+        self.from_disk += 1
+        return FileResponse(variant.path, headers=variant.headers, stat_result=variant.stat)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "files": len(self.files),
+            "memory_bytes": sum(v.stat.st_size for f in self.files.values() for v in f.values() if v.body is not None),
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "from_disk": self.from_disk,
+            "bytes_sent": self.bytes_sent,
+            **self.encodings,
+        }
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from auth_cache import AuthCache, TTLCache
+import sql_models
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    clock.now = 11
+    assert cache.get("a") is None
+    assert cache.stats() == {"size": 1, "hits": 2, "misses": 2, "hit_rate": 0.5}
+
+
+def test_expired_token_is_not_served(monkeypatch):
+    cache = AuthCache()
+    monkeypatch.setattr("auth_cache.time.time", lambda: 1000.0)
+    cache.remember_token("t", "user_1", expires_at=1005.0)
+    assert cache.user_id_for("t") == "user_1"
+    monkeypatch.setattr("auth_cache.time.time", lambda: 1006.0)
+    assert cache.user_id_for("t") is None
+
+
+def test_attach_user_builds_persistent_row_without_password():
+    from sqlalchemy import create_engine, inspect
+    from sqlalchemy.orm import Session
+
+    cache = AuthCache()
+    user = sql_models.User(
+        id="user_1", username="Snake", email="s@game.com", hashed_password="secret",
+        highScore=10, gamesPlayed=2, createdAt=datetime(2024, 1, 1),
+    )
+    cache.remember_user(user)
+
+    with Session(create_engine("sqlite://")) as db:
+        attached = cache.attach_user("user_1", db)
+        assert inspect(attached).persistent
+        assert attached.highScore == 10
+        assert "hashed_password" in inspect(attached).unloaded
+
+    cache.invalidate_user("user_1")
+    with Session(create_engine("sqlite://")) as db:
+        assert cache.attach_user("user_1", db) is None
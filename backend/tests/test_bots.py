@@ -0,0 +1,73 @@
+import numpy as np
+
+from bots import BotFleet, choose_directions
+from game_engine import DIRECTIONS, GRID_SIZE, GameEngine
+from live_state import to_cell
+from models import Direction, GameMode, GameStatus
+
+
+def place(engine, game_id, snake, food, direction):
+    """Overwrite a game's engine state: ``snake`` is head first, in (x, y)."""
+    slot = engine.slot_of(game_id)
+    cells = [to_cell(x, y) for x, y in snake]
+    engine.occupied[slot] = False
+    engine.body[slot, : len(cells)] = cells[::-1]
+    engine.head_ptr[slot] = len(cells) - 1
+    engine.length[slot] = len(cells)
+    engine.occupied[slot, cells] = True
+    engine.food[slot] = to_cell(*food)
+    engine.direction[slot] = DIRECTIONS.index(direction)
+    return slot
+
+
+def choose(engine, slots):
+    return [DIRECTIONS[d] for d in choose_directions(engine, np.array(slots))]
+
+
+def test_bots_take_a_shortest_path_to_the_food():
+    engine = GameEngine({}, seed=1)
+    engine.spawn("wrap", "u", "Bot", GameMode.PASS_THROUGH)
+    engine.spawn("wall", "u", "Bot", GameMode.WALLS)
+    snake = [(18, 5), (17, 5), (16, 5)]
+    slots = [place(engine, game_id, snake, (1, 5), Direction.RIGHT) for game_id in ("wrap", "wall")]
+
+    through_edge, around_body = choose(engine, slots)
+    # Three moves across the edge; in walls mode the neck is in the way
+    assert through_edge == Direction.RIGHT
+    assert around_body in (Direction.UP, Direction.DOWN)
+
+
+def test_bots_do_not_eat_into_a_dead_end():
+    engine = GameEngine({}, seed=2)
+    engine.spawn("g", "u", "Bot", GameMode.WALLS)
+    # The body surrounds the food on three sides, and the tail is far away
+    snake = [(11, 10), (11, 11), (10, 11), (9, 11), (9, 10), (9, 9), (10, 9), (11, 9), (12, 9), (13, 9), (14, 9)]
+    slot = place(engine, "g", snake, (10, 10), Direction.UP)
+
+    assert choose(engine, [slot]) == [Direction.RIGHT]
+
+
+def test_fleet_keeps_its_bots_playing():
+    games = {}
+    engine = GameEngine(games, seed=3)
+    fleet = BotFleet(engine, size=20, seed=3)
+    fleet.start()
+    for _ in range(300):
+        engine.tick()
+
+    assert len(games) == fleet.stats()["bots"] == 20
+    assert all(game.status == GameStatus.PLAYING for game in games.values())
+    assert min(game.score for game in games.values()) > 0
+    assert fleet.stats()["decisions"] == 20 * 300
+
+    # A finished game is replaced on the next tick
+    finished = next(iter(games))
+    engine.release(finished)
+    engine.tick()
+    assert fleet.stats()["spawned"] == 21
+    assert finished not in fleet._game_ids
+    assert len(games) == 21 and engine.active_games == 20
+
+    fleet.stop()
+    engine.tick()
+    assert fleet.stats()["decisions"] == 20 * 301
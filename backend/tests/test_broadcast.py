@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+from broadcast import LiveGameBroadcaster
+from live_state import CompactSnake, LiveGameState, to_cell
+from models import GameMode
+
+
+def _game():
+    return LiveGameState(
+        id="g1", playerId="user_1", playerName="Player1", mode=GameMode.WALLS,
+        snake=CompactSnake([to_cell(2, 2), to_cell(1, 2)]), food=to_cell(8, 8)
+    )
+
+
+def _step(game, x):
+    game.snake.pop_tail()
+    game.snake.push_head(to_cell(x, 2))
+
+
+def test_frames_are_encoded_once_and_shared():
+    async def run():
+        broadcaster = LiveGameBroadcaster(queue_size=4)
+        game = _game()
+        first, second = broadcaster.subscribe(game), broadcaster.subscribe(game)
+        snapshots = [await first.get(), await second.get()]
+
+        _step(game, 3)
+        broadcaster.publish("g1", game)
+        deltas = [await first.get(), await second.get()]
+
+        broadcaster.publish("g1", None)
+        ended = [await first.get(), await second.get()]
+        stats = broadcaster.stats()
+        broadcaster.unsubscribe(first)
+        broadcaster.unsubscribe(second)
+        return snapshots, deltas, ended, stats, broadcaster.stats()
+
+    snapshots, deltas, ended, stats, after = asyncio.run(run())
+    assert snapshots[0] is snapshots[1]
+    assert json.loads(snapshots[0])["game"]["snake"][0] == {"x": 2, "y": 2}
+    assert deltas[0] is deltas[1]
+    assert json.loads(deltas[0]) == {"type": "delta", "head": {"x": 3, "y": 2}, "tailRemoved": True}
+    assert ended == [None, None]
+    assert stats["frames"] == 1 and stats["deliveries"] == 2
+    assert after["games"] == 0
+
+
+def test_slow_subscriber_resyncs_from_snapshot():
+    async def run():
+        broadcaster = LiveGameBroadcaster(queue_size=2)
+        game = _game()
+        fast, slow = broadcaster.subscribe(game), broadcaster.subscribe(game)
+        await fast.get()
+        await slow.get()
+
+        received = []
+        for x in range(3, 8):
+            _step(game, x)
+            broadcaster.publish("g1", game)
+            received.append(json.loads(await fast.get()))
+        resynced = json.loads(await slow.get())
+        _step(game, 8)
+        broadcaster.publish("g1", game)
+        return received, resynced, json.loads(await slow.get()), broadcaster.stats()
+
+    received, resynced, next_frame, stats = asyncio.run(run())
+    assert [frame["head"]["x"] for frame in received] == [3, 4, 5, 6, 7]
+    # The slow viewer skips straight to the current state, then gets deltas again
+    assert resynced["type"] == "snapshot"
+    assert resynced["game"]["snake"][0] == {"x": 7, "y": 2}
+    assert next_frame["head"] == {"x": 8, "y": 2}
+    assert stats["resyncs"] == 1
+    assert stats["dropped"] == 5
+    assert stats["busiest"]["g1"]["subscribers"] == 2
+
+
+def test_polls_once_per_game_for_remote_games():
+    polls = []
+
+    async def run():
+        game = _game()
+
+        async def poll(game_id):
+            polls.append(game_id)
+            _step(game, 3 + len(polls))
+            return game
+
+        broadcaster = LiveGameBroadcaster(poll_interval=0.01)
+        viewers = [broadcaster.subscribe(game, poll=poll) for _ in range(3)]
+        for viewer in viewers:
+            await viewer.get()
+        frames = [json.loads(await viewer.get()) for viewer in viewers]
+        for viewer in viewers:
+            viewer.close()
+            assert await viewer.get() is None
+            broadcaster.unsubscribe(viewer)
+        return frames
+
+    frames = asyncio.run(run())
+    assert all(frame["head"] == {"x": 4, "y": 2} for frame in frames)
+    assert len(polls) == 1
+
+
+def test_failed_polls_back_off_then_close_the_channel():
+    polls = []
+
+    async def run():
+        game = _game()
+
+        async def poll(game_id):
+            polls.append(asyncio.get_running_loop().time())
+            if len(polls) == 2:
+                _step(game, 3)
+                return game
+            raise ConnectionError("hub down")
+
+        broadcaster = LiveGameBroadcaster(poll_interval=0.01, poll_retries=2)
+        viewer = broadcaster.subscribe(game, poll=poll)
+        await viewer.get()
+        # One failure is retried, and the next good poll still gets through
+        delta = json.loads(await viewer.get())
+        ended = await viewer.get()
+        stats = broadcaster.stats()
+        broadcaster.unsubscribe(viewer)
+        # A new viewer gets a fresh channel rather than the failed one
+        fresh = broadcaster.subscribe(game)
+        return delta, ended, viewer.channel.failed, stats, fresh.channel is not viewer.channel
+
+    delta, ended, failed, stats, fresh = asyncio.run(run())
+    assert delta["head"] == {"x": 3, "y": 2}
+    assert ended is None and failed and fresh
+    assert len(polls) == 5 and stats["poll_errors"] == 4
+    # Each retry waits longer than the one before
+    gaps = [b - a for a, b in zip(polls[2:], polls[3:])]
+    assert gaps[1] > gaps[0]
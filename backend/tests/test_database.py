@@ -0,0 +1,14 @@
+import database
+
+
+def test_gc_is_frozen_only_after_an_index_loads(monkeypatch):
+    frozen = []
+    monkeypatch.setattr(database.gc, "freeze", lambda: frozen.append(True))
+    monkeypatch.setattr(database.user_rank_index, "load", lambda db: None)
+
+    database.load_rank_indexes(leaderboard=False, users=False)
+    database.load_rank_indexes(leaderboard=False, users=True, freeze=False)
+    assert frozen == []
+
+    database.load_rank_indexes(leaderboard=False, users=True)
+    assert frozen == [True]
@@ -0,0 +1,141 @@
+import random
+
+import numpy as np
+
+from game_engine import GRID_SIZE, DIRECTIONS, GameEngine
+from live_state import CompactSnake, LiveGameState, to_cell
+from models import Direction, GameMode, GameStatus
+
+VECTORS = {
+    Direction.UP: (0, -1), Direction.DOWN: (0, 1),
+    Direction.LEFT: (-1, 0), Direction.RIGHT: (1, 0),
+}
+
+
+def move_snake(snake, direction, mode, food):
+    """Python port of moveSnake() from useGameLogic.ts."""
+    dx, dy = VECTORS[direction]
+    x, y = snake[0][0] + dx, snake[0][1] + dy
+    if mode == GameMode.PASS_THROUGH:
+        x, y = x % GRID_SIZE, y % GRID_SIZE
+    elif not (0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE):
+        return snake, False, True
+    if (x, y) in snake[:-1]:
+        return snake, False, True
+    ate = (x, y) == food
+    return ([(x, y)] + snake if ate else [(x, y)] + snake[:-1]), ate, False
+
+
+def cells(game):
+    return [(c % GRID_SIZE, c // GRID_SIZE) for c in game.snake.cells()]
+
+
+def food(game):
+    return (game.food % GRID_SIZE, game.food // GRID_SIZE)
+
+
+def test_engine_matches_reference_rules():
+    games = {}
+    engine = GameEngine(games, capacity=4, seed=5)
+    rng = random.Random(5)
+    for i in range(40):
+        engine.spawn(f"g{i}", f"u{i}", f"Player{i}", GameMode.WALLS if i % 2 else GameMode.PASS_THROUGH)
+
+    for _ in range(200):
+        expected = {}
+        for game_id, game in games.items():
+            if game.status != GameStatus.PLAYING:
+                continue
+            direction = rng.choice(DIRECTIONS)
+            if not engine.set_direction(game_id, direction):
+                direction = DIRECTIONS[int(engine.direction[engine._slots[game_id]])]
+            expected[game_id] = move_snake(cells(game), direction, game.mode, food(game))
+            expected[game_id] += (game.score,)
+
+        engine.tick()
+
+        for game_id, (snake, ate, collision, score) in expected.items():
+            game = games[game_id]
+            assert cells(game) == snake
+            assert game.status == (GameStatus.GAME_OVER if collision else GameStatus.PLAYING)
+            assert game.score == score + (10 if ate else 0)
+            assert food(game) not in snake
+
+
+def test_pass_through_wraps_and_walls_crash():
+    games = {}
+    engine = GameEngine(games, seed=1)
+    wrap = engine.spawn("wrap", "u1", "Player1", GameMode.PASS_THROUGH)
+    wall = engine.spawn("wall", "u2", "Player2", GameMode.WALLS)
+    for game_id in ("wrap", "wall"):
+        engine.food[engine._slots[game_id]] = 0  # keep food out of the way
+    for _ in range(10):
+        engine.tick()
+
+    assert cells(wrap)[0] == (0, 10)
+    assert wall.status == GameStatus.GAME_OVER
+    assert cells(wall)[0] == (19, 10)
+    assert engine.active_games == 1
+
+
+def test_reversal_is_ignored():
+    engine = GameEngine({}, seed=2)
+    engine.spawn("g", "u", "Player", GameMode.PASS_THROUGH)
+    assert not engine.set_direction("g", Direction.LEFT)
+    assert engine.set_direction("g", Direction.UP)
+
+    slots = np.array([engine._slots["g"]])
+    engine.set_directions(slots, np.array([DIRECTIONS.index(Direction.LEFT)], dtype=np.int8))
+    assert DIRECTIONS[int(engine.next_direction[slots[0]])] == Direction.UP
+
+
+def test_capacity_grows_and_slots_are_reused():
+    games = {}
+    engine = GameEngine(games, capacity=2, seed=3)
+    for i in range(5):
+        engine.spawn(f"g{i}", "u", "Player", GameMode.PASS_THROUGH)
+    assert engine.capacity == 8
+    engine.release("g0")
+    engine.spawn("g5", "u", "Player", GameMode.PASS_THROUGH)
+    assert engine.capacity == 8
+    assert engine.active_games == 5
+    assert engine.stats()["active_games"] == 5
+
+
+def test_food_stays_with_its_game_when_an_earlier_game_is_gone():
+    games = {}
+    engine = GameEngine(games, seed=4)
+    for i in range(3):
+        engine.spawn(f"g{i}", f"u{i}", f"Player{i}", GameMode.PASS_THROUGH)
+    for game_id, game in games.items():
+        # Put the food right in front of every snake
+        x, y = cells(game)[0]
+        dx, dy = VECTORS[DIRECTIONS[int(engine.direction[engine._slots[game_id]])]]
+        engine.food[engine._slots[game_id]] = (y + dy) % GRID_SIZE * GRID_SIZE + (x + dx) % GRID_SIZE
+
+    result = engine.step()
+    del games["g0"]  # ended between the step and syncing it back
+    engine.apply(result)
+
+    for game_id in ("g1", "g2"):
+        assert games[game_id].score == 10
+        assert games[game_id].food == int(engine.food[engine._slots[game_id]])
+
+
+def test_only_spawned_games_are_stepped():
+    games = {}
+    engine = GameEngine(games, seed=6)
+    spawned = engine.spawn("spawned", "u1", "Player1", GameMode.PASS_THROUGH)
+    engine.food[engine._slots["spawned"]] = 0  # keep food out of the way
+    # Added the way the live store adds a fed game: no engine slot
+    games["fed"] = fed = LiveGameState(
+        id="fed", playerId="u2", playerName="Player2", mode=GameMode.WALLS,
+        snake=CompactSnake([to_cell(5, 5), to_cell(4, 5)]), food=to_cell(8, 8)
+    )
+
+    changed = engine.tick()
+
+    assert changed == ["spawned"]
+    assert cells(spawned)[0] == (11, 10)
+    assert cells(fed) == [(5, 5), (4, 5)]
+    assert engine.slot_of("fed") is None
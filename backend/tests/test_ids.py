@@ -0,0 +1,87 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import ids
+from ids import IdGenerator, timestamp_ms
+
+IDS_PER_WORKER = 250_000
+
+
+def _generate(worker_id: int, count: int = IDS_PER_WORKER):
+    generator = IdGenerator(worker_id)
+    return [generator.new_id("score") for _ in range(count)]
+
+
+def test_ids_are_monotonic_and_sortable_as_strings():
+    generator = IdGenerator(3)
+    values = [generator.new_id("score") for _ in range(10_000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+    assert abs(timestamp_ms(values[0]) - timestamp_ms(values[-1])) < 5_000
+
+
+def test_clock_stepping_back_does_not_reuse_ids(monkeypatch):
+    generator = IdGenerator(1)
+    now = [2_000_000_000_000_000_000]
+    monkeypatch.setattr(ids.time, "time_ns", lambda: now[0])
+    first = generator.next_int()
+    now[0] -= 5_000_000_000  # five seconds back
+    assert generator.next_int() > first
+
+
+def test_sequence_overflow_borrows_next_millisecond(monkeypatch):
+    generator = IdGenerator(1)
+    monkeypatch.setattr(ids.time, "time_ns", lambda: 2_000_000_000_000_000_000)
+    values = [generator.next_int() for _ in range(ids.MAX_SEQUENCE + 2)]
+    assert values == sorted(set(values))
+
+
+def test_invalid_worker_id():
+    with pytest.raises(ValueError):
+        IdGenerator(ids.MAX_WORKER_ID + 1)
+
+
+def test_default_worker_id_depends_on_host_and_pid(monkeypatch):
+    def derived(host: str, pid: int) -> int:
+        monkeypatch.setattr(ids.socket, "gethostname", lambda: host)
+        monkeypatch.setattr(ids.os, "getpid", lambda: pid)
+        return IdGenerator().worker_id
+
+    # Replicas with the same PID, and PIDs 1024 apart, used to share an id
+    replicas = {derived(f"replica-{i}", 1) for i in range(8)}
+    pids = {derived("host", 7 + 1024 * i) for i in range(8)}
+    assert len(replicas) > 1 and len(pids) > 1
+    assert all(0 <= worker_id <= ids.MAX_WORKER_ID for worker_id in replicas | pids)
+
+    generator = IdGenerator()
+    monkeypatch.setattr(ids.os, "getpid", lambda: 8)
+    generator._after_fork()
+    assert generator.worker_id == derived("host", 8)
+
+
+def test_no_duplicates_across_threads_and_processes():
+    # One generator shared by four threads
+    shared = IdGenerator(0)
+    per_thread = [[] for _ in range(4)]
+
+    def run(out):
+        out.extend(shared.new_id("score") for _ in range(IDS_PER_WORKER))
+
+    threads = [threading.Thread(target=run, args=(out,)) for out in per_thread]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Four more processes, each with its own worker id
+    with ProcessPoolExecutor(4, mp_context=multiprocessing.get_context("spawn")) as pool:
+        per_process = list(pool.map(_generate, range(1, 5)))
+
+    for values in per_thread:
+        assert values == sorted(values)
+    everything = [v for values in per_thread + per_process for v in values]
+    assert len(everything) == 8 * IDS_PER_WORKER
+    assert len(set(everything)) == len(everything)
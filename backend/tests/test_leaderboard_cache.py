@@ -0,0 +1,73 @@
+import gzip
+
+from starlette.datastructures import Headers
+
+from leaderboard_cache import LeaderboardCache
+
+BODY = b'[{"score": 100}]' * 64
+
+
+def test_put_and_get_until_invalidated():
+    cache = LeaderboardCache(maxsize=4, ttl=60)
+    assert cache.get("k") is None
+    cache.put("k", cache.version, BODY)
+    assert cache.get("k").body == BODY
+
+    cache.invalidate()
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_page_computed_before_a_write_is_not_cached():
+    cache = LeaderboardCache(maxsize=4, ttl=60)
+    version = cache.version
+    cache.invalidate()  # a score lands while the page is being built
+    page = cache.put("k", version, BODY)
+    assert page.body == BODY
+    assert cache.get("k") is None
+
+
+def test_entries_expire_and_evict():
+    cache = LeaderboardCache(maxsize=2, ttl=60)
+    for key in "abc":
+        cache.put(key, cache.version, BODY)
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+    expired = LeaderboardCache(maxsize=2, ttl=0)
+    expired.put("k", expired.version, BODY)
+    assert expired.get("k") is None
+
+
+def test_respond_conditional_and_gzip():
+    cache = LeaderboardCache()
+    page = cache.put("k", cache.version, BODY, next_cursor="abc")
+
+    full = cache.respond(page, Headers({"accept-encoding": "br, gzip;q=0.8"}))
+    assert full.status_code == 200
+    assert full.headers["content-encoding"] == "gzip"
+    assert full.headers["x-next-cursor"] == "abc"
+    assert gzip.decompress(full.body) == BODY
+
+    assert "content-encoding" not in cache.respond(page, Headers({"accept-encoding": "gzip;q=0"})).headers
+
+    not_modified = cache.respond(page, Headers({"if-none-match": page.etag.removeprefix("W/")}))
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert cache.respond(page, Headers({"if-none-match": 'W/"other"'})).status_code == 200
+
+    small = cache.put("small", cache.version, b"[]")
+    assert "content-encoding" not in cache.respond(small, Headers({"accept-encoding": "gzip"})).headers
+
+
+def test_etag_follows_the_body_across_workers():
+    worker_a, worker_b = LeaderboardCache(), LeaderboardCache()
+    worker_b.invalidate()  # versions differ between processes
+    page = worker_a.put("k", worker_a.version, BODY)
+
+    assert worker_b.put("k", worker_b.version, BODY).etag == page.etag
+    # Another worker's write changed the page; the old ETag must not match it
+    changed = worker_b.put("k", worker_b.version, BODY + b" ")
+    assert worker_b.respond(changed, Headers({"if-none-match": page.etag})).status_code == 200
+    assert worker_a.put("k", worker_a.version, BODY, next_cursor="abc").etag != page.etag
@@ -0,0 +1,68 @@
+import bisect
+import random
+from datetime import datetime, timedelta
+
+from leaderboard_index import IndexableSkipList, IndexedEntry, LeaderboardIndex, sort_key
+
+
+def make_entry(i, score, mode="walls"):
+    return IndexedEntry(
+        id=f"e{i:05d}", userId=f"u{i % 7}", username=f"Player{i % 7}", avatar=None,
+        score=score, mode=mode, date=datetime(2024, 1, 1) + timedelta(seconds=i % 13)
+    )
+
+
+def test_skip_list_matches_sorted_list():
+    rng = random.Random(42)
+    skip = IndexableSkipList(rng=random.Random(1))
+    expected = []
+    for _ in range(3000):
+        key = rng.randrange(500)
+        if expected and rng.random() < 0.3:
+            victim = rng.choice(expected)
+            expected.remove(victim)
+            assert skip.remove(victim)
+        elif key not in expected:
+            bisect.insort(expected, key)
+            skip.insert(key, str(key))
+
+    assert len(skip) == len(expected)
+    assert [k for k, _ in skip] == expected
+    for probe in range(0, 500, 7):
+        assert skip.bisect_left(probe) == bisect.bisect_left(expected, probe)
+        assert skip.bisect_right(probe) == bisect.bisect_right(expected, probe)
+    for i in range(0, len(expected), 11):
+        assert skip[i] == (expected[i], str(expected[i]))
+    assert not skip.remove(-1)
+
+
+def test_bulk_load_then_insert():
+    skip = IndexableSkipList(rng=random.Random(3))
+    skip.bulk_load((k, None) for k in range(0, 2000, 2))
+    for k in range(1, 2000, 4):
+        skip.insert(k)
+    expected = sorted(list(range(0, 2000, 2)) + list(range(1, 2000, 4)))
+    assert [k for k, _ in skip] == expected
+    assert [k for k, _ in skip.items_from(100, 5)] == expected[100:105]
+
+
+def test_leaderboard_index_queries():
+    index = LeaderboardIndex()
+    entries = [make_entry(i, (i * 37) % 50 * 10, "walls" if i % 2 else "pass-through") for i in range(200)]
+    index.load_entries(sorted(entries[:150], key=sort_key))
+    for e in entries[150:]:
+        index.add(e)
+
+    ranked = sorted(entries, key=sort_key)
+    assert index.top(10) == ranked[:10]
+    assert index.page(40, 20) == ranked[40:60]
+
+    walls = [e for e in ranked if e.mode == "walls"]
+    assert index.page(5, 10, "walls") == walls[5:15]
+    assert index.count("walls") == len(walls)
+
+    assert index.rank_of_score(10_000) == 1
+    assert index.rank_of_score(250) == 1 + sum(1 for e in entries if e.score > 250)
+
+    last = walls[9]
+    assert index.offset_after(last.score, last.date, last.id, "walls") == 10
@@ -0,0 +1,121 @@
+import gc
+import tracemalloc
+import warnings
+
+from game_engine import GameEngine
+from live_registry import LiveGameRegistry
+from live_state import CompactSnake, LiveGameState
+from models import GameMode, GameStatus
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_game(game_id, mode=GameMode.WALLS, status=GameStatus.PLAYING):
+    return LiveGameState(
+        id=game_id, playerId="u", playerName="P", mode=mode, snake=CompactSnake([0]), food=5, status=status
+    )
+
+
+def test_indexes_follow_status_changes():
+    registry = LiveGameRegistry(clock=FakeClock())
+    for i in range(6):
+        registry[f"g{i}"] = make_game(f"g{i}", GameMode.WALLS if i % 2 else GameMode.PASS_THROUGH)
+
+    registry["g1"].status = GameStatus.GAME_OVER
+    registry.touch("g1")
+
+    assert registry.count() == 6
+    assert registry.count(mode=GameMode.WALLS) == 3
+    assert registry.count(mode=GameMode.WALLS, status=GameStatus.PLAYING) == 2
+    assert [g.id for g in registry.select(mode=GameMode.WALLS, status=GameStatus.PLAYING)] == ["g3", "g5"]
+    assert [g.id for g in registry.select(status=GameStatus.GAME_OVER)] == ["g1"]
+    assert [g.id for g in registry.select(limit=2)] == ["g0", "g1"]
+
+    del registry["g3"]
+    assert registry.count(mode=GameMode.WALLS, status=GameStatus.PLAYING) == 1
+
+
+def test_finished_and_idle_games_expire():
+    clock = FakeClock()
+    evicted = []
+    registry = LiveGameRegistry(game_over_ttl=10, idle_ttl=100, clock=clock, on_evict=evicted.append)
+    registry["over"] = make_game("over")
+    registry["idle"] = make_game("idle")
+    registry["busy"] = make_game("busy")
+
+    registry["over"].status = GameStatus.GAME_OVER
+    registry.touch("over")
+    clock.now = 10
+    assert registry.sweep() == 1
+
+    clock.now = 90
+    registry.touch("busy")
+    clock.now = 100
+    assert registry.sweep() == 1
+    assert evicted == ["over", "idle"]
+    assert list(registry) == ["busy"]
+
+
+def test_capacity_evicts_finished_games_first():
+    registry = LiveGameRegistry(maxsize=3, clock=FakeClock())
+    for game_id in ["a", "b", "c"]:
+        registry[game_id] = make_game(game_id)
+    registry["b"].status = GameStatus.GAME_OVER
+    registry.touch("b")
+    registry.touch("a")
+
+    registry["d"] = make_game("d")
+    registry["e"] = make_game("e")
+
+    assert sorted(registry) == ["a", "d", "e"]
+    assert registry.stats()["evicted_capacity"] == 2
+
+
+def test_soak_memory_stays_flat():
+    clock = FakeClock()
+    registry = LiveGameRegistry(maxsize=2000, game_over_ttl=5, idle_ttl=30, clock=clock)
+    engine = GameEngine(registry, capacity=64, seed=1)
+    registry.on_evict = engine.release
+    spawned = 0
+
+    def play(rounds):
+        # Per tick: 20 new games that run into a wall, 2 that are abandoned mid-game
+        nonlocal spawned
+        for _ in range(rounds):
+            for _ in range(20):
+                engine.spawn(f"game_{spawned}", "u", "P", GameMode.WALLS)
+                spawned += 1
+            for _ in range(2):
+                registry[f"game_{spawned}"] = make_game(f"game_{spawned}", status=GameStatus.PAUSED)
+                spawned += 1
+            for game_id in engine.tick():
+                registry.touch(game_id)
+            clock.now += 0.12
+            registry.sweep()
+
+    # pytest keeps every warning it sees, which would look like a leak
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        tracemalloc.start()
+        try:
+            # Warm up until every live game was allocated while tracing
+            play(400)
+            gc.collect()
+            baseline = tracemalloc.get_traced_memory()[0]
+            play(1000)  # 22k more games
+            gc.collect()
+            grown = tracemalloc.get_traced_memory()[0] - baseline
+        finally:
+            tracemalloc.stop()
+
+    stats = registry.stats()
+    assert len(registry) < 2000
+    assert stats["evicted_capacity"] == 0
+    assert stats["evicted_expired"] == spawned - len(registry)
+    assert grown < 256 * 1024
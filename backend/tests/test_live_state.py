@@ -0,0 +1,57 @@
+import random
+
+from pydantic_core import to_json
+
+from models import GameMode, GameStatus, LiveGame, Position
+from live_state import CELLS, GRID_SIZE, CompactSnake, LiveGameState, to_cell
+from game_engine import DIRECTIONS
+from tests.test_game_engine import move_snake
+
+
+def as_xy(snake):
+    return [(c % GRID_SIZE, c // GRID_SIZE) for c in snake.cells()]
+
+
+def test_compact_snake_move_matches_reference():
+    rng = random.Random(9)
+    for mode in (GameMode.PASS_THROUGH, GameMode.WALLS):
+        for _ in range(50):
+            reference = [(10, 10), (9, 10), (8, 10)]
+            snake = CompactSnake(to_cell(x, y) for x, y in reference)
+            food = (rng.randrange(GRID_SIZE), rng.randrange(GRID_SIZE))
+            for _ in range(300):
+                direction = rng.choice(DIRECTIONS)
+                reference, ate, collision = move_snake(reference, direction, mode, food)
+                assert snake.move(direction, mode, to_cell(*food)) == (ate, collision)
+                assert as_xy(snake) == reference
+                if collision:
+                    break
+                if ate:
+                    free = [(x, y) for x in range(GRID_SIZE) for y in range(GRID_SIZE) if (x, y) not in reference]
+                    food = rng.choice(free)
+            assert all(snake.occupies(to_cell(x, y)) for x, y in reference)
+
+
+def test_compact_snake_cells_across_the_end_of_the_ring():
+    snake = CompactSnake([3, 2, 1])
+    expected = [3, 2, 1]
+    for step in range(2 * CELLS):
+        cell = (4 + step) % CELLS
+        snake.pop_tail()
+        snake.push_head(cell)
+        expected = [cell] + expected[:-1]
+        assert list(snake.cells()) == expected
+
+
+def test_state_round_trips_through_public_model():
+    game = LiveGame(
+        id="g1", playerId="u1", playerName="Player1", score=30, mode=GameMode.WALLS,
+        snake=[Position(x=5, y=4), Position(x=5, y=5), Position(x=4, y=5)],
+        food=Position(x=0, y=19), status=GameStatus.PAUSED, viewers=2
+    )
+    state = LiveGameState.from_model(game)
+    assert len(state.snake) == 3
+    assert state.snake.occupies(to_cell(4, 5))
+    assert not state.snake.occupies(to_cell(4, 4))
+    assert state.to_model() == game
+    assert to_json(state.to_dict()) == game.model_dump_json().encode()
@@ -0,0 +1,56 @@
+from models import GameMode, GameStatus
+from live_state import CompactSnake, LiveGameState, to_cell
+from live_stream import LiveGameStream
+
+
+def make_game(snake, food=(5, 5), score=0):
+    return LiveGameState(
+        id="game_1", playerId="user_1", playerName="Player1", score=score,
+        mode=GameMode.PASS_THROUGH, snake=CompactSnake(to_cell(x, y) for x, y in snake),
+        food=to_cell(*food), status=GameStatus.PLAYING
+    )
+
+
+def test_snapshot_then_move_delta():
+    game = make_game([(3, 3), (2, 3), (1, 3)])
+    stream = LiveGameStream(game)
+    snapshot = stream.snapshot(game)
+    assert snapshot["type"] == "snapshot"
+    assert snapshot["game"]["snake"] == [{"x": 3, "y": 3}, {"x": 2, "y": 3}, {"x": 1, "y": 3}]
+    assert stream.next_frame(game) is None
+
+    game.snake.pop_tail()
+    game.snake.push_head(to_cell(4, 3))
+    assert stream.next_frame(game) == {"type": "delta", "head": {"x": 4, "y": 3}, "tailRemoved": True}
+
+
+def test_eating_keeps_tail_and_reports_food_and_score():
+    game = make_game([(4, 5), (3, 5)])
+    stream = LiveGameStream(game)
+
+    game.snake.push_head(to_cell(5, 5))
+    game.food = to_cell(9, 1)
+    game.score = 10
+    assert stream.next_frame(game) == {
+        "type": "delta", "head": {"x": 5, "y": 5}, "tailRemoved": False,
+        "food": {"x": 9, "y": 1}, "score": 10
+    }
+
+
+def test_status_and_viewer_only_changes():
+    game = make_game([(1, 1), (0, 1)])
+    stream = LiveGameStream(game)
+
+    game.status = GameStatus.GAME_OVER
+    game.viewers = 3
+    assert stream.next_frame(game) == {"type": "delta", "status": "game-over", "viewers": 3}
+
+
+def test_skipped_steps_resync_with_snapshot():
+    game = make_game([(1, 1), (0, 1)])
+    stream = LiveGameStream(game)
+
+    game.snake = CompactSnake([to_cell(3, 1), to_cell(2, 1)])
+    frame = stream.next_frame(game)
+    assert frame["type"] == "snapshot"
+    assert frame["game"]["snake"] == [{"x": 3, "y": 1}, {"x": 2, "y": 1}]
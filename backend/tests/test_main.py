@@ -1,11 +1,18 @@
+import json
+from typing import List
+
 import pytest
 from httpx import ASGITransport, AsyncClient
+from pydantic import TypeAdapter
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from main import app, get_db, get_password_hash
+import main
+from main import app, auth_cache, get_db, get_password_hash, leaderboard_cache, password_hasher, score_buffer
 from db_setup import Base
 import sql_models
+from models import LeaderboardEntry
 from datetime import datetime
+from tests.test_replay_verifier import load_vectors
 
 # Setup Test DB
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -23,8 +30,12 @@ app.dependency_overrides[get_db] = override_get_db
 
 # Fixture to reset DB
 @pytest.fixture(autouse=True)
-def run_around_tests():
+def run_around_tests(monkeypatch):
+    # Most tests submit bare scores; test_submitted_replays_must_back_up_the_score covers replays
+    monkeypatch.setattr(main, "REPLAY_REQUIRED", False)
     Base.metadata.create_all(bind=engine)
+    auth_cache.clear()
+    leaderboard_cache.invalidate()
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -69,6 +80,37 @@ async def test_login():
     assert data["user"]["username"] == "SnakeMaster"
     assert "token" in data
 
+@pytest.mark.asyncio
+async def test_login_upgrades_plaintext_password():
+    db = TestingSessionLocal()
+    db.add(sql_models.User(id="user_legacy", username="Legacy", email="legacy@game.com", hashed_password="password123"))
+    db.commit()
+    db.close()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post("/auth/login", json={"email": "legacy@game.com", "password": "password123"})
+    assert response.status_code == 200
+    assert response.json()["user"]["username"] == "Legacy"
+
+    db = TestingSessionLocal()
+    assert db.get(sql_models.User, "user_legacy").hashed_password.startswith("$5$")
+    db.close()
+
+@pytest.mark.asyncio
+async def test_login_returns_503_when_hasher_saturated(monkeypatch):
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    db = TestingSessionLocal()
+    db.add(sql_models.User(
+        id="user_busy", username="Busy", email="busy@game.com", hashed_password=get_password_hash("password123")
+    ))
+    db.commit()
+    db.close()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post("/auth/login", json={"email": "busy@game.com", "password": "password123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
 @pytest.mark.asyncio
 async def test_get_leaderboard():
     # Setup data
@@ -87,6 +129,9 @@ async def test_get_leaderboard():
     data = response.json()
     assert len(data) > 0
     assert data[0]["username"] == "Player1"
+    # Encoded from the rows directly, byte for byte what the models would give
+    entries = TypeAdapter(List[LeaderboardEntry]).validate_json(response.content)
+    assert TypeAdapter(List[LeaderboardEntry]).dump_json(entries) == response.content
 
 @pytest.mark.asyncio
 async def test_get_live_games():
@@ -97,6 +142,91 @@ async def test_get_live_games():
     data = response.json()
     assert isinstance(data, list)
 
+@pytest.mark.asyncio
+async def test_get_live_games_filters():
+    from models import GameMode, GameStatus
+    from live_state import CompactSnake, LiveGameState
+
+    ids = [f"filter_game_{i}" for i in range(4)]
+    for i, game_id in enumerate(ids):
+        main.live_games[game_id] = LiveGameState(
+            id=game_id, playerId="user_1", playerName="Player1",
+            mode=GameMode.WALLS if i % 2 else GameMode.PASS_THROUGH, snake=CompactSnake([0]), food=5,
+            status=GameStatus.GAME_OVER if i == 3 else GameStatus.PLAYING
+        )
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            walls = await ac.get("/live-games", params={"mode": "walls", "status": "playing"})
+            limited = await ac.get("/live-games", params={"limit": 2})
+            too_many = await ac.get("/live-games", params={"limit": 100000})
+    finally:
+        for game_id in ids:
+            main.live_games.pop(game_id, None)
+
+    assert [g["id"] for g in walls.json()] == ["filter_game_1"]
+    assert len(limited.json()) == 2
+    assert too_many.status_code == 422
+
+@pytest.mark.asyncio
+async def test_live_games_503_when_the_hub_fails_or_stops(tmp_path, monkeypatch):
+    from live_registry import LiveGameRegistry
+    from live_store import LocalLiveGameStore, SocketLiveGameStore
+    from live_stream import LiveGameEvents
+    from presence import ViewerPresence
+
+    path = str(tmp_path / "live.sock")
+    hub = SocketLiveGameStore(path, local=LocalLiveGameStore(LiveGameRegistry(), ViewerPresence(), LiveGameEvents()))
+    await hub.start()
+
+    async def explode(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(hub.local, "list_games_json", explode)
+    # A worker that is not the hub: every call goes over the socket
+    monkeypatch.setattr(main, "live_store", SocketLiveGameStore(path))
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            failed = await ac.get("/live-games")
+            missing = await ac.get("/live-games/nope")
+            await hub.stop()
+            stopped = await ac.get("/live-games/nope")
+    finally:
+        await hub.stop()
+        await main.live_store.stop()
+
+    assert missing.status_code == 404
+    for res in (failed, stopped):
+        assert res.status_code == 503
+        assert res.json()["detail"] == "Live games are temporarily unavailable"
+        assert res.headers["Retry-After"] == "1"
+
+@pytest.mark.asyncio
+async def test_viewer_heartbeats():
+    from models import GameMode
+    from live_state import CompactSnake, LiveGameState
+
+    main.live_games["watched"] = LiveGameState(
+        id="watched", playerId="user_1", playerName="Player1", mode=GameMode.WALLS,
+        snake=CompactSnake([0]), food=5
+    )
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            first = await ac.post("/live-games/watched/heartbeat", json={"viewerId": "tab-1"})
+            again = await ac.post("/live-games/watched/heartbeat", json={"viewerId": "tab-1"})
+            joined = await ac.post("/live-games/watched/join", json={"viewerId": "tab-2"})
+            await ac.post("/live-games/watched/leave", json={"viewerId": "tab-1"})
+            game = (await ac.get("/live-games/watched")).json()
+            missing = await ac.post("/live-games/nope/heartbeat", json={"viewerId": "tab-1"})
+    finally:
+        main.live_games.pop("watched", None)
+        main.viewer_presence.forget_game("watched")
+
+    assert first.json()["viewers"] == 1
+    assert again.json()["viewers"] == 1
+    assert joined.json()["viewers"] == 2
+    assert game["viewers"] == 1
+    assert missing.status_code == 404
+
 @pytest.mark.asyncio
 async def test_update_profile():
     # Setup user
@@ -125,3 +255,428 @@ async def test_update_profile():
         )
     assert response.status_code == 200
     assert response.json()["username"] == "NewNAME"
+
+@pytest.mark.asyncio
+async def test_cached_user_sees_own_updates():
+    db = TestingSessionLocal()
+    db.add(sql_models.User(
+        id="user_cached", username="Cached", email="cached@game.com",
+        hashed_password=get_password_hash("password123"), highScore=100, gamesPlayed=1
+    ))
+    db.commit()
+    db.close()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        login_res = await ac.post("/auth/login", json={"email": "cached@game.com", "password": "password123"})
+        headers = {"Authorization": f"Bearer {login_res.json()['token']}"}
+
+        for score in (300, 200):
+            res = await ac.post("/leaderboard/submit", json={"score": score, "mode": "walls"}, headers=headers)
+            assert res.status_code == 200
+        await ac.patch("/users/profile", json={"avatar": "snake.png"}, headers=headers)
+        me = (await ac.get("/auth/me", headers=headers)).json()
+        metrics = (await ac.get("/metrics")).json()
+
+    assert me["highScore"] == 300
+    assert me["gamesPlayed"] == 3
+    assert me["avatar"] == "snake.png"
+    assert metrics["auth_cache"]["tokens"]["hits"] >= 3
+
+@pytest.mark.asyncio
+async def test_submits_through_a_warm_cache_add_to_the_database_counters():
+    db = TestingSessionLocal()
+    db.add(sql_models.User(
+        id="user_warm", username="Warm", email="warm@game.com",
+        hashed_password=get_password_hash("password123"), highScore=100, gamesPlayed=1
+    ))
+    db.commit()
+    db.close()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        login_res = await ac.post("/auth/login", json={"email": "warm@game.com", "password": "password123"})
+        headers = {"Authorization": f"Bearer {login_res.json()['token']}"}
+        await ac.get("/auth/me", headers=headers)
+
+        # Another worker records games; this worker's cached row does not see them
+        db = TestingSessionLocal()
+        db.query(sql_models.User).filter(sql_models.User.id == "user_warm").update({"highScore": 500, "gamesPlayed": 40})
+        db.commit()
+        db.close()
+
+        res = await ac.post("/leaderboard/submit", json={"score": 200, "mode": "walls"}, headers=headers)
+        assert res.status_code == 200
+        await ac.get("/auth/me", headers=headers)
+        batch = [{"score": 300, "mode": "walls"}, {"score": 600, "mode": "walls"}]
+        res = await ac.post("/leaderboard/submit/batch", json={"scores": batch}, headers=headers)
+        assert res.status_code == 200
+
+    db = TestingSessionLocal()
+    user = db.query(sql_models.User).filter(sql_models.User.id == "user_warm").one()
+    db.close()
+    assert (user.gamesPlayed, user.highScore) == (43, 600)
+
+@pytest.mark.asyncio
+async def test_submit_score_batch():
+    db = TestingSessionLocal()
+    db.add(sql_models.User(
+        id="user_batch", username="Batcher", email="batch@game.com",
+        hashed_password=get_password_hash("password123"), highScore=250, gamesPlayed=4
+    ))
+    db.commit()
+    db.close()
+
+    scores = [{"score": 100, "mode": "walls"}, {"score": 400, "mode": "pass-through"}, {"score": 300, "mode": "walls"}]
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        login_res = await ac.post("/auth/login", json={"email": "batch@game.com", "password": "password123"})
+        headers = {"Authorization": f"Bearer {login_res.json()['token']}"}
+        response = await ac.post("/leaderboard/submit/batch", json={"scores": scores}, headers=headers)
+        empty = await ac.post("/leaderboard/submit/batch", json={"scores": []}, headers=headers)
+        me = (await ac.get("/auth/me", headers=headers)).json()
+        leaderboard = (await ac.get("/leaderboard")).json()
+
+    assert response.status_code == 200
+    entries = response.json()
+    assert [e["score"] for e in entries] == [100, 400, 300]
+    assert len({e["id"] for e in entries}) == 3
+    assert empty.status_code == 422
+    assert me["highScore"] == 400
+    assert me["gamesPlayed"] == 7
+    assert [e["score"] for e in leaderboard] == [400, 300, 100]
+
+@pytest.mark.asyncio
+async def test_write_behind_scores_visible_before_flush(monkeypatch):
+    monkeypatch.setattr(main, "SCORE_WRITE_BEHIND_ENABLED", True)
+    monkeypatch.setattr(main, "REPLAY_VERIFY_ENABLED", False)
+    monkeypatch.setattr(score_buffer, "session_factory", TestingSessionLocal)
+    db = TestingSessionLocal()
+    db.add(sql_models.User(
+        id="user_wb", username="Buffered", email="wb@game.com",
+        hashed_password=get_password_hash("password123"), highScore=100, gamesPlayed=2
+    ))
+    db.commit()
+    db.close()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        login_res = await ac.post("/auth/login", json={"email": "wb@game.com", "password": "password123"})
+        headers = {"Authorization": f"Bearer {login_res.json()['token']}"}
+        replay = {"seed": 7, "moves": "RRDDLLUU", "durationMs": 1200}
+        submitted = [
+            await ac.post("/leaderboard/submit", json={"score": score, "mode": "walls", "replay": replay}, headers=headers)
+            for score in (500, 200)
+        ]
+        assert all(res.status_code == 200 for res in submitted)
+        # Rejected before they are buffered, so they can never block a flush
+        for bad in (2**70, -1, "lots", 1.5):
+            res = await ac.post("/leaderboard/submit", json={"score": bad, "mode": "walls"}, headers=headers)
+            assert res.status_code == 400
+        assert len(score_buffer) == 2
+        pending_replay = await ac.get(f"/leaderboard/{submitted[0].json()['id']}/replay")
+        leaderboard = (await ac.get("/leaderboard", params={"mode": "walls"})).json()
+        stats = (await ac.get("/users/user_wb/stats")).json()
+
+        assert [e["score"] for e in leaderboard] == [500, 200]
+        assert [e["rank"] for e in leaderboard] == [1, 2]
+        assert stats["highScore"] == 500
+        assert stats["gamesPlayed"] == 4
+
+        db = TestingSessionLocal()
+        assert db.query(sql_models.LeaderboardEntry).count() == 0
+        db.close()
+
+        score_buffer.flush_all()
+        me = (await ac.get("/auth/me", headers=headers)).json()
+
+    db = TestingSessionLocal()
+    assert db.query(sql_models.LeaderboardEntry).count() == 2
+    assert db.query(sql_models.Replay).count() == 2
+    db.close()
+    assert pending_replay.status_code == 200
+    assert '"moves": "RRDDLLUU"' in pending_replay.text
+    assert me["highScore"] == 500
+    assert me["gamesPlayed"] == 4
+
+@pytest.mark.asyncio
+async def test_replay_recorded_with_score_and_streamed_back(monkeypatch):
+    monkeypatch.setattr(main, "REPLAY_CHUNK_TICKS", 8)
+    monkeypatch.setattr(main, "REPLAY_VERIFY_ENABLED", False)
+    db = TestingSessionLocal()
+    db.add(sql_models.User(
+        id="user_replay", username="Replayer", email="replay@game.com",
+        hashed_password=get_password_hash("password123")
+    ))
+    db.commit()
+    db.close()
+
+    moves = "RRRRDDDDLLLLUUURR"
+    replay = {"seed": 42, "moves": moves, "durationMs": 2550}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        login_res = await ac.post("/auth/login", json={"email": "replay@game.com", "password": "password123"})
+        headers = {"Authorization": f"Bearer {login_res.json()['token']}"}
+        entry = (await ac.post(
+            "/leaderboard/submit", json={"score": 30, "mode": "walls", "replay": replay}, headers=headers
+        )).json()
+        plain = (await ac.post("/leaderboard/submit", json={"score": 10, "mode": "walls"}, headers=headers)).json()
+        invalid = await ac.post(
+            "/leaderboard/submit", json={"score": 10, "mode": "walls", "replay": {**replay, "moves": "RX"}}, headers=headers
+        )
+        streamed = await ac.get(f"/leaderboard/{entry['id']}/replay")
+        missing = await ac.get(f"/leaderboard/{plain['id']}/replay")
+
+    assert invalid.status_code == 400
+    assert missing.status_code == 404
+    assert streamed.headers["content-type"] == "application/x-ndjson"
+    header, *chunks = [json.loads(line) for line in streamed.text.splitlines()]
+    assert header == {
+        "entryId": entry["id"], "mode": "walls", "score": 30, "seed": 42, "ticks": len(moves), "durationMs": 2550
+    }
+    assert [len(c["moves"]) for c in chunks] == [8, 8, 1]
+    assert "".join(c["moves"] for c in chunks) == moves
+
+@pytest.mark.asyncio
+async def test_submitted_replays_must_back_up_the_score(monkeypatch):
+    monkeypatch.setattr(main, "REPLAY_REQUIRED", True)
+    game = next(g for g in load_vectors()["games"] if g["mode"] == "walls")
+    replay = {"seed": game["seed"], "moves": game["moves"], "durationMs": 200 * len(game["moves"])}
+    db = TestingSessionLocal()
+    db.add(sql_models.User(
+        id="user_verified", username="Verified", email="verified@game.com",
+        hashed_password=get_password_hash("password123")
+    ))
+    db.commit()
+    db.close()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        login_res = await ac.post("/auth/login", json={"email": "verified@game.com", "password": "password123"})
+        headers = {"Authorization": f"Bearer {login_res.json()['token']}"}
+
+        async def submit(score, replay=replay):
+            body = {"score": score, "mode": "walls", "replay": replay}
+            return await ac.post("/leaderboard/submit", json=body, headers=headers)
+
+        accepted = await submit(game["score"])
+        inflated = await submit(game["score"] + 10)
+        sped_up = await submit(game["score"], {**replay, "durationMs": 1000})
+        missing = await submit(game["score"], None)
+        monkeypatch.setattr(main, "REPLAY_MAX_TICKS_PER_REQUEST", 3 * len(game["moves"]) - 1)
+        too_long = await ac.post("/leaderboard/submit/batch", json={"scores": [
+            {"score": game["score"], "mode": "walls", "replay": replay} for _ in range(3)
+        ]}, headers=headers)
+        batch = await ac.post("/leaderboard/submit/batch", json={"scores": [
+            {"score": game["score"], "mode": "walls", "replay": replay},
+            {"score": 9990, "mode": "walls", "replay": replay},
+        ]}, headers=headers)
+        stats = (await ac.get("/users/user_verified/stats")).json()
+
+    assert accepted.status_code == 200
+    assert inflated.status_code == 422
+    assert inflated.json()["detail"] == "Replay rejected: score mismatch"
+    assert sped_up.json()["detail"] == "Replay rejected: too fast"
+    assert missing.json()["detail"] == "Replay required"
+    assert too_long.json()["detail"] == "Replays too long"
+    assert batch.status_code == 422
+    assert stats["gamesPlayed"] == 1
+    assert stats["highScore"] == game["score"]
+
+@pytest.mark.asyncio
+async def test_get_leaderboard_pagination():
+    db = TestingSessionLocal()
+    for i in range(5):
+        db.add(sql_models.LeaderboardEntry(
+            id=f"p{i}", rank=0, userId="u1", username="Player1",
+            score=100 * (i % 3), mode="walls", date=datetime(2024, 1, 1, 0, 0, i)
+        ))
+    db.commit()
+    db.close()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        first = await ac.get("/leaderboard", params={"mode": "walls", "limit": 2})
+        second = await ac.get(
+            "/leaderboard",
+            params={"mode": "walls", "limit": 2, "cursor": first.headers["X-Next-Cursor"]}
+        )
+        third = await ac.get(
+            "/leaderboard",
+            params={"mode": "walls", "limit": 2, "cursor": second.headers["X-Next-Cursor"]}
+        )
+        legacy = await ac.get("/leaderboard", params={"mode": "walls", "all": "true"})
+
+    pages = first.json() + second.json() + third.json()
+    assert [e["id"] for e in pages] == ["p2", "p1", "p4", "p0", "p3"]
+    assert [e["rank"] for e in pages] == [1, 2, 3, 4, 5]
+    assert "X-Next-Cursor" not in third.headers
+    assert legacy.json() == pages
+
+@pytest.mark.asyncio
+async def test_get_leaderboard_distinct_players():
+    db = TestingSessionLocal()
+    for i, name in enumerate(["Ann", "Bob", "Cy"]):
+        db.add(sql_models.User(
+            id=f"user_{name}", username=name, email=f"{name.lower()}@game.com",
+            hashed_password=get_password_hash("password123")
+        ))
+    db.commit()
+    db.close()
+
+    games = {"Ann": [900, 800, 700], "Bob": [850], "Cy": [100, 600]}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        for name, scores in games.items():
+            login_res = await ac.post("/auth/login", json={"email": f"{name.lower()}@game.com", "password": "password123"})
+            headers = {"Authorization": f"Bearer {login_res.json()['token']}"}
+            for score in scores:
+                await ac.post("/leaderboard/submit", json={"score": score, "mode": "walls"}, headers=headers)
+
+        everyone = await ac.get("/leaderboard", params={"limit": 3})
+        first = await ac.get("/leaderboard", params={"distinct": "true", "mode": "walls", "limit": 2})
+        second = await ac.get("/leaderboard", params={"distinct": "true", "mode": "walls", "limit": 2,
+                                                       "cursor": first.headers["X-Next-Cursor"]})
+        overall = await ac.get("/leaderboard", params={"distinct": "true"})
+
+    assert [e["username"] for e in everyone.json()] == ["Ann", "Bob", "Ann"]
+    assert [(e["username"], e["score"], e["rank"]) for e in first.json() + second.json()] == [
+        ("Ann", 900, 1), ("Bob", 850, 2), ("Cy", 600, 3)
+    ]
+    assert "X-Next-Cursor" not in second.headers
+    assert [e["score"] for e in overall.json()] == [900, 850, 600]
+
+@pytest.mark.asyncio
+async def test_distinct_leaderboard_includes_buffered_bests(monkeypatch):
+    monkeypatch.setattr(main, "REPLAY_VERIFY_ENABLED", False)
+    monkeypatch.setattr(score_buffer, "session_factory", TestingSessionLocal)
+    db = TestingSessionLocal()
+    for name in ["Ann", "Bob", "Cy"]:
+        db.add(sql_models.User(
+            id=f"user_{name}", username=name, email=f"{name.lower()}@game.com",
+            hashed_password=get_password_hash("password123")
+        ))
+    db.commit()
+    db.close()
+
+    async def submit(ac, name, score):
+        login_res = await ac.post("/auth/login", json={"email": f"{name.lower()}@game.com", "password": "password123"})
+        headers = {"Authorization": f"Bearer {login_res.json()['token']}"}
+        res = await ac.post("/leaderboard/submit", json={"score": score, "mode": "walls"}, headers=headers)
+        assert res.status_code == 200
+
+    def rows(res):
+        return [(e["username"], e["score"], e["rank"]) for e in res.json()]
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        await submit(ac, "Ann", 300)
+        await submit(ac, "Bob", 400)
+        monkeypatch.setattr(main, "SCORE_WRITE_BEHIND_ENABLED", True)
+        for name, score in (("Ann", 500), ("Ann", 450), ("Bob", 100), ("Cy", 200)):
+            await submit(ac, name, score)
+        assert len(score_buffer) == 4
+
+        first = await ac.get("/leaderboard", params={"distinct": "true", "mode": "walls", "limit": 2})
+        second = await ac.get("/leaderboard", params={"distinct": "true", "mode": "walls", "limit": 2,
+                                                       "cursor": first.headers["X-Next-Cursor"]})
+        overall = await ac.get("/leaderboard", params={"distinct": "true"})
+        score_buffer.flush_all()
+        leaderboard_cache.invalidate()
+        flushed = await ac.get("/leaderboard", params={"distinct": "true"})
+
+    expected = [("Ann", 500, 1), ("Bob", 400, 2), ("Cy", 200, 3)]
+    assert rows(first) + rows(second) == expected
+    assert "X-Next-Cursor" not in second.headers
+    assert rows(overall) == rows(flushed) == expected
+
+@pytest.mark.asyncio
+async def test_get_leaderboard_invalid_cursor():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/leaderboard", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_leaderboard_etag_and_invalidation():
+    db = TestingSessionLocal()
+    db.add(sql_models.User(
+        id="user_e", username="Etag", email="etag@game.com", hashed_password=get_password_hash("password123")
+    ))
+    for i in range(20):
+        db.add(sql_models.LeaderboardEntry(
+            id=f"e{i:02d}", rank=0, userId="user_e", username="Etag",
+            score=10 * i, mode="walls", date=datetime(2024, 1, 1, 0, 0, i)
+        ))
+    db.commit()
+    db.close()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        first = await ac.get("/leaderboard", headers={"Accept-Encoding": "gzip"})
+        etag = first.headers["ETag"]
+        unchanged = await ac.get("/leaderboard", headers={"If-None-Match": etag})
+        plain = await ac.get("/leaderboard", headers={"Accept-Encoding": "identity"})
+
+        login_res = await ac.post("/auth/login", json={"email": "etag@game.com", "password": "password123"})
+        headers = {"Authorization": f"Bearer {login_res.json()['token']}"}
+        await ac.post("/leaderboard/submit", json={"score": 5000, "mode": "walls"}, headers=headers)
+        changed = await ac.get("/leaderboard", headers={"If-None-Match": etag})
+
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert "Content-Encoding" not in plain.headers
+    assert plain.json() == first.json()
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()[0]["score"] == 5000
+
+@pytest.mark.asyncio
+async def test_get_user_stats_rank():
+    from database import user_rank_index
+
+    db = TestingSessionLocal()
+    for i, high_score in enumerate([500, 300, 300, 100]):
+        db.add(sql_models.User(
+            id=f"user_{i}", username=f"Player{i}", email=f"p{i}@game.com",
+            hashed_password="x", highScore=high_score, gamesPlayed=1
+        ))
+    db.commit()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        sql_ranks = [(await ac.get(f"/users/user_{i}/stats")).json()["rank"] for i in range(4)]
+        user_rank_index.load(db)
+        try:
+            index_ranks = [(await ac.get(f"/users/user_{i}/stats")).json()["rank"] for i in range(4)]
+        finally:
+            user_rank_index.ready = False
+            db.close()
+
+    assert sql_ranks == [1, 2, 2, 4]
+    assert index_ranks == sql_ranks
+
+def test_live_game_websocket_stream():
+    from fastapi.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+    from models import GameMode
+    from live_state import CompactSnake, LiveGameState, to_cell
+    import main
+
+    game = LiveGameState(
+        id="ws_game", playerId="user_1", playerName="Player1", mode=GameMode.WALLS,
+        snake=CompactSnake([to_cell(2, 2), to_cell(1, 2)]), food=to_cell(8, 8)
+    )
+    main.live_games[game.id] = game
+    try:
+        client = TestClient(app)
+        with client.websocket_connect("/ws/live-games/ws_game") as ws:
+            assert ws.receive_json()["game"]["id"] == "ws_game"
+
+            # Run on the stream's event loop, as the routes and the engine would
+            ws.portal.call(main.live_store.heartbeat, "ws_game", "viewer_1")
+            assert ws.receive_json() == {"type": "delta", "viewers": 1}
+
+            game.snake.pop_tail()
+            game.snake.push_head(to_cell(3, 2))
+            ws.portal.call(main.live_game_events.publish, "ws_game")
+            assert ws.receive_json() == {"type": "delta", "head": {"x": 3, "y": 2}, "tailRemoved": True}
+
+            del main.live_games[game.id]
+            ws.portal.call(main.live_game_events.publish, "ws_game")
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+            assert closed.value.code == 4404
+        assert main.live_broadcaster.stats()["games"] == 0
+    finally:
+        main.live_games.pop(game.id, None)
+        main.viewer_presence.forget_game(game.id)
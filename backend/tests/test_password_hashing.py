@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+from passlib.exc import UnknownHashError
+
+from password_hashing import HasherBusy, PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_process_pool_hash_and_verify():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    hasher.start()
+    try:
+        hashed = await hasher.hash("password123")
+        assert await hasher.verify("password123", hashed)
+        assert not await hasher.verify("wrong-password", hashed)
+        with pytest.raises(UnknownHashError):
+            await hasher.verify("password123", "not-a-hash")
+    finally:
+        hasher.shutdown()
+
+    stats = hasher.stats()
+    assert stats["completed"] == 4
+    assert stats["pending"] == 0
+    assert stats["p99_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_saturated():
+    hasher = PasswordHasher(workers=0, max_pending=1)
+    first = asyncio.ensure_future(hasher.hash("password123"))
+    await asyncio.sleep(0)  # let the first hash claim the only slot
+    with pytest.raises(HasherBusy):
+        await hasher.hash("password123")
+    assert await hasher.verify("password123", await first)
+    assert hasher.stats()["rejected"] == 1
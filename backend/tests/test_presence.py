@@ -0,0 +1,59 @@
+from presence import ViewerPresence
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_heartbeats_are_idempotent_and_expire():
+    clock = FakeClock()
+    changes = []
+    presence = ViewerPresence(ttl=10, clock=clock, on_change=lambda ids: changes.append(sorted(ids)))
+
+    assert presence.heartbeat("g1", "a") == 1
+    assert presence.heartbeat("g1", "a") == 1
+    assert presence.heartbeat("g1", "b") == 2
+    assert presence.heartbeat("g2", "a") == 1
+
+    clock.now = 6
+    presence.heartbeat("g1", "b")
+    clock.now = 10
+    assert presence.advance() == 2
+    assert presence.count("g1") == 1
+    assert presence.count("g2") == 0
+
+    clock.now = 16
+    presence.advance()
+    assert len(presence) == 0
+    assert changes == [["g1"], ["g1"], ["g2"], ["g1", "g2"], ["g1"]]
+
+
+def test_leave_forget_and_capacity():
+    presence = ViewerPresence(ttl=10, max_viewers=2, clock=FakeClock())
+    presence.heartbeat("g1", "a")
+    presence.heartbeat("g1", "b")
+    assert presence.heartbeat("g1", "c") is None
+    assert presence.heartbeat("g1", "a") == 2
+
+    assert presence.leave("g1", "a")
+    assert not presence.leave("g1", "a")
+    assert presence.heartbeat("g1", "c") == 2
+
+    presence.forget_game("g1")
+    assert len(presence) == 0
+    assert presence.stats()["rejected"] == 1
+
+
+def test_long_pause_expires_everyone():
+    clock = FakeClock()
+    presence = ViewerPresence(ttl=5, clock=clock)
+    for i in range(100):
+        clock.now = i * 0.05
+        presence.heartbeat(f"g{i % 3}", f"v{i}")
+    clock.now = 1000
+    assert presence.advance() == 100
+    assert presence.count("g0") == 0
@@ -0,0 +1,12 @@
+import os
+
+from process_pool import MAX_DEFAULT_WORKERS, default_workers
+
+
+def test_default_workers_follow_the_cpu_affinity_not_the_host(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 64)
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(2)), raising=False)
+    assert default_workers() == 2
+
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(64)), raising=False)
+    assert default_workers() == MAX_DEFAULT_WORKERS
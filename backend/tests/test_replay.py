@@ -0,0 +1,29 @@
+import pytest
+
+from replay import InvalidReplay, Replay
+
+
+def test_round_trip_packs_two_bits_per_tick():
+    moves = "RRRRDDDLLLUUR" * 77
+    replay = Replay.from_moves(seed=123456789, moves=moves, duration_ms=154_321)
+    data = replay.encode()
+
+    assert len(replay.packed) == (len(moves) + 3) // 4
+    # version + seed + two 2-3 byte varints
+    assert len(data) <= len(replay.packed) + 11
+    decoded = Replay.decode(data)
+    assert decoded == replay
+    assert "".join(decoded.moves(chunk_ticks=64)) == moves
+    assert [len(chunk) for chunk in decoded.moves(chunk_ticks=400)] == [400, 400, 201]
+
+
+def test_rejects_bad_input():
+    assert "".join(Replay.decode(Replay.from_moves(0, "", 0).encode()).moves()) == ""
+    with pytest.raises(InvalidReplay):
+        Replay.from_moves(0, "RRX", 10)
+    with pytest.raises(InvalidReplay):
+        Replay.from_moves(2**32, "R", 10)
+    with pytest.raises(InvalidReplay):
+        Replay.decode(Replay.from_moves(0, "RRRRR", 10).encode()[:-1])
+    with pytest.raises(InvalidReplay):
+        Replay.decode(b"\x02" + bytes(8))
@@ -0,0 +1,116 @@
+"""
+Replay verification, checked against the vectors in specs/replay-vectors.json.
+
+The frontend runs the same vectors through ``mulberry32`` and ``advanceGame``
+(src/test/replayVectors.test.ts), so the two simulators can't drift apart.
+To regenerate them after a rule change, run
+``uv run python -m tests.test_replay_verifier`` from backend/.
+"""
+
+import asyncio
+import json
+import os
+import random
+
+from models import GameMode
+from replay import MOVE_LETTERS, Replay
+from replay_verifier import ReplayVerifier, check_replay, mulberry32, simulate
+
+VECTORS_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "specs", "replay-vectors.json")
+
+
+def _bot_moves(mode: GameMode, seed: int, ticks: int, rng: random.Random) -> str:
+    """Moves of a greedy player who eats for ``ticks`` ticks, then crashes."""
+    moves = ""
+    while True:
+        state = simulate(mode, Replay.from_moves(seed, moves, 0))
+        if state.crashed:
+            return moves
+        fx, fy = state.food
+        options = []
+        for letter in MOVE_LETTERS:
+            after = simulate(mode, Replay.from_moves(seed, moves + letter, 0))
+            if after.reversed_at is not None:
+                continue
+            (x, y) = after.snake[0]
+            distance = abs(x - fx) + abs(y - fy)
+            # Past the target length, head for a crash instead
+            crash_wanted = len(moves) >= ticks
+            options.append((after.crashed != crash_wanted, distance, rng.random(), letter))
+        moves += min(options)[3]
+
+
+def make_vectors() -> dict:
+    rng = random.Random(2024)
+    games = []
+    for mode, seed, ticks in [
+        (GameMode.PASS_THROUGH, 1, 300), (GameMode.PASS_THROUGH, 2**32 - 1, 600),
+        (GameMode.WALLS, 42, 300), (GameMode.WALLS, 123456789, 600),
+    ]:
+        moves = _bot_moves(mode, seed, ticks, rng)
+        result = simulate(mode, Replay.from_moves(seed, moves, 0))
+        games.append({
+            "mode": mode.value, "seed": seed, "moves": moves, "score": result.score,
+            "snake": [{"x": x, "y": y} for x, y in result.snake],
+            "food": {"x": result.food[0], "y": result.food[1]},
+        })
+    randoms = []
+    for seed in (0, 1, 42, 2**31, 2**32 - 1):
+        next_float = mulberry32(seed)
+        randoms.append({"seed": seed, "values": [next_float() for _ in range(5)]})
+    return {"random": randoms, "games": games}
+
+
+def load_vectors() -> dict:
+    with open(VECTORS_PATH) as f:
+        return json.load(f)
+
+
+def test_mulberry32_matches_vectors():
+    for vector in load_vectors()["random"]:
+        next_float = mulberry32(vector["seed"])
+        assert [next_float() for _ in vector["values"]] == vector["values"]
+
+
+def test_games_replay_to_the_vector_end_state():
+    for game in load_vectors()["games"]:
+        result = simulate(GameMode(game["mode"]), Replay.from_moves(game["seed"], game["moves"], 0))
+        assert result.crashed and result.ticks == len(game["moves"])
+        assert result.score == game["score"] > 0
+        assert result.snake == [(p["x"], p["y"]) for p in game["snake"]]
+        assert result.food == (game["food"]["x"], game["food"]["y"])
+
+
+def test_check_replay_rejections():
+    game = next(g for g in load_vectors()["games"] if g["mode"] == "walls")
+    mode, score, moves, seed = game["mode"], game["score"], game["moves"], game["seed"]
+    slow = 200 * len(moves)
+
+    def check(moves=moves, score=score, duration=slow, mode=mode):
+        return check_replay(mode, score, Replay.from_moves(seed, moves, duration).encode())
+
+    assert check() is None
+    assert check(score=score + 10) == "score mismatch"
+    assert check(duration=1000) == "too fast"
+    assert check(moves=moves[:-1]) == "unfinished"
+    assert check(moves=moves + "U") == "moves after game over"
+    assert check(moves="RL" + moves) == "reversed"
+    assert check_replay(mode, score, b"\x01") == "malformed"
+
+
+def test_verifier_checks_batches():
+    games = load_vectors()["games"]
+    items = [(g["mode"], g["score"] + 10 * (i % 2), Replay.from_moves(g["seed"], g["moves"], 10**6).encode())
+             for i, g in enumerate(games * 10)]
+    verifier = ReplayVerifier(workers=0, max_pending=4, chunk_size=3)
+
+    reasons = asyncio.run(verifier.check_many(items))
+    assert reasons == [None if i % 2 == 0 else "score mismatch" for i in range(len(items))]
+    assert verifier.stats()["checked"] == len(items)
+    assert verifier.stats()["rejected"] == len(items) // 2
+
+
+if __name__ == "__main__":
+    with open(VECTORS_PATH, "w") as f:
+        json.dump(make_vectors(), f, indent=1)
+        f.write("\n")
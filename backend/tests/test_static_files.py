@@ -0,0 +1,67 @@
+import gzip
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import main
+from main import app
+from static_files import IMMUTABLE, StaticManifest
+
+BUNDLE = b"export const answer = 42;\n" * 200
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_bytes(b"<!doctype html><title>Snake Arena</title>")
+    (tmp_path / "assets" / "index-Dk3x9_aB.js").write_bytes(BUNDLE)
+    (tmp_path / "assets" / "index-Dk3x9_aB.js.gz").write_bytes(gzip.compress(BUNDLE))
+    (tmp_path / "assets" / "index-Dk3x9_aB.js.br").write_bytes(b"brotli bytes")
+    (tmp_path / "favicon.ico").write_bytes(b"\x00" * 2048)
+    # Bigger than the memory limit below, so it is sent from disk
+    manifest = StaticManifest(str(tmp_path), memory_limit=1024)
+    assert manifest.load() == 3
+    monkeypatch.setattr(main, "static_manifest", manifest)
+    return manifest
+
+
+@pytest.mark.asyncio
+async def test_hashed_assets_are_precompressed_and_immutable(static_dir):
+    path = "/assets/index-Dk3x9_aB.js"
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        br = await ac.get(path, headers={"Accept-Encoding": "gzip, br"})
+        gz = await ac.get(path, headers={"Accept-Encoding": "gzip, br;q=0"})
+        plain = await ac.get(path, headers={"Accept-Encoding": "identity"})
+        revalidated = await ac.get(path, headers={"Accept-Encoding": "gzip", "If-None-Match": gz.headers["etag"]})
+        stale = await ac.get(path, headers={"Accept-Encoding": "br", "If-None-Match": gz.headers["etag"]})
+
+    assert br.headers["content-encoding"] == "br"
+    assert br.content == b"brotli bytes"
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gz.content == BUNDLE  # httpx decodes gzip
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["content-type"] == "text/javascript; charset=utf-8"
+    for res in (br, gz, plain):
+        assert res.headers["cache-control"] == IMMUTABLE
+        assert "Accept-Encoding" in res.headers["vary"]
+    assert len({br.headers["etag"], gz.headers["etag"], plain.headers["etag"]}) == 3
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == gz.headers["etag"]
+    assert stale.status_code == 200
+    # Large files go out from disk, everything else from memory
+    assert static_dir.stats()["from_disk"] == 1
+    assert static_dir.stats()["not_modified"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_paths_get_the_revalidated_index(static_dir):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        route = await ac.get("/live/some-game")
+        root = await ac.get("/")
+        icon = await ac.get("/favicon.ico")
+
+    assert route.text == root.text == "<!doctype html><title>Snake Arena</title>"
+    assert route.headers["cache-control"] == "no-cache"
+    assert "Accept-Encoding" not in route.headers.get("vary", "")
+    assert icon.headers["cache-control"] == "no-cache"
+    assert len(icon.content) == 2048
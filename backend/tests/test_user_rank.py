@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from user_rank import APPROXIMATE, EXACT, FenwickTree, UserRankIndex
+
+
+def brute_force_rank(scores, score):
+    return sum(1 for s in scores.values() if s > score) + 1
+
+
+def test_fenwick_prefix_sums():
+    tree = FenwickTree(10)
+    for i in range(10):
+        tree.add(i, i)
+    assert [tree.prefix_sum(i) for i in range(11)] == [sum(range(i)) for i in range(11)]
+
+
+def test_exact_rank_tracks_high_score_updates():
+    rng = random.Random(7)
+    scores = {f"user_{i}": rng.randrange(100) * 10 for i in range(500)}
+    index = UserRankIndex(EXACT)
+    index.load_scores(scores.items())
+
+    for _ in range(300):
+        user_id = rng.choice(list(scores))
+        new_score = scores[user_id] + rng.randrange(1, 50) * 10
+        index.update(user_id, scores[user_id], new_score)
+        scores[user_id] = new_score
+
+    index.add_user("newcomer")
+    scores["newcomer"] = 0
+
+    assert len(index) == len(scores)
+    for score in [0, 10, 250, 990, 5000, max(scores.values())]:
+        assert index.rank(score) == brute_force_rank(scores, score)
+
+
+def test_exact_update_ignores_a_stale_old_score():
+    index = UserRankIndex(EXACT)
+    index.load_scores([("ann", 300), ("bob", 200)])
+    # A cached row still says 100 after Ann's 300 was flushed
+    index.update("ann", 100, 400)
+    index.update("ann", 100, 350)
+
+    assert len(index) == 2
+    assert index.rank(400) == 1
+    assert index.rank(300) == 2
+    assert index.rank(200) == 2
+
+
+def test_approximate_rank_is_close():
+    rng = random.Random(11)
+    scores = {f"user_{i}": int(rng.expovariate(1 / 2000)) for i in range(20_000)}
+    index = UserRankIndex(APPROXIMATE)
+    index.load_scores(scores.items())
+
+    for score in [100, 1000, 2500, 8000]:
+        exact = brute_force_rank(scores, score)
+        assert index.rank(score) == pytest.approx(exact, rel=0.05)
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        UserRankIndex("fuzzy")
@@ -111,3 +111,48 @@ class TestDatabaseIsolation:
         """Third test to verify isolation - should also start fresh."""
         count = test_db_session.query(sql_models.User).count()
         assert count == 0
+
+
+class TestSQLiteProfile:
+    """Test the per-connection SQLite PRAGMA profiles."""
+
+    def _pragmas(self, engine):
+        from sqlalchemy import text
+        with engine.connect() as connection:
+            return {
+                name: connection.execute(text(f"PRAGMA {name}")).scalar()
+                for name in ("journal_mode", "synchronous", "cache_size")
+            }
+
+    def test_performance_profile(self, tmp_path):
+        """Test that the performance profile enables WAL on every pooled connection."""
+        from sqlalchemy import create_engine
+        from db_setup import apply_sqlite_profile, engine_options
+
+        url = f"sqlite:///{tmp_path}/profile.db"
+        engine = create_engine(url, **engine_options(url))
+        apply_sqlite_profile(engine, "performance")
+
+        pragmas = self._pragmas(engine)
+        assert pragmas["journal_mode"] == "wal"
+        assert pragmas["synchronous"] == 1  # NORMAL
+        assert pragmas["cache_size"] < 0
+        engine.dispose()
+
+    def test_default_profile(self, tmp_path):
+        """Test that the default profile leaves SQLite's settings alone."""
+        from sqlalchemy import create_engine
+        from db_setup import apply_sqlite_profile
+
+        engine = create_engine(f"sqlite:///{tmp_path}/profile.db")
+        apply_sqlite_profile(engine, "default")
+
+        assert self._pragmas(engine)["journal_mode"] == "delete"
+        engine.dispose()
+
+    def test_unknown_profile(self, test_db_engine):
+        """Test that an unknown profile name is rejected."""
+        from db_setup import apply_sqlite_profile
+
+        with pytest.raises(ValueError):
+            apply_sqlite_profile(test_db_engine, "turbo")
@@ -0,0 +1,58 @@
+"""
+Integration tests for the in-memory leaderboard index.
+Verifies that the index stays consistent with the SQL ordering.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+import sql_models
+from leaderboard_index import LeaderboardIndex
+
+
+class TestLeaderboardIndexConsistency:
+    """Test that the index agrees with the leaderboard table."""
+
+    def _add_entries(self, session: Session, start: int, count: int):
+        rng = random.Random(start)
+        entries = []
+        for i in range(start, start + count):
+            entry = sql_models.LeaderboardEntry(
+                id=f"score_{i}",
+                rank=0,
+                userId=f"user_{i % 5}",
+                username=f"player{i % 5}",
+                score=rng.randrange(20) * 10,
+                mode=rng.choice(["walls", "pass-through"]),
+                date=datetime(2024, 1, 1) + timedelta(minutes=rng.randrange(30))
+            )
+            session.add(entry)
+            entries.append(entry)
+        session.commit()
+        return entries
+
+    def test_loaded_index_matches_sql(self, test_db_session: Session):
+        """Test that a freshly loaded index has the SQL order."""
+        self._add_entries(test_db_session, 0, 300)
+
+        index = LeaderboardIndex()
+        index.load(test_db_session)
+
+        assert index.ready
+        assert index.mismatches(test_db_session) == []
+        assert index.mismatches(test_db_session, "walls") == []
+        assert index.mismatches(test_db_session, "pass-through") == []
+
+    def test_incremental_updates_match_sql(self, test_db_session: Session):
+        """Test that entries added after loading keep the index consistent."""
+        self._add_entries(test_db_session, 0, 100)
+        index = LeaderboardIndex()
+        index.load(test_db_session)
+
+        for entry in self._add_entries(test_db_session, 100, 100):
+            index.add(entry)
+
+        assert len(index) == 200
+        assert index.mismatches(test_db_session) == []
+        assert index.mismatches(test_db_session, "walls") == []
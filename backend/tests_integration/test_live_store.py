@@ -0,0 +1,192 @@
+"""
+Integration tests for the shared live game store.
+Runs a hub and clients over a real Unix socket, and uvicorn with two workers.
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+from live_registry import LiveGameRegistry
+from live_state import CompactSnake, LiveGameState
+from live_store import GameNotFound, HubError, LocalLiveGameStore, SocketLiveGameStore, StoreUnavailable
+from live_stream import LiveGameEvents
+from models import GameMode, GameStatus
+from presence import ViewerPresence
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def _game(game_id: str, mode: GameMode = GameMode.WALLS):
+    return LiveGameState(
+        id=game_id, playerId="user_1", playerName="Player1", mode=mode, snake=CompactSnake([42, 41, 40]), food=7
+    ).to_model()
+
+
+def _local_store() -> LocalLiveGameStore:
+    return LocalLiveGameStore(LiveGameRegistry(), ViewerPresence(), LiveGameEvents())
+
+
+class TestSocketLiveGameStore:
+    """Test a hub and its clients in one event loop."""
+
+    def test_clients_share_games_and_viewers(self, tmp_path):
+        """Test that every client sees games and viewers added through any other."""
+        path = str(tmp_path / "live.sock")
+
+        async def run():
+            hub = SocketLiveGameStore(path, local=_local_store())
+            second_worker = SocketLiveGameStore(path, local=_local_store())
+            feeder = SocketLiveGameStore(path)
+            await hub.start()
+            await second_worker.start()
+            assert hub.owns_games and not second_worker.owns_games
+
+            await feeder.add_game(_game("g1"))
+            await feeder.add_game(_game("g2", GameMode.PASS_THROUGH))
+            counts = await asyncio.gather(*(
+                store.heartbeat("g1", f"viewer_{i % 5}")
+                for i, store in enumerate([hub, second_worker, feeder] * 10)
+            ))
+
+            listed = await second_worker.list_games(mode=GameMode.PASS_THROUGH, status=GameStatus.PLAYING)
+            game = await second_worker.get_game("g1")
+            state = await second_worker.get_state("g1")
+            with pytest.raises(GameNotFound):
+                await second_worker.heartbeat("missing", "viewer_0")
+            await second_worker.leave("g1", "viewer_0")
+            after_leave = await hub.get_game("g1")
+
+            for store in (feeder, second_worker, hub):
+                await store.stop()
+            return counts, listed, game, state, after_leave
+
+        counts, listed, game, state, after_leave = asyncio.run(run())
+        assert max(counts) == 5
+        assert [g.id for g in listed] == ["g2"]
+        assert game.viewers == 5
+        assert [(p.x, p.y) for p in game.snake] == [(2, 2), (1, 2), (0, 2)]
+        assert state.snake.head == 42
+        assert after_leave.viewers == 4
+
+    def test_failed_operation_gets_an_error_reply(self, tmp_path):
+        """Test that an operation failing on the hub fails that call only, not the connection."""
+        path = str(tmp_path / "live.sock")
+
+        async def run():
+            hub = SocketLiveGameStore(path, local=_local_store())
+            feeder = SocketLiveGameStore(path)
+            await hub.start()
+            await feeder.add_game(_game("g1"))
+            with pytest.raises(HubError, match="Unknown live store operation"):
+                await feeder._call("explode")
+            listed = [g.id for g in await feeder.list_games()]
+            for store in (feeder, hub):
+                await store.stop()
+            return listed, feeder.requests
+
+        listed, requests = asyncio.run(run())
+        assert listed == ["g1"]
+        assert requests == 3  # One connection served all three calls
+
+    def test_worker_takes_over_when_hub_stops(self, tmp_path):
+        """Test that a worker becomes the hub on its next call after the hub goes away."""
+        path = str(tmp_path / "live.sock")
+        promoted = []
+
+        async def run():
+            hub = SocketLiveGameStore(path, local=_local_store())
+            worker = SocketLiveGameStore(path, local=_local_store())
+            worker.on_hub = lambda: promoted.append(True)
+            feeder = SocketLiveGameStore(path)
+            await hub.start()
+            await worker.start()
+            await feeder.add_game(_game("g1"))
+            assert [g.id for g in await worker.list_games()] == ["g1"]
+
+            await hub.stop()
+            games_after = await worker.list_games()
+            await feeder.add_game(_game("g2"))
+            owns = worker.owns_games
+            games_later = [g.id for g in await worker.list_games()]
+
+            await worker.stop()
+            with pytest.raises(StoreUnavailable):
+                await feeder.list_games()
+            await feeder.stop()
+            return games_after, owns, games_later
+
+        games_after, owns, games_later = asyncio.run(run())
+        # The new hub starts empty
+        assert games_after == []
+        assert owns and promoted == [True]
+        assert games_later == ["g2"]
+
+
+class TestMultipleWorkers:
+    """Test uvicorn --workers 2 with LIVE_STORE=socket."""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        env = dict(
+            os.environ, DATABASE_URL=f"sqlite:///{tmp_path}/workers.db", LIVE_ENGINE="0", LEADERBOARD_INDEX="0",
+            PASSWORD_HASH_WORKERS="0", LIVE_STORE="socket", LIVE_STORE_SOCKET=str(tmp_path / "live.sock"),
+        )
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", "2", "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env,
+        )
+        try:
+            # Ready once both workers have answered: the hub and the other one
+            hubs = set()
+            deadline = time.monotonic() + 30
+            while hubs != {True, False}:
+                if process.poll() is not None:
+                    pytest.fail(f"uvicorn exited with code {process.returncode} during startup")
+                if time.monotonic() > deadline:
+                    pytest.fail(f"Both workers did not answer within 30 s (hub flags seen: {hubs})")
+                try:
+                    # A new connection each time, so requests land on either worker
+                    hubs.add(httpx.get(f"http://127.0.0.1:{port}/metrics").json()["live_store"]["hub"])
+                except httpx.TransportError:
+                    time.sleep(0.2)
+            yield f"http://127.0.0.1:{port}", str(tmp_path / "live.sock")
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    def test_workers_agree_on_games_and_viewers(self, server):
+        """Test that requests spread over both workers see the same games and viewer counts."""
+        base_url, socket_path = server
+
+        async def run():
+            feeder = SocketLiveGameStore(socket_path)
+            await feeder.add_game(_game("shared"))
+            await feeder.stop()
+
+            hubs, counts, listed = set(), [], []
+            # No keep-alive, so requests land on either worker
+            limits = httpx.Limits(max_keepalive_connections=0)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+                for i in range(40):
+                    hubs.add((await client.get("/metrics")).json()["live_store"]["hub"])
+                    res = await client.post("/live-games/shared/heartbeat", json={"viewerId": f"viewer_{i % 10}"})
+                    counts.append(res.json()["viewers"])
+                    listed.append([g["id"] for g in (await client.get("/live-games")).json()])
+                game = (await client.get("/live-games/shared")).json()
+            return hubs, counts, listed, game
+
+        hubs, counts, listed, game = asyncio.run(run())
+        assert hubs == {True, False}
+        assert counts == sorted(counts) and counts[-1] == 10
+        assert all(ids == ["shared"] for ids in listed)
+        assert game["viewers"] == 10
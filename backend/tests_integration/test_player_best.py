@@ -0,0 +1,62 @@
+"""
+Integration tests for the player_best projection.
+Verifies that upserts keep each player's best entry per mode and overall.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+import player_best
+import sql_models
+from leaderboard_index import IndexedEntry
+
+
+def _entry(i: int, user_id: str, score: int, mode: str, minutes: int = 0) -> IndexedEntry:
+    return IndexedEntry(f"score_{i:04d}", user_id, user_id, None, score, mode, datetime(2024, 1, 1) + timedelta(minutes=minutes))
+
+
+def _projection(session: Session):
+    return {
+        (row.userId, row.scope): (row.id, row.score, row.mode)
+        for row in session.query(sql_models.PlayerBest)
+    }
+
+
+class TestPlayerBest:
+    """Test upserts into the per-player best projection."""
+
+    def test_upsert_keeps_best_per_scope(self, test_db_session: Session):
+        """Test that only higher scores replace a player's best."""
+        player_best.upsert(test_db_session, [_entry(1, "user_a", 100, "walls"), _entry(2, "user_a", 300, "pass-through")])
+        player_best.upsert(test_db_session, [_entry(3, "user_a", 200, "walls"), _entry(4, "user_a", 50, "pass-through")])
+        # Equal score later on: the earlier entry stays
+        player_best.upsert(test_db_session, [_entry(5, "user_a", 300, "walls", minutes=5)])
+        test_db_session.commit()
+
+        assert _projection(test_db_session) == {
+            ("user_a", "walls"): ("score_0005", 300, "walls"),
+            ("user_a", "pass-through"): ("score_0002", 300, "pass-through"),
+            ("user_a", "all"): ("score_0002", 300, "pass-through"),
+        }
+
+    def test_incremental_upserts_match_rebuild(self, test_db_session: Session):
+        """Test that maintaining the projection per write equals recomputing it."""
+        rng = random.Random(3)
+        for batch in range(10):
+            entries = [
+                _entry(batch * 50 + i, f"user_{rng.randrange(8)}", rng.randrange(30) * 10,
+                       rng.choice(["walls", "pass-through"]), minutes=rng.randrange(60))
+                for i in range(50)
+            ]
+            for e in entries:
+                test_db_session.add(sql_models.LeaderboardEntry(rank=0, **e._asdict()))
+            player_best.upsert(test_db_session, entries)
+        test_db_session.commit()
+        incremental = _projection(test_db_session)
+
+        assert not player_best.needs_backfill(test_db_session)
+        player_best.rebuild(test_db_session)
+        test_db_session.commit()
+        assert _projection(test_db_session) == incremental
@@ -0,0 +1,105 @@
+"""
+Integration tests for the write-behind score buffer.
+Verifies that buffered scores reach the database and stay visible meanwhile.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import sql_models
+from db_setup import Base
+from leaderboard_index import IndexedEntry
+from score_buffer import ScoreBuffer, merge_pending
+
+
+def _entry(i: int, user_id: str, score: int, mode: str = "walls") -> IndexedEntry:
+    return IndexedEntry(f"score_{i}", user_id, user_id, None, score, mode, datetime(2024, 1, 1) + timedelta(seconds=i))
+
+
+class TestScoreBuffer:
+    """Test flushing and read-side merging of buffered scores."""
+
+    @pytest.fixture
+    def buffer(self, test_db_engine, test_db_session: Session):
+        for user_id, high_score in (("user_a", 50), ("user_b", 500)):
+            test_db_session.add(sql_models.User(
+                id=user_id, username=user_id, email=f"{user_id}@game.com",
+                hashed_password="x", highScore=high_score, gamesPlayed=1
+            ))
+        test_db_session.commit()
+        return ScoreBuffer(sessionmaker(bind=test_db_engine), batch_size=3)
+
+    def test_flush_writes_rows_and_aggregated_user_update(self, buffer: ScoreBuffer, test_db_session: Session):
+        """Test that a flush inserts the batch and updates each user once."""
+        flushed_users = []
+        buffer.on_flush = flushed_users.extend
+        for i, (user_id, score) in enumerate([("user_a", 100), ("user_a", 70), ("user_b", 300), ("user_b", 10)]):
+            buffer.add(_entry(i, user_id, score))
+
+        assert buffer.pending_totals("user_a") == (2, 100)
+        assert buffer.flush() == 3  # batch_size
+        assert buffer.pending_totals("user_a") == (0, 0)
+        assert buffer.pending_totals("user_b") == (1, 10)
+        buffer.flush_all()
+        assert len(buffer) == 0
+
+        test_db_session.expire_all()
+        assert test_db_session.query(sql_models.LeaderboardEntry).count() == 4
+        user_a = test_db_session.get(sql_models.User, "user_a")
+        user_b = test_db_session.get(sql_models.User, "user_b")
+        assert (user_a.highScore, user_a.gamesPlayed) == (100, 3)
+        assert (user_b.highScore, user_b.gamesPlayed) == (500, 3)
+        assert sorted(flushed_users) == ["user_a", "user_b", "user_b"]
+        assert buffer.stats()["flushed"] == 4
+
+    def test_bad_row_is_dropped_without_blocking_the_queue(self, buffer: ScoreBuffer, test_db_session: Session):
+        """Test that a row the database rejects is dead-lettered and the rest are written."""
+        buffer.add(_entry(0, "user_a", 2**70))  # Too large for an INTEGER column
+        buffer.add(_entry(1, "user_a", 100))
+        buffer.add(_entry(2, "user_b", 600))
+
+        assert buffer.flush() == 3
+        assert len(buffer) == 0
+        assert [e.id for e, _ in buffer.dead_letters] == ["score_0"]
+        assert buffer.stats()["dropped"] == 1
+        assert buffer.stats()["flushed"] == 2
+
+        test_db_session.expire_all()
+        assert test_db_session.query(sql_models.LeaderboardEntry).count() == 2
+        user_a = test_db_session.get(sql_models.User, "user_a")
+        assert (user_a.highScore, user_a.gamesPlayed) == (100, 2)
+
+    def test_merge_pending_orders_and_deduplicates(self, buffer: ScoreBuffer):
+        """Test that unflushed scores are merged into a page in leaderboard order."""
+        flushed = [_entry(0, "user_a", 300), _entry(1, "user_a", 100)]
+        for entry in [flushed[1], _entry(2, "user_b", 200), _entry(3, "user_b", 50, "pass-through")]:
+            buffer.add(entry)
+
+        merged = merge_pending(flushed, buffer.pending("walls"), limit=3)
+        assert [e.id for e in merged] == ["score_0", "score_2", "score_1"]
+
+        after = (-200, datetime(2024, 1, 1, 0, 0, 2), "score_2")
+        assert [e.id for e in merge_pending([], buffer.pending(), after)] == ["score_1", "score_3"]
+
+    def test_stop_flushes_everything(self, tmp_path):
+        """Test that a graceful shutdown commits scores accepted since the last flush."""
+        # Flushes run on a worker thread, which an in-memory database would not share
+        engine = create_engine(f"sqlite:///{tmp_path}/buffer.db")
+        Base.metadata.create_all(bind=engine)
+        buffer = ScoreBuffer(sessionmaker(bind=engine), flush_interval=60)
+
+        async def run():
+            buffer.start()
+            for i in range(5):
+                buffer.add(_entry(i, "user_a", i * 10))
+            await buffer.stop()
+
+        asyncio.run(run())
+        assert len(buffer) == 0
+        with Session(engine) as db:
+            assert db.query(sql_models.LeaderboardEntry).count() == 5
+        engine.dispose()
@@ -0,0 +1,158 @@
+"""
+Maintained rank structure over ``users.highScore``.
+
+A user's rank is 1 + the number of users with a strictly higher high score.
+``exact`` mode keeps every user in an indexable skip list so a rank lookup is
+O(log n), plus each user's current score so an update always moves the
+user's own key. ``approximate`` mode keeps only a log-bucketed score histogram
+behind a Fenwick tree: memory stays constant however many users there are,
+and ranks are interpolated within a bucket.
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy.orm import Session
+
+import sql_models
+from leaderboard_index import IndexableSkipList
+
+EXACT = "exact"
+APPROXIMATE = "approximate"
+
+
+class FenwickTree:
+    """Prefix sums over a fixed number of counters."""
+
+    def __init__(self, size: int):
+        self._tree: List[int] = [0] * (size + 1)
+
+    def __len__(self) -> int:
+        return len(self._tree) - 1
+
+    def add(self, index: int, delta: int):
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index: int) -> int:
+        """Sum of counters ``0 .. index - 1``."""
+        total, i = 0, index
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+class ScoreHistogram:
+    """
+    Counts scores in geometrically growing buckets.
+
+    Bucket 0 holds score 0; bucket ``b`` covers ``[growth**(b-1), growth**b)``,
+    so the relative error of an interpolated rank is bounded by ``growth - 1``.
+    """
+
+    def __init__(self, growth: float = 1.05, max_score: int = 10**9):
+        self._log_growth = math.log(growth)
+        self._growth = growth
+        self._counts = FenwickTree(self._bucket(max_score) + 2)
+        self._per_bucket: Dict[int, int] = {}
+        self.total = 0
+
+    def _bucket(self, score: int) -> int:
+        if score <= 0:
+            return 0
+        return 1 + int(math.log(score) / self._log_growth)
+
+    def _bucket_bounds(self, bucket: int) -> Tuple[float, float]:
+        if bucket == 0:
+            return 0.0, 1.0
+        return self._growth ** (bucket - 1), self._growth ** bucket
+
+    def add(self, score: int, delta: int = 1):
+        bucket = min(self._bucket(score), len(self._counts) - 1)
+        self._counts.add(bucket, delta)
+        self._per_bucket[bucket] = self._per_bucket.get(bucket, 0) + delta
+        self.total += delta
+
+    def count_above(self, score: int) -> float:
+        """Estimated number of scores strictly greater than ``score``."""
+        bucket = min(self._bucket(score), len(self._counts) - 1)
+        above = self.total - self._counts.prefix_sum(bucket + 1)
+        low, high = self._bucket_bounds(bucket)
+        fraction = max(0.0, (high - score - 1) / (high - low)) if high > low else 0.0
+        return above + self._per_bucket.get(bucket, 0) * min(fraction, 1.0)
+
+
+class UserRankIndex:
+    def __init__(self, mode: str = EXACT):
+        if mode not in (EXACT, APPROXIMATE):
+            raise ValueError(f"Unknown user rank mode: {mode}")
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._users = IndexableSkipList()
+        # Exact mode only: the score each user is filed under in _users
+        self._scores: Dict[str, int] = {}
+        self._histogram = ScoreHistogram()
+        self.ready = False
+
+    def load(self, db: Session):
+        rows = db.query(sql_models.User.id, sql_models.User.highScore)
+        self.load_scores((row.id, row.highScore or 0) for row in rows)
+
+    def load_scores(self, scores: Iterable[Tuple[str, int]]):
+        with self._lock:
+            if self.mode == EXACT:
+                self._scores = dict(scores)
+                self._users.bulk_load(sorted(((-score, user_id), None) for user_id, score in self._scores.items()))
+            else:
+                self._histogram = ScoreHistogram()
+                for _, score in scores:
+                    self._histogram.add(score)
+            self.ready = True
+
+    def add_user(self, user_id: str, score: int = 0):
+        with self._lock:
+            if self.mode == EXACT:
+                if user_id in self._scores:
+                    return
+                self._scores[user_id] = score
+                self._users.insert((-score, user_id))
+            else:
+                self._histogram.add(score)
+
+    def update(self, user_id: str, old_score: int, new_score: int):
+        """
+        Raise a user's high score to ``new_score``.
+
+        Only approximate mode, which keeps nothing per user, relies on
+        ``old_score``. Exact mode moves the key it holds for the user, so a
+        stale ``old_score`` (e.g. from a cached user row) cannot file the user
+        twice, and a lower ``new_score`` than the one held is ignored.
+        """
+        if old_score == new_score:
+            return
+        with self._lock:
+            if self.mode == EXACT:
+                current = self._scores.get(user_id)
+                if current is not None and current >= new_score:
+                    return
+                if current is not None:
+                    self._users.remove((-current, user_id))
+                self._scores[user_id] = new_score
+                self._users.insert((-new_score, user_id))
+            else:
+                self._histogram.add(old_score, -1)
+                self._histogram.add(new_score)
+
+    def rank(self, score: int) -> int:
+        with self._lock:
+            if self.mode == EXACT:
+                # (-score,) sorts before every (-score, user_id) key
+                return self._users.bisect_left((-score,)) + 1
+            return int(round(self._histogram.count_above(score))) + 1
+
+    def __len__(self) -> int:
+        return len(self._users) if self.mode == EXACT else self._histogram.total
@@ -1,7 +1,14 @@
 import httpx
 import sys
 import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import tempfile
 import time
+from datetime import datetime
 
 def verify_api(host: str, port: int):
     base_url = f"http://{host}:{port}"
@@ -62,10 +69,282 @@ def verify_api(host: str, port: int):
             print(f"\nAN UNEXPECTED ERROR OCCURRED: {str(e)}")
             sys.exit(1)
 
+# --- Load test ---
+
+# Relative weights of each operation; see parse_mix()
+DEFAULT_MIX = "leaderboard=50,live_games=25,submit=15,login=7,signup=3"
+PASSWORD = "password123"
+REPLAY_VECTORS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "specs", "replay-vectors.json")
+
+
+def load_replay_games():
+    """Games with replays that pass server-side verification; empty if the vectors are not available."""
+    try:
+        with open(REPLAY_VECTORS) as f:
+            return json.load(f)["games"]
+    except FileNotFoundError:
+        return []
+
+
+REPLAY_GAMES = load_replay_games()
+
+
+def parse_mix(mix: str):
+    """``"leaderboard=50,submit=15"`` -> ``{"leaderboard": 50.0, "submit": 15.0}``."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in LoadTest.OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}; choose from {', '.join(LoadTest.OPERATIONS)}")
+        try:
+            weights[name] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"weight of {name!r} must be a number, not {weight!r}") from None
+        if weights[name] < 0:
+            raise argparse.ArgumentTypeError(f"weight of {name!r} must not be negative")
+    return weights
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+class LoadTest:
+    """Closed-loop workers issuing a weighted mix of requests; latencies and errors are kept per endpoint."""
+
+    OPERATIONS = {
+        "signup": "POST /auth/signup",
+        "login": "POST /auth/login",
+        "leaderboard": "GET /leaderboard",
+        "submit": "POST /leaderboard/submit",
+        "live_games": "GET /live-games",
+    }
+    # Operations that need an account signed up by this run
+    NEEDS_ACCOUNT = {"login", "submit"}
+
+    def __init__(self, client: httpx.AsyncClient, mix, seed: int = 1):
+        self.client = client
+        self.mix = mix
+        self.rng = random.Random(seed)
+        # Accounts created by this run: (email, token)
+        self.users = []
+        self.run_id = f"{int(time.time())}{self.rng.randrange(16 ** 4):04x}"
+        self.latencies = {name: [] for name in mix}
+        self.errors = {name: 0 for name in mix}
+        self.statuses = {name: {} for name in mix}
+
+    async def setup(self, users: int):
+        """Sign up the accounts that login and submit use; not timed."""
+        for _ in range(users):
+            res = await self._signup()
+            res.raise_for_status()
+
+    async def run(self, concurrency: int, duration: float) -> float:
+        deadline = time.monotonic() + duration
+        weighted = [name for name, weight in self.mix.items() if weight > 0]
+        anonymous = [name for name in weighted if name not in self.NEEDS_ACCOUNT]
+
+        async def worker():
+            while time.monotonic() < deadline:
+                # Until some signup has finished, only operations without an account
+                names = weighted if self._signed_up() else anonymous
+                if not names:
+                    break
+                name = self.rng.choices(names, [self.mix[n] for n in names])[0]
+                start = time.perf_counter()
+                try:
+                    res = await getattr(self, f"_{name}")()
+                    status = str(res.status_code)
+                    failed = res.status_code >= 400
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                    failed = True
+                self.latencies[name].append(time.perf_counter() - start)
+                self.errors[name] += failed
+                self.statuses[name][status] = self.statuses[name].get(status, 0) + 1
+
+        start = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.monotonic() - start
+
+    def _signed_up(self) -> bool:
+        return any(token for _, token in self.users)
+
+    async def _signup(self) -> httpx.Response:
+        n = len(self.users)
+        email = f"load_{self.run_id}_{n}@load.com"
+        # Claimed before the request, so concurrent signups never reuse a name
+        self.users.append((email, None))
+        res = await self.client.post(
+            "/auth/signup", json={"username": f"load_{self.run_id}_{n}", "email": email, "password": PASSWORD}
+        )
+        if res.status_code == 200:
+            self.users[n] = (email, res.json()["token"])
+        return res
+
+    async def _login(self) -> httpx.Response:
+        # Only accounts whose signup has finished
+        n = self.rng.choice([i for i, (_, token) in enumerate(self.users) if token])
+        email, _ = self.users[n]
+        res = await self.client.post("/auth/login", json={"email": email, "password": PASSWORD})
+        if res.status_code == 200:
+            self.users[n] = (email, res.json()["token"])
+        return res
+
+    async def _leaderboard(self) -> httpx.Response:
+        mode = self.rng.choice([None, "walls", "pass-through"])
+        return await self.client.get("/leaderboard", params={"mode": mode} if mode else None)
+
+    async def _submit(self) -> httpx.Response:
+        token = self.rng.choice([token for _, token in self.users if token])
+        if REPLAY_GAMES:
+            # The server requires a replay that backs up the score by default
+            game = self.rng.choice(REPLAY_GAMES)
+            replay = {"seed": game["seed"], "moves": game["moves"], "durationMs": 200 * len(game["moves"])}
+            body = {"score": game["score"], "mode": game["mode"], "replay": replay}
+        else:
+            body = {"score": self.rng.randrange(0, 500, 10), "mode": self.rng.choice(["walls", "pass-through"])}
+        return await self.client.post("/leaderboard/submit", json=body, headers={"Authorization": f"Bearer {token}"})
+
+    async def _live_games(self) -> httpx.Response:
+        return await self.client.get("/live-games")
+
+    def results(self, elapsed: float):
+        endpoints = {}
+        for name, samples in self.latencies.items():
+            if not samples:
+                continue
+            endpoints[self.OPERATIONS[name]] = {
+                "requests": len(samples),
+                "rps": len(samples) / elapsed,
+                "p50_ms": percentile(samples, 0.5) * 1000,
+                "p95_ms": percentile(samples, 0.95) * 1000,
+                "p99_ms": percentile(samples, 0.99) * 1000,
+                "max_ms": max(samples) * 1000,
+                "errors": self.errors[name],
+                "error_rate": self.errors[name] / len(samples),
+                "statuses": self.statuses[name],
+            }
+        samples = [t for ts in self.latencies.values() for t in ts]
+        errors = sum(self.errors.values())
+        total = {
+            "requests": len(samples),
+            "rps": len(samples) / elapsed,
+            "p50_ms": percentile(samples, 0.5) * 1000 if samples else None,
+            "p95_ms": percentile(samples, 0.95) * 1000 if samples else None,
+            "p99_ms": percentile(samples, 0.99) * 1000 if samples else None,
+            "errors": errors,
+            "error_rate": errors / len(samples) if samples else 0.0,
+        }
+        return {"elapsed_s": elapsed, "endpoints": endpoints, "total": total}
+
+
+def print_results(results, baseline=None):
+    print(f"\n{'endpoint':<26} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    rows = dict(results["endpoints"], total=results["total"])
+    for name, r in rows.items():
+        print(
+            f"{name:<26} {r['requests']:>9} {r['rps']:>8.1f} {r['p50_ms'] or 0:>8.1f} {r['p95_ms'] or 0:>8.1f} "
+            f"{r['p99_ms'] or 0:>8.1f} {r['error_rate']:>7.1%}"
+        )
+        failed = {code: n for code, n in r.get("statuses", {}).items() if not code.startswith(("2", "3"))}
+        if failed:
+            print(f"{'':<26} failures by status: {failed}")
+
+    if baseline:
+        print(f"\nCompared with {baseline['started_at']}:")
+        before = dict(baseline["results"]["endpoints"], total=baseline["results"]["total"])
+        for name, r in rows.items():
+            if name in before and before[name]["rps"] and before[name]["p99_ms"]:
+                b = before[name]
+                print(
+                    f"{name:<26} req/s {r['rps'] / b['rps'] - 1:>+7.1%}  p99 {r['p99_ms'] / b['p99_ms'] - 1:>+7.1%}  "
+                    f"errors {b['error_rate']:.1%} -> {r['error_rate']:.1%}"
+                )
+
+
+def start_server(port: int, database_url: str) -> subprocess.Popen:
+    """uvicorn in a subprocess; other settings come from this process's environment."""
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=dict(os.environ, DATABASE_URL=database_url),
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/leaderboard")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+async def load_test(args):
+    base_url = f"http://{args.host}:{args.port}"
+    started_at = datetime.now().isoformat(timespec="seconds")
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_server(args.port, f"sqlite:///{tmp}/load.db") if args.serve else None
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+                if server:
+                    await wait_until_ready(client)
+                print(f"Load testing {base_url}: {args.concurrency} clients for {args.duration:g} s, mix {args.mix}")
+                run = LoadTest(client, parse_mix(args.mix), seed=args.seed)
+                await run.setup(args.users)
+                elapsed = await run.run(args.concurrency, args.duration)
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    skipped = [name for name in run.mix if name in LoadTest.NEEDS_ACCOUNT and not run.latencies[name]]
+    if skipped and not run._signed_up():
+        print(f"Skipped {', '.join(skipped)}: no account was signed up")
+    results = run.results(elapsed)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.output:
+        config = {k: getattr(args, k) for k in ("host", "port", "concurrency", "duration", "mix", "users", "seed", "serve")}
+        with open(args.output, "w") as f:
+            json.dump({"started_at": started_at, "config": config, "results": results}, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Verify a running Snake Arena backend.")
     parser.add_argument("--host", default="127.0.0.1", help="Server host (default: 127.0.0.1)")
     parser.add_argument("--port", type=int, default=8081, help="Server port (default: 8081)")
-    
+
+    load = parser.add_argument_group("load test")
+    load.add_argument("--load", action="store_true", help="Generate load instead of checking each endpoint once")
+    load.add_argument("--concurrency", type=int, default=20, help="Concurrent clients (default: 20)")
+    load.add_argument("--duration", type=float, default=30.0, help="Seconds of load (default: 30)")
+    load.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted operations (default: {DEFAULT_MIX})")
+    load.add_argument("--users", type=int, default=10, help="Accounts signed up before the load starts (default: 10)")
+    load.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds (default: 30)")
+    load.add_argument("--seed", type=int, default=1, help="Seed for the request mix (default: 1)")
+    load.add_argument("--serve", action="store_true", help="Start uvicorn on --port with a fresh SQLite database first")
+    load.add_argument("--output", help="Save the results as JSON to this file")
+    load.add_argument("--baseline", help="Results JSON of an earlier run to compare with")
+
     args = parser.parse_args()
-    verify_api(args.host, args.port)
+    if args.load:
+        try:
+            parse_mix(args.mix)
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+        asyncio.run(load_test(args))
+    else:
+        verify_api(args.host, args.port)
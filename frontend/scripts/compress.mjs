@@ -0,0 +1,39 @@
+// Writes .br and .gz copies next to the compressible files of a build, so the
+// backend can serve them without compressing on every request.
+// Usage: node scripts/compress.mjs [dist]
+
+import { readdirSync, readFileSync, writeFileSync } from 'node:fs';
+import { extname, join } from 'node:path';
+import { brotliCompressSync, constants, gzipSync } from 'node:zlib';
+
+const COMPRESSIBLE = new Set(['.html', '.js', '.mjs', '.css', '.json', '.svg', '.txt', '.xml', '.map', '.ico', '.webmanifest']);
+// Below this the headers outweigh the savings
+const MIN_BYTES = 1024;
+
+function* walk(dir) {
+  for (const entry of readdirSync(dir, { withFileTypes: true })) {
+    const path = join(dir, entry.name);
+    if (entry.isDirectory()) yield* walk(path);
+    else if (COMPRESSIBLE.has(extname(entry.name))) yield path;
+  }
+}
+
+let original = 0;
+let brotli = 0;
+for (const path of walk(process.argv[2] ?? 'dist')) {
+  const data = readFileSync(path);
+  if (data.length < MIN_BYTES) continue;
+  const br = brotliCompressSync(data, {
+    params: {
+      [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+      [constants.BROTLI_PARAM_SIZE_HINT]: data.length,
+    },
+  });
+  const gz = gzipSync(data, { level: 9 });
+  // Only keep encodings that are actually smaller
+  if (br.length < data.length) writeFileSync(`${path}.br`, br);
+  if (gz.length < data.length) writeFileSync(`${path}.gz`, gz);
+  original += data.length;
+  brotli += Math.min(br.length, data.length);
+}
+console.log(`compressed ${(original / 1024).toFixed(0)} KiB to ${(brotli / 1024).toFixed(0)} KiB (brotli)`);
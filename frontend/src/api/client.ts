@@ -5,7 +5,8 @@ import {
   AuthResponse,
   LeaderboardEntry,
   LiveGame,
-  GameMode
+  GameMode,
+  Replay
 } from '@/types/game';
 
 const API_BASE_URL = '';
@@ -15,6 +16,9 @@ const STORAGE_KEY = 'snake_game_auth';
 let currentUser: User | null = null;
 let authToken: string | null = null;
 
+// Identifies this tab to the viewer presence endpoints
+const viewerId = crypto.randomUUID();
+
 // Initialize from localStorage
 const initFromStorage = () => {
   try {
@@ -154,7 +158,7 @@ export const apiClient = {
     return handleResponse<LeaderboardEntry[]>(response);
   },
 
-  async submitScore(score: number, mode: GameMode): Promise<LeaderboardEntry | null> {
+  async submitScore(score: number, mode: GameMode, replay?: Replay): Promise<LeaderboardEntry | null> {
     if (!authToken) return null;
 
     const response = await fetch(getUrl('leaderboard/submit'), {
@@ -163,7 +167,7 @@ export const apiClient = {
         'Content-Type': 'application/json',
         'Authorization': `Bearer ${authToken}`,
       },
-      body: JSON.stringify({ score, mode }),
+      body: JSON.stringify({ score, mode, replay }),
     });
 
     return handleResponse<LeaderboardEntry>(response);
@@ -190,6 +194,24 @@ export const apiClient = {
     try {
       const response = await fetch(getUrl(`live-games/${gameId}/join`), {
         method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ viewerId }),
+      });
+      return response.ok;
+    } catch {
+      return false;
+    }
+  },
+
+  /**
+   * Keep this tab counted as a viewer; send more often than the server's ttl
+   */
+  async sendViewerHeartbeat(gameId: string): Promise<boolean> {
+    try {
+      const response = await fetch(getUrl(`live-games/${gameId}/heartbeat`), {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ viewerId }),
       });
       return response.ok;
     } catch {
@@ -201,6 +223,8 @@ export const apiClient = {
     try {
       await fetch(getUrl(`live-games/${gameId}/leave`), {
         method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ viewerId }),
       });
     } catch {
       // Ignore errors on leave
@@ -3,7 +3,7 @@ import { GameCanvas } from './GameCanvas';
 import { GameControls } from './GameControls';
 import { GameOverlay } from './GameOverlay';
 import { MobileControls } from './MobileControls';
-import { useGameLogic } from '@/hooks/useGameLogic';
+import { toReplay, useGameLogic } from '@/hooks/useGameLogic';
 import { useAuth } from '@/context/AuthContext';
 import { apiClient } from '@/api/client';
 import { toast } from 'sonner';
@@ -22,7 +22,7 @@ export function SnakeGame() {
 
       if (gameState.score > 0) {
         if (isAuthenticated) {
-          apiClient.submitScore(gameState.score, gameState.mode).then((entry) => {
+          apiClient.submitScore(gameState.score, gameState.mode, toReplay(gameState)).then((entry) => {
             if (entry) {
               toast.success(`Score submitted: ${gameState.score}`, {
                 description: 'Check the leaderboard to see your ranking!',
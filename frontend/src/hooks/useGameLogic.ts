@@ -1,11 +1,13 @@
 import { useState, useCallback, useEffect, useRef } from 'react';
-import { GameState, Direction, Position, GameMode, GameStatus } from '@/types/game';
+import { GameState, Direction, Position, GameMode, GameStatus, Replay } from '@/types/game';
 import { audioService } from '@/utils/audio';
+import { foodRandom, randomSeed } from '@/lib/random';
 
 const GRID_SIZE = 20;
 const INITIAL_SPEED = 150;
 const SPEED_INCREMENT = 5;
 const MIN_SPEED = 50;
+const FOOD_SCORE = 10;
 
 const OPPOSITE_DIRECTIONS: Record<Direction, Direction> = {
   UP: 'DOWN',
@@ -21,27 +23,38 @@ const DIRECTION_VECTORS: Record<Direction, Position> = {
   RIGHT: { x: 1, y: 0 },
 };
 
-export const createInitialState = (mode: GameMode): GameState => ({
+// How each tick's direction is recorded in a replay
+const MOVE_LETTERS: Record<Direction, string> = {
+  UP: 'U',
+  DOWN: 'D',
+  LEFT: 'L',
+  RIGHT: 'R',
+};
+
+export const createInitialState = (mode: GameMode, seed: number = randomSeed()): GameState => ({
   snake: [
     { x: 10, y: 10 },
     { x: 9, y: 10 },
     { x: 8, y: 10 },
   ],
-  food: generateFood([{ x: 10, y: 10 }, { x: 9, y: 10 }, { x: 8, y: 10 }]),
+  food: generateFood([{ x: 10, y: 10 }, { x: 9, y: 10 }, { x: 8, y: 10 }], foodRandom(seed, 0)),
   direction: 'RIGHT',
   nextDirection: 'RIGHT',
   score: 0,
   status: 'idle',
   mode,
   speed: INITIAL_SPEED,
+  seed,
+  moves: '',
+  startedAt: 0,
 });
 
-export function generateFood(snake: Position[]): Position {
+export function generateFood(snake: Position[], random: () => number = Math.random): Position {
   let food: Position;
   do {
     food = {
-      x: Math.floor(Math.random() * GRID_SIZE),
-      y: Math.floor(Math.random() * GRID_SIZE),
+      x: Math.floor(random() * GRID_SIZE),
+      y: Math.floor(random() * GRID_SIZE),
     };
   } while (snake.some(segment => segment.x === food.x && segment.y === food.y));
   return food;
@@ -88,6 +101,37 @@ export function isValidDirectionChange(current: Direction, next: Direction): boo
   return next !== OPPOSITE_DIRECTIONS[current];
 }
 
+/**
+ * One game tick: move in `nextDirection`, eating and placing the next food, and
+ * record the move. The server replays games with the same rules (replay_verifier.py).
+ */
+export function advanceGame(prev: GameState): GameState {
+  const moves = prev.moves + MOVE_LETTERS[prev.nextDirection];
+  const { newSnake, ate, collision } = moveSnake(prev.snake, prev.nextDirection, prev.mode, prev.food);
+
+  if (collision) {
+    return { ...prev, moves, status: 'game-over' };
+  }
+
+  const newScore = ate ? prev.score + FOOD_SCORE : prev.score;
+  const newSpeed = ate ? Math.max(MIN_SPEED, prev.speed - SPEED_INCREMENT) : prev.speed;
+  const newFood = ate ? generateFood(newSnake, foodRandom(prev.seed, newScore / FOOD_SCORE)) : prev.food;
+
+  return {
+    ...prev,
+    snake: newSnake,
+    food: newFood,
+    direction: prev.nextDirection,
+    moves,
+    score: newScore,
+    speed: newSpeed,
+  };
+}
+
+export function toReplay(state: GameState): Replay {
+  return { seed: state.seed, moves: state.moves, durationMs: Math.max(0, Date.now() - state.startedAt) };
+}
+
 export function useGameLogic(initialMode: GameMode = 'pass-through') {
   const [gameState, setGameState] = useState<GameState>(() => createInitialState(initialMode));
   const gameLoopRef = useRef<number | null>(null);
@@ -97,6 +141,7 @@ export function useGameLogic(initialMode: GameMode = 'pass-through') {
     setGameState(prev => ({
       ...createInitialState(prev.mode),
       status: 'playing',
+      startedAt: Date.now(),
     }));
   }, []);
 
@@ -134,34 +179,13 @@ export function useGameLogic(initialMode: GameMode = 'pass-through') {
       }
       lastUpdateRef.current = timestamp;
 
-      const { newSnake, ate, collision } = moveSnake(
-        prev.snake,
-        prev.nextDirection,
-        prev.mode,
-        prev.food
-      );
-
-      if (collision) {
+      const next = advanceGame(prev);
+      if (next.status === 'game-over') {
         audioService.playGameOverSound();
-        return { ...prev, status: 'game-over' };
-      }
-
-      if (ate) {
+      } else if (next.score > prev.score) {
         audioService.playEatSound();
       }
-
-      const newScore = ate ? prev.score + 10 : prev.score;
-      const newSpeed = ate ? Math.max(MIN_SPEED, prev.speed - SPEED_INCREMENT) : prev.speed;
-      const newFood = ate ? generateFood(newSnake) : prev.food;
-
-      return {
-        ...prev,
-        snake: newSnake,
-        food: newFood,
-        direction: prev.nextDirection,
-        score: newScore,
-        speed: newSpeed,
-      };
+      return next;
     });
 
     gameLoopRef.current = requestAnimationFrame(gameLoop);
@@ -5,6 +5,8 @@ import { generateFood } from './useGameLogic';
 
 const GRID_SIZE = 20;
 const AI_MOVE_INTERVAL = 120;
+// Well inside the server's VIEWER_TTL (30s by default)
+const VIEWER_HEARTBEAT_INTERVAL = 10_000;
 
 const DIRECTION_VECTORS: Record<Direction, Position> = {
   UP: { x: 0, y: -1 },
@@ -90,7 +92,15 @@ export function useSpectatorGame(gameId: string | null) {
       loadGame(gameId);
     }
 
+    // Viewers who stop sending heartbeats (e.g. a closed tab) expire on the server
+    const heartbeat = gameId
+      ? window.setInterval(() => apiClient.sendViewerHeartbeat(gameId), VIEWER_HEARTBEAT_INTERVAL)
+      : null;
+
     return () => {
+      if (heartbeat !== null) {
+        window.clearInterval(heartbeat);
+      }
       if (gameId) {
         apiClient.leaveAsViewer(gameId);
       }
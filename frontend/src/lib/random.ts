@@ -0,0 +1,25 @@
+// Seeded randomness for food placement, so a game can be replayed from its seed.
+
+/** Mulberry32: a small, fast 32-bit PRNG returning floats in [0, 1). */
+export function mulberry32(seed: number): () => number {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+/**
+ * Generator for the food placed after `foodsEaten` foods (0 for the first one).
+ * Each food gets a fresh stream, so the game state needs no mutable PRNG.
+ */
+export function foodRandom(seed: number, foodsEaten: number): () => number {
+  return mulberry32((seed + Math.imul(foodsEaten, 0x9e3779b9)) >>> 0);
+}
+
+export function randomSeed(): number {
+  return crypto.getRandomValues(new Uint32Array(1))[0];
+}
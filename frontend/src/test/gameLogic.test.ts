@@ -5,6 +5,7 @@ import {
   moveSnake, 
   isValidDirectionChange 
 } from '@/hooks/useGameLogic';
+import { foodRandom } from '@/lib/random';
 import { Position, Direction, GameMode } from '@/types/game';
 
 describe('Game Logic', () => {
@@ -62,6 +63,13 @@ describe('Game Logic', () => {
         expect(food.y).toBeLessThan(20);
       }
     });
+
+    it('should place the same food for the same seed', () => {
+      const snake: Position[] = [{ x: 10, y: 10 }];
+
+      expect(generateFood(snake, foodRandom(42, 3))).toEqual(generateFood(snake, foodRandom(42, 3)));
+      expect(createInitialState('walls', 7).food).toEqual(createInitialState('walls', 7).food);
+    });
   });
 
   describe('moveSnake', () => {
@@ -0,0 +1,36 @@
+import { describe, it, expect } from 'vitest';
+import { advanceGame, createInitialState } from '@/hooks/useGameLogic';
+import { mulberry32 } from '@/lib/random';
+import { Direction, GameMode } from '@/types/game';
+import vectors from '../../../specs/replay-vectors.json';
+
+// The backend replay verifier (backend/replay_verifier.py) checks the same
+// vectors, so a rule change on either side has to be made on both.
+
+const LETTER_DIRECTIONS: Record<string, Direction> = { U: 'UP', D: 'DOWN', L: 'LEFT', R: 'RIGHT' };
+
+describe('Replay vectors', () => {
+  it('mulberry32 produces the shared sequences', () => {
+    for (const { seed, values } of vectors.random) {
+      const random = mulberry32(seed);
+      expect(values.map(() => random())).toEqual(values);
+    }
+  });
+
+  it.each(vectors.games.map(game => [`${game.mode} seed ${game.seed}`, game] as const))(
+    'replays %s to the shared end state',
+    (_, game) => {
+      let state = { ...createInitialState(game.mode as GameMode, game.seed), status: 'playing' as const };
+      for (const letter of game.moves) {
+        expect(state.status).toBe('playing');
+        state = advanceGame({ ...state, nextDirection: LETTER_DIRECTIONS[letter] });
+      }
+
+      expect(state.status).toBe('game-over');
+      expect(state.moves).toBe(game.moves);
+      expect(state.score).toBe(game.score);
+      expect(state.snake).toEqual(game.snake);
+      expect(state.food).toEqual(game.food);
+    },
+  );
+});
@@ -18,6 +18,16 @@ export interface GameState {
   status: GameStatus;
   mode: GameMode;
   speed: number;
+  // Replay recording: food seed, one move letter per tick, start time (ms since epoch)
+  seed: number;
+  moves: string;
+  startedAt: number;
+}
+
+export interface Replay {
+  seed: number;
+  moves: string;
+  durationMs: number;
 }
 
 export interface User {